@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -34,6 +35,8 @@ from colourpaletteextractor.model import model
 if __name__ == '__main__':
     """Run an instance of the ColourPaletteExtractor application."""
 
+    multiprocessing.freeze_support()  # Allow the frozen application to start the worker processes of the model
+
     print("***************************************************************************************")
     if _settings.__VERBOSE__:
         print("The verbose output to the terminal during the generation of the colour palette and the \n" +
@@ -0,0 +1,75 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+import tempfile
+import timeit
+
+from PIL import Image
+
+from colourpaletteextractor.benchmarks.workersbenchmark import get_large_image
+from colourpaletteextractor.model.imagedata import ImageData, DRAFT_SCALES, read_reduced_image
+
+MEGAPIXELS = 20
+"""Approximate size (megapixels) of the JPEG image used for the benchmark."""
+
+REPEATS = 3
+"""Number of times each decode is timed (the fastest time is reported)."""
+
+
+def time_decode(file_name: str, max_pixels: int = None, repeats: int = REPEATS) -> float:
+    """Time the decoding of an image, either in full or at a reduced resolution.
+
+    Args:
+        file_name (str): Path to the image.
+        max_pixels (int): The maximum number of pixels of the reduced resolution image. If None, the image is decoded
+            in full.
+        repeats (int): The number of times the decode is timed.
+
+    Returns:
+        (float): The fastest time (s) taken to decode the image.
+    """
+
+    if max_pixels is None:
+        timer = timeit.Timer(lambda: ImageData(file_name).image)
+    else:
+        timer = timeit.Timer(lambda: read_reduced_image(file_name, max_pixels))
+    return min(timer.repeat(repeat=repeats, number=1))
+
+
+if __name__ == '__main__':
+
+    # Optional size of image (megapixels)
+    megapixels = float(sys.argv[1]) if len(sys.argv) > 1 else MEGAPIXELS
+
+    image = get_large_image("./colourpaletteextractor/data/sampleImages/my_parents.jpg", megapixels)
+    height, width = image.shape[:2]
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "large.jpg")
+        Image.fromarray(image).save(file_name, quality=90)
+        print("Image size:", image.shape)
+
+        full_time = time_decode(file_name)
+        print(f"{'Scale':>8}{'Pixels':>12}{'Time (s)':>10}{'Speed-up':>10}{'Ideal':>8}")
+        print(f"{'1':>8}{width * height:>12}{full_time:>10.3f}{1:>10.2f}{1:>8}")
+        for scale in DRAFT_SCALES:
+            max_pixels = -(-width // scale) * -(-height // scale)
+            reduced_time = time_decode(file_name, max_pixels)
+            print(f"{'1/' + str(scale):>8}{max_pixels:>12}{reduced_time:>10.3f}{full_time / reduced_time:>10.2f}"
+                  f"{scale ** 2:>8}")
@@ -0,0 +1,105 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark of the overhead of reporting the progress of the algorithm, with and without throttling the reports."""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from colourpaletteextractor.benchmarks.workersbenchmark import get_large_image
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.progressreporter import ProgressReporter, ThrottledProgressReporter
+
+MEGAPIXELS = 20
+"""Approximate size (megapixels) of the image used for the benchmark."""
+
+REPEATS = 3
+"""Number of times each configuration is timed (the fastest time is kept)."""
+
+
+class CountingProgressReporter(ProgressReporter):
+    """Progress reporter that counts the reports it receives, standing in for the GUI's progress reporter.
+
+    Args:
+        cancel_event (threading.Event): The cancellation token shared with the algorithm.
+    """
+
+    def __init__(self, cancel_event: threading.Event):
+        self.reports = 0
+        self._cancel_event = cancel_event
+
+    def report_progress(self, percent: float) -> None:
+        self.reports += 1
+
+    @property
+    def continue_thread(self) -> bool:
+        return not self._cancel_event.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        return self._cancel_event
+
+
+def time_algorithm(image: np.array, progress_reporter: ProgressReporter = None) -> float:
+    """Time the generation of the colour palette of an image, reporting its progress to the given progress reporter.
+
+    Args:
+        image (np.array): The image.
+        progress_reporter (ProgressReporter): (Optional) The progress reporter.
+
+    Returns:
+        (float): The time (s) taken to generate the colour palette.
+    """
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.set_progress_reporter(progress_reporter)
+
+    start_time = time.perf_counter()
+    algorithm.generate_colour_palette_index_map(image)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+
+    # Optional size of image (megapixels)
+    megapixels = float(sys.argv[1]) if len(sys.argv) > 1 else MEGAPIXELS
+
+    image = get_large_image("./colourpaletteextractor/data/sampleImages/my_parents.jpg", megapixels)
+    print("Image size:", image.shape, "CPU count:", os.cpu_count())
+
+    every_report = CountingProgressReporter(threading.Event())
+    throttled_reports = CountingProgressReporter(threading.Event())
+    configurations = {"No progress reporter": lambda: time_algorithm(image),
+                      "Every report passed on": lambda: time_algorithm(image, every_report),
+                      f"Throttled ({ThrottledProgressReporter.MAX_RATE} Hz)":
+                          lambda: time_algorithm(image, ThrottledProgressReporter(throttled_reports))}
+    counters = {"Every report passed on": every_report,
+                f"Throttled ({ThrottledProgressReporter.MAX_RATE} Hz)": throttled_reports}
+
+    # Alternate between the configurations, so that they are equally affected by other load on the machine
+    elapsed_times = {name: [] for name in configurations}
+    for _ in range(REPEATS):
+        for name, run in configurations.items():
+            elapsed_times[name].append(run())
+
+    reference_time = min(elapsed_times["No progress reporter"])
+    for name, times in elapsed_times.items():
+        reports = f"  Reports: {counters[name].reports / REPEATS:>6.0f}" if name in counters else ""
+        print(f"  {name:<24}  Time (s): {min(times):>6.2f}  Overhead: {min(times) / reference_time - 1:>6.1%}"
+              + reports)
@@ -0,0 +1,64 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark comparing the conversion of images from sRGB to CIELAB with and without the lookup table."""
+
+import glob
+import os
+import timeit
+
+import numpy as np
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+
+REPEATS = 5
+"""Number of times each conversion is timed (the fastest time is reported)."""
+
+
+def time_conversion(image: np.array, use_lookup_table: bool, repeats: int = REPEATS) -> float:
+    """Time the conversion of an image from the sRGB colour space to the CIELAB colour space.
+
+    Args:
+        image (np.array): The image in the sRGB colour space.
+        use_lookup_table (bool): If True, the image is converted using the lookup table.
+        repeats (int): The number of times the conversion is timed.
+
+    Returns:
+        (float): The fastest time (s) taken to convert the image.
+    """
+
+    timer = timeit.Timer(lambda: nieves2020.convert_rgb_2_lab(image, use_lookup_table=use_lookup_table))
+    return min(timer.repeat(repeat=repeats, number=1))
+
+
+if __name__ == '__main__':
+
+    # Paths to sample images
+    file_names = sorted(glob.glob("./colourpaletteextractor/data/sampleImages/*"))
+
+    print(f"{'Image':<55}{'Pixels':>10}{'skimage (s)':>14}{'Lookup (s)':>14}{'Speed-up':>10}{'Max diff':>12}")
+    for file_name in file_names:
+        image = ImageData(os.path.abspath(file_name)).image
+        if image.ndim == 2:
+            image = nieves2020.color.gray2rgb(image)
+
+        skimage_time = time_conversion(image, use_lookup_table=False)
+        lookup_table_time = time_conversion(image, use_lookup_table=True)
+        difference = np.abs(nieves2020.convert_rgb_2_lab(image, use_lookup_table=False)
+                            - nieves2020.convert_rgb_2_lab(image, use_lookup_table=True)).max()
+
+        print(f"{os.path.basename(file_name):<55}{image.shape[0] * image.shape[1]:>10}{skimage_time:>14.3f}"
+              f"{lookup_table_time:>14.3f}{skimage_time / lookup_table_time:>10.2f}{difference:>12.1e}")
@@ -0,0 +1,58 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import time
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+
+CUBE_SIZES = [10, 15, 20, 25, 30]
+"""Cube sizes to sweep."""
+
+THRESHOLDS = [0.01, 0.02, 0.03, 0.04, 0.05]
+"""Thresholds to sweep."""
+
+
+if __name__ == '__main__':
+
+    image = ImageData(os.path.abspath("./colourpaletteextractor/data/sampleImages/my_parents.jpg")).image[..., :3]
+    print("Image size:", image.shape, "Combinations:", len(CUBE_SIZES) * len(THRESHOLDS))
+
+    # Generate each colour palette in turn
+    start_time = time.perf_counter()
+    loop_rows = []
+    for cube_size in CUBE_SIZES:
+        for threshold in THRESHOLDS:
+            algorithm = nieves2020.Nieves2020CentredCubes()
+            algorithm.cube_size = cube_size
+            algorithm.threshold = threshold
+            _, colour_palette, relative_frequencies = algorithm.generate_colour_palette(image)
+            palette = sorted(zip(relative_frequencies, colour_palette), key=lambda pair: pair[0], reverse=True)
+            loop_rows += [(cube_size, threshold, [int(value) for value in colour], relative_frequency)
+                          for relative_frequency, colour in palette]
+    loop_time = time.perf_counter() - start_time
+
+    # Sweep all of the colour palettes
+    start_time = time.perf_counter()
+    rows = nieves2020.Nieves2020CentredCubes().generate_colour_palette_sweep(image, CUBE_SIZES, THRESHOLDS)
+    sweep_time = time.perf_counter() - start_time
+
+    sweep_rows = [(row["cube_size"], row["threshold"], [row["red"], row["green"], row["blue"]],
+                   row["relative_frequency"]) for row in rows]
+
+    print(f"Loop time (s): {loop_time:.2f}  Sweep time (s): {sweep_time:.2f}  "
+          f"Speed-up: {loop_time / sweep_time:.2f}  Identical palettes: {loop_rows == sweep_rows}")
@@ -0,0 +1,91 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from colourpaletteextractor.benchmarks.workersbenchmark import get_large_image
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.tiledimage import open_tiled_image
+
+MEGAPIXELS = [5, 20, 80]
+"""Approximate sizes (megapixels) of the images used for the benchmark."""
+
+
+def measure_peak_memory(function) -> tuple[float, int]:
+    """Time a function and measure the peak memory allocated while it runs (excluding memory-mapped files).
+
+    Args:
+        function (Callable): The function to call.
+
+    Returns:
+        (float): The time (s) taken by the function.
+        (int): The peak memory (bytes) allocated by the function.
+    """
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    function()
+    elapsed_time = time.perf_counter() - start_time
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed_time, peak_bytes
+
+
+if __name__ == '__main__':
+
+    # Optional sizes of images (megapixels)
+    sizes = [float(size) for size in sys.argv[1:]] or MEGAPIXELS
+
+    print(f"{'Pixels':>12}{'In memory (s)':>15}{'Peak (MiB)':>12}{'Tiled (s)':>11}{'Peak (MiB)':>12}"
+          f"{'Identical':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        image_file = os.path.join(directory, "image.npy")
+        index_map_file = os.path.join(directory, "index_map.npy")
+
+        for megapixels in sizes:
+            image = get_large_image("./colourpaletteextractor/data/sampleImages/my_parents.jpg", megapixels)
+            pixels = image.shape[0] * image.shape[1]
+            np.save(image_file, image)
+            del image
+            results = {}
+
+            def generate_in_memory() -> None:
+                image = np.load(image_file)
+                results["in memory"] = nieves2020.Nieves2020CentredCubes().generate_colour_palette_index_map(image)
+
+            def generate_tiled() -> None:
+                results["tiled"] = nieves2020.Nieves2020CentredCubes().generate_colour_palette_index_map_tiled(
+                    open_tiled_image(image_file), index_map_file)
+
+            in_memory_time, in_memory_peak = measure_peak_memory(generate_in_memory)
+            tiled_time, tiled_peak = measure_peak_memory(generate_tiled)
+
+            index_map, colour_palette, _ = results["in memory"]
+            tiled_index_map, tiled_colour_palette, _ = results["tiled"]
+            identical = [list(colour) for colour in colour_palette] == [list(colour) for colour in tiled_colour_palette]\
+                and np.array_equal(index_map, tiled_index_map)
+            del results, index_map, tiled_index_map
+
+            print(f"{pixels:>12}{in_memory_time:>15.2f}{in_memory_peak / 1024 ** 2:>12.0f}"
+                  f"{tiled_time:>11.2f}{tiled_peak / 1024 ** 2:>12.0f}{str(identical):>11}")
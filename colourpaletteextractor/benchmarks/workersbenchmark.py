@@ -0,0 +1,94 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Benchmark of the time taken to generate the colour palette of a large image with different numbers of workers."""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+
+WORKERS = [1, 2, 4, 8, 16]
+"""Numbers of workers to time."""
+
+MEGAPIXELS = 100
+"""Approximate size (megapixels) of the image used for the benchmark."""
+
+
+def get_large_image(file_name: str, megapixels: float = MEGAPIXELS) -> np.array:
+    """Tile an image until it has (approximately) the given number of pixels.
+
+    Args:
+        file_name (str): Path to the image to be tiled.
+        megapixels (float): The number of pixels (millions) in the tiled image.
+
+    Returns:
+        (np.array): The tiled image.
+    """
+
+    image = ImageData(os.path.abspath(file_name)).image[..., :3]
+    repeats = max(1, int(np.ceil(np.sqrt(megapixels * 1e6 / (image.shape[0] * image.shape[1])))))
+    return np.tile(image, (repeats, repeats, 1))
+
+
+def time_algorithm(image: np.array, workers: int, unique_colours: bool) \
+        -> tuple[float, list[np.array], list[float]]:
+    """Time the generation of the colour palette of an image.
+
+    Args:
+        image (np.array): The image.
+        workers (int): The number of workers.
+        unique_colours (bool): If True, the colour palette is generated from the image's unique colours.
+
+    Returns:
+        (float): The time (s) taken to generate the colour palette.
+        (list[np.array]): The colour palette.
+        (list[float]): The relative frequencies of the colours in the colour palette.
+    """
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.workers = workers
+    algorithm.unique_colours = unique_colours
+
+    start_time = time.perf_counter()
+    _, colour_palette, relative_frequencies = algorithm.generate_colour_palette_index_map(image)
+    return time.perf_counter() - start_time, colour_palette, relative_frequencies
+
+
+if __name__ == '__main__':
+
+    # Optional size of image (megapixels)
+    megapixels = float(sys.argv[1]) if len(sys.argv) > 1 else MEGAPIXELS
+
+    image = get_large_image("./colourpaletteextractor/data/sampleImages/my_parents.jpg", megapixels)
+    print("Image size:", image.shape, "CPU count:", os.cpu_count())
+
+    for unique_colours in [False, True]:
+        print("Unique colours:", unique_colours)
+        reference_time, reference_palette, reference_frequencies = None, None, None
+        for workers in WORKERS:
+            elapsed_time, colour_palette, relative_frequencies = time_algorithm(image, workers, unique_colours)
+            if reference_time is None:
+                reference_time, reference_palette, reference_frequencies = \
+                    elapsed_time, colour_palette, relative_frequencies
+
+            identical = [list(colour) for colour in colour_palette] == [list(colour) for colour in reference_palette] \
+                and relative_frequencies == reference_frequencies
+            print(f"  Workers: {workers:>3}  Time (s): {elapsed_time:>8.2f}  "
+                  f"Speed-up: {reference_time / elapsed_time:>5.2f}  Identical palette: {identical}")
@@ -0,0 +1,376 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Command line interface for generating the colour palettes of images without the GUI.
+
+Qt (PySide2) is never imported, so that the colour palettes can be generated on machines without a display server.
+The colour palette of each image is written out as soon as it has been generated, either as JSON Lines (one JSON
+object per image) or as CSV (one row per colour).
+
+Example::
+
+    python -m colourpaletteextractor.cli ./images "./more_images/**/*.jpg" --jobs 4 --format csv -o palettes.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, TextIO
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm, get_implemented_algorithms
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.palettecache import PaletteCache
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+from colourpaletteextractor.model.tiledimage import open_tiled_image
+
+DEFAULT_ALGORITHM: type[PaletteAlgorithm] = nieves2020.Nieves2020CentredCubes
+"""Algorithm used to generate the colour palettes if none is specified."""
+
+SUPPORTED_IMAGE_TYPES: set[str] = {"png", "jpg", "jpeg"}
+"""File extensions (without the dot) of the images found when searching a directory."""
+
+OUTPUT_FORMATS: tuple[str, ...] = ("jsonl", "csv")
+"""Formats that the colour palettes can be written out in."""
+
+CSV_HEADER: list[str] = ["file", "algorithm", "rank", "red", "green", "blue", "hex", "relative_frequency"]
+"""Column names of the CSV output."""
+
+_algorithm: Optional[PaletteAlgorithm] = None  # Algorithm instance used by the current (worker) process
+_cache: Optional[PaletteCache] = None  # Cache of colour palettes used by the current (worker) process
+_tiled: bool = False  # Read the images in tiles in the current (worker) process
+
+
+def get_algorithms() -> dict[str, type[PaletteAlgorithm]]:
+    """Get the implemented colour palette extraction algorithms, keyed by their class name.
+
+    Returns:
+        (dict[str, type[PaletteAlgorithm]]): The algorithm classes.
+    """
+
+    return {algorithm.__name__: algorithm for algorithm in get_implemented_algorithms()}
+
+
+def find_images(paths: Iterable[str], recursive: bool = False) -> list[str]:
+    """Find the images given by a list of file paths, glob patterns and directories.
+
+    Directories are searched for files with one of the :const:`SUPPORTED_IMAGE_TYPES`. Files given explicitly (or
+    matched by a glob pattern) are used whatever their extension. Each image is only returned once.
+
+    Args:
+        paths (Iterable[str]): The file paths, glob patterns and directories.
+        recursive (bool): If True, directories are also searched through all of their sub-directories.
+
+    Returns:
+        (list[str]): The paths to the images, in the order they were found.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or a glob pattern does not match any files.
+    """
+
+    image_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                found_paths = [os.path.join(directory, file_name)
+                               for directory, _, file_names in os.walk(path)
+                               for file_name in file_names]
+            else:
+                found_paths = [os.path.join(path, file_name) for file_name in os.listdir(path)]
+            found_paths = sorted(found_path for found_path in found_paths
+                                 if os.path.isfile(found_path) and is_supported_image(found_path))
+
+        elif os.path.isfile(path):
+            found_paths = [path]
+
+        elif glob.has_magic(path):
+            found_paths = sorted(found_path for found_path in glob.glob(path, recursive=True)
+                                 if os.path.isfile(found_path))
+            if len(found_paths) == 0:
+                raise FileNotFoundError("No files match the pattern: " + path)
+
+        else:
+            raise FileNotFoundError("No such file or directory: " + path)
+
+        image_paths.extend(found_paths)
+
+    # Remove duplicates, keeping the first occurrence
+    return list(dict.fromkeys(image_paths))
+
+
+def is_supported_image(path: str) -> bool:
+    """Check if a file has one of the :const:`SUPPORTED_IMAGE_TYPES` as its extension.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        (bool): True if the file extension is supported. Otherwise False.
+    """
+
+    return os.path.splitext(path)[1].lower().lstrip(".") in SUPPORTED_IMAGE_TYPES
+
+
+def set_algorithm(algorithm_class: type[PaletteAlgorithm], unique_colours: bool = False,
+                  cache_directory: str = None, single_precision: bool = False, tiled: bool = False) -> None:
+    """Create the algorithm instance used by the current process to generate every colour palette.
+
+    :class:`nieves2020.Nieves2020` algorithms are given a :class:`PaletteWorkspace`, so that the arrays used for each
+    image are reused for the next image handled by the process.
+
+    Args:
+        algorithm_class (type[PaletteAlgorithm]): The class of the colour palette extraction algorithm.
+        unique_colours (bool): If True, the colour palette is generated from the image's unique colours (only
+            supported by :class:`nieves2020.Nieves2020` algorithms).
+        cache_directory (str): (Optional) Directory of the cache of generated colour palettes (see
+            :class:`PaletteCache`). By default, no cache is used.
+        single_precision (bool): If True, the images are stored in the CIELAB colour space as 32-bit floats (only
+            supported by :class:`nieves2020.Nieves2020` algorithms).
+        tiled (bool): If True, the images are read in tiles, so that images too large to be held in memory can be
+            processed (only supported by :class:`nieves2020.Nieves2020` algorithms). The cache is not used.
+    """
+
+    global _algorithm, _cache, _tiled
+
+    _algorithm = algorithm_class()
+    if isinstance(_algorithm, nieves2020.Nieves2020):
+        _algorithm.unique_colours = unique_colours
+        _algorithm.single_precision = single_precision
+        _algorithm.workspace = PaletteWorkspace()
+
+    _cache = None if cache_directory is None else PaletteCache(cache_directory)
+    _tiled = tiled and isinstance(_algorithm, nieves2020.Nieves2020)
+
+
+def generate_colour_palette(path: str) -> dict:
+    """Generate the colour palette of an image with the current process's algorithm (see :func:`set_algorithm`).
+
+    The colours are sorted from the largest relative frequency to the smallest.
+
+    Args:
+        path (str): Path to the image.
+
+    Returns:
+        (dict): The file path, algorithm, colour palette ([R,G,B] triplets) and relative frequencies of the image,
+            or the file path and an error message if the colour palette could not be generated.
+    """
+
+    try:
+        if _tiled:
+            _, colour_palette, relative_frequencies = _algorithm.generate_colour_palette_index_map_tiled(
+                open_tiled_image(path))
+            return get_result(path, colour_palette, relative_frequencies)
+
+        image = ImageData(path).image
+        cache_key = None if _cache is None else _cache.get_key(image, _algorithm)
+        cached_result = None if _cache is None else _cache.load(cache_key)
+
+        if cached_result is not None:
+            _, colour_palette, relative_frequencies = cached_result
+        else:
+            index_map, colour_palette, relative_frequencies = _algorithm.generate_colour_palette_index_map(image)
+            if _cache is not None:
+                _cache.save(cache_key, index_map, colour_palette, relative_frequencies)
+
+    except Exception as error:  # Report the error and continue with the remaining images
+        return {"file": path, "error": type(error).__name__ + ": " + str(error)}
+
+    finally:
+        if isinstance(_algorithm, nieves2020.Nieves2020):
+            _algorithm.release_binned_image()  # Reuse its arrays for the next image
+
+    return get_result(path, colour_palette, relative_frequencies)
+
+
+def get_result(path: str, colour_palette: list, relative_frequencies: list[float]) -> dict:
+    """Get the result for an image, with its colours sorted from the largest relative frequency to the smallest.
+
+    Args:
+        path (str): Path to the image.
+        colour_palette (list): The colours ([R,G,B] triplets) in the colour palette.
+        relative_frequencies (list[float]): The relative frequencies of the colours.
+
+    Returns:
+        (dict): The file path, algorithm, colour palette and relative frequencies of the image.
+    """
+
+    order = sorted(range(len(relative_frequencies)), key=lambda index: relative_frequencies[index], reverse=True)
+
+    return {"file": path,
+            "algorithm": type(_algorithm).__name__,
+            "colour_palette": [[int(channel) for channel in colour_palette[index]] for index in order],
+            "relative_frequencies": [float(relative_frequencies[index]) for index in order]}
+
+
+def generate_colour_palettes(paths: list[str], algorithm_class: type[PaletteAlgorithm] = DEFAULT_ALGORITHM,
+                             jobs: int = 1, unique_colours: bool = False,
+                             cache_directory: str = None, single_precision: bool = False,
+                             tiled: bool = False) -> Iterator[dict]:
+    """Generate the colour palettes of images, sharing the images between a pool of worker processes.
+
+    Each worker process creates a single algorithm instance that is reused for all of its images. The results are
+    yielded in the same order as the images, as soon as they are available.
+
+    Args:
+        paths (list[str]): Paths to the images.
+        algorithm_class (type[PaletteAlgorithm]): The class of the colour palette extraction algorithm.
+        jobs (int): The number of worker processes. If 1, the images are processed in the current process.
+        unique_colours (bool): If True, the colour palettes are generated from the image's unique colours.
+        cache_directory (str): (Optional) Directory of the cache of generated colour palettes.
+        single_precision (bool): If True, the images are stored in the CIELAB colour space as 32-bit floats.
+        tiled (bool): If True, the images are read in tiles (for images too large to be held in memory).
+
+    Yields:
+        (dict): The result for each image (see :func:`generate_colour_palette`).
+    """
+
+    if jobs == 1:
+        set_algorithm(algorithm_class, unique_colours, cache_directory, single_precision, tiled)
+        yield from map(generate_colour_palette, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=set_algorithm,
+                             initargs=(algorithm_class, unique_colours, cache_directory, single_precision,
+                                       tiled)) as executor:
+        yield from executor.map(generate_colour_palette, paths)
+
+
+def write_jsonl(result: dict, output: TextIO) -> None:
+    """Write the result for an image as a single line of JSON.
+
+    Args:
+        result (dict): The result for the image (see :func:`generate_colour_palette`).
+        output (TextIO): The stream to write to.
+    """
+
+    output.write(json.dumps(result) + "\n")
+
+
+def write_csv(result: dict, writer: csv.writer) -> None:
+    """Write the result for an image as one CSV row per colour in its colour palette.
+
+    Args:
+        result (dict): The result for the image (see :func:`generate_colour_palette`).
+        writer (csv.writer): The CSV writer.
+    """
+
+    for rank, (colour, relative_frequency) in enumerate(zip(result["colour_palette"],
+                                                            result["relative_frequencies"]), start=1):
+        red, green, blue = colour
+        writer.writerow([result["file"], result["algorithm"], rank, red, green, blue,
+                         "#{:02x}{:02x}{:02x}".format(red, green, blue), relative_frequency])
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Get the parser for the command line arguments.
+
+    Returns:
+        (argparse.ArgumentParser): The argument parser.
+    """
+
+    parser = argparse.ArgumentParser(prog="python -m colourpaletteextractor.cli",
+                                     description="Generate the colour palettes of images without the GUI.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="image files, glob patterns (quoted) or directories of images")
+    parser.add_argument("-a", "--algorithm", choices=sorted(get_algorithms()), default=DEFAULT_ALGORITHM.__name__,
+                        help="colour palette extraction algorithm (default: %(default)s)")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="jsonl",
+                        help="output format (default: %(default)s)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="file to write the colour palettes to (default: standard output)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="search directories through all of their sub-directories")
+    parser.add_argument("-u", "--unique-colours", action="store_true",
+                        help="generate the colour palettes from the unique colours of each image (faster)")
+    parser.add_argument("-s", "--single-precision", action="store_true",
+                        help="store each image in the CIELAB colour space as 32-bit floats (less memory)")
+    parser.add_argument("-t", "--tiled", action="store_true",
+                        help="read each image in tiles, for images too large to be held in memory (e.g., .npy files "
+                             "or tiled TIFF images)")
+    parser.add_argument("-c", "--cache-dir", default=None,
+                        help="directory used to cache the colour palettes between runs (default: no cache)")
+
+    return parser
+
+
+def main(arguments: Optional[list[str]] = None) -> int:
+    """Generate the colour palettes of the images given on the command line.
+
+    Args:
+        arguments (list[str]): (Optional) The command line arguments. By default, ``sys.argv`` is used.
+
+    Returns:
+        (int): The exit status: 0 if every colour palette was generated, 1 if any image failed and 2 if no images
+            were found.
+    """
+
+    parser = get_parser()
+    arguments = parser.parse_args(arguments)
+    if arguments.jobs < 1:
+        parser.error("the number of jobs must be at least 1")
+
+    try:
+        paths = find_images(arguments.paths, arguments.recursive)
+    except FileNotFoundError as error:
+        print(error, file=sys.stderr)
+        return 2
+
+    if len(paths) == 0:
+        print("No images found!", file=sys.stderr)
+        return 2
+
+    algorithm_class = get_algorithms()[arguments.algorithm]
+    jobs = min(arguments.jobs, len(paths))
+    failed = 0
+
+    output = sys.stdout if arguments.output is None else open(arguments.output, "w", newline="")
+    try:
+        writer = None
+        if arguments.format == "csv":
+            writer = csv.writer(output)
+            writer.writerow(CSV_HEADER)
+
+        for result in generate_colour_palettes(paths, algorithm_class, jobs, arguments.unique_colours,
+                                               arguments.cache_dir, arguments.single_precision, arguments.tiled):
+            if "error" in result:
+                failed += 1
+                print("Could not generate the colour palette of " + result["file"] + ": " + result["error"],
+                      file=sys.stderr)
+                if writer is not None:
+                    continue
+
+            if writer is None:
+                write_jsonl(result, output)
+            else:
+                write_csv(result, writer)
+            output.flush()
+
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
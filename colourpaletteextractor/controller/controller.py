@@ -22,11 +22,13 @@ import numpy as np
 from PySide2 import QtCore
 from PySide2.QtCore import QFileInfo, QRunnable, QThreadPool
 
-from colourpaletteextractor.controller.worker import Worker
+from colourpaletteextractor.controller.worker import SignalProgressReporter, Worker
 from colourpaletteextractor.model import generatereport
 from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm
+from colourpaletteextractor.model.batchscheduler import BatchScheduler
 from colourpaletteextractor.model.imagedata import ImageData
 from colourpaletteextractor.model.model import ColourPaletteExtractorModel
+from colourpaletteextractor.model.progressreporter import ThrottledProgressReporter
 from colourpaletteextractor.view import mainview as vw, otherviews
 from colourpaletteextractor.view.mainview import MainView
 from colourpaletteextractor.view.tabview import NewTab
@@ -44,6 +46,9 @@ class ColourPaletteExtractorController(QRunnable):
 
     """
 
+    ALGORITHM_PARAMETERS_DELAY = 500
+    """Time (ms) without changes to the relevancy parameters before the colour palettes are generated again."""
+
     def __init__(self, model: ColourPaletteExtractorModel, view: MainView) -> None:
 
         super().__init__()
@@ -52,6 +57,33 @@ class ColourPaletteExtractorController(QRunnable):
         self._view = view
         self._model = model
 
+        # Provisional colour palettes (and relative frequencies) of the images whose colour palettes are being generated
+        self._colour_palette_previews: dict[str, tuple[list[np.array], list[float]]] = {}
+
+        # Queue of the colour palettes to be generated in a batch, started while they fit the memory budget
+        self._batch_scheduler = BatchScheduler(start_job=self._start_batch_job,
+                                               memory_budget=self._model.batch_memory_budget)
+
+        # Images are decoded by their own threads, so that opening images is not queued behind the colour palettes
+        self._decode_thread_pool = QThreadPool()
+
+        # Pass on the progress of the colour palettes generated by worker processes to the GUI
+        self._progress_pump = QtCore.QTimer()
+        self._progress_pump.setInterval(int(1000 / ThrottledProgressReporter.MAX_RATE))
+        self._progress_pump.timeout.connect(self._model.palette_process_pool.pump_progress)
+
+        # Apply the relevancy parameters once the user has stopped changing them, rather than at each step
+        self._algorithm_parameters_timer = QtCore.QTimer()
+        self._algorithm_parameters_timer.setSingleShot(True)
+        self._algorithm_parameters_timer.setInterval(self.ALGORITHM_PARAMETERS_DELAY)
+        self._algorithm_parameters_timer.timeout.connect(self._set_algorithm_parameters)
+
+        # Tabs whose colour palettes were being generated when the relevancy parameters changed (updated once done)
+        self._tabs_awaiting_parameters: set[NewTab] = set()
+
+        # Tabs queued by the batch scheduler to generate their colour palettes again with new relevancy parameters
+        self._queued_parameter_updates: set[NewTab] = set()
+
         # Connect signals and slots
         self._connect_main_window_signals()
         self._connect_tab_signals()
@@ -89,11 +121,19 @@ class ColourPaletteExtractorController(QRunnable):
         image_id = tab.image_id
         self._update_state_of_tab_buttons(tab=tab)
 
+        # Keep the binned image of the shown image ahead of those of the other images
+        if i >= 0 and self._model.get_image_data(image_id) is not None:
+            self._model.binned_images.use(self._model.get_image_data(image_id))
+
         # Reload colour palette
         if i != -3:  # This prevents the GUI from flickering that occurs when needlessly updating the colour palette
             colour_palette = self._get_colour_palette(tab)
             relative_frequencies = self._get_relative_frequencies(tab)
 
+            # Show the provisional colour palette until the colour palette has been generated
+            if len(colour_palette) == 0 and tab.status_bar_state == 1 and image_id in self._colour_palette_previews:
+                colour_palette, relative_frequencies = self._colour_palette_previews[image_id]
+
             if len(colour_palette) == 0:
                 self._view.colour_palette_dock.remove_colour_palette()  # Reset colour palette dock
             else:
@@ -156,6 +196,7 @@ class ColourPaletteExtractorController(QRunnable):
         """Connect the preferences dialog box signals to the appropriate slots."""
 
         self._view.preferences.reset_preferences_button.clicked.connect(self._reset_preferences)
+        self._view.preferences.finished.connect(self._apply_pending_algorithm_parameters)
         self._connect_algorithm_selector_signals()
         self._connect_output_directory_selector_signals()
 
@@ -168,6 +209,10 @@ class ColourPaletteExtractorController(QRunnable):
         for algorithm, algorithm_button in zip(algorithms, algorithm_buttons):
             algorithm_button.clicked.connect(partial(self._set_algorithm, algorithm))
 
+        # Connect each relevancy parameter spin box to the correct slot (applied once the user stops changing them)
+        for spin_box in self._view.preferences.get_parameter_spin_boxes():
+            spin_box.valueChanged.connect(lambda _: self._algorithm_parameters_timer.start())
+
     def _connect_output_directory_selector_signals(self) -> None:
         """Connect the output directory selector signals from the preferences dialog box to the appropriate slots."""
 
@@ -186,13 +231,24 @@ class ColourPaletteExtractorController(QRunnable):
         print("Removing temporary directory and its contents...")
         self._model.close_temporary_directory()
 
+        print("Cancelling images waiting to be loaded...")
+        self._decode_thread_pool.clear()
+
+        print("Stopping worker processes...")
+        self._progress_pump.stop()
+        self._model.close_process_pool()
+
         print("Saving GUI size and position to the settings file...")
         size = self._view.size()
         position = self._view.pos()
         self._model.write_view_settings(size=size, position=position)
 
     def _open_file(self) -> None:
-        """Open the file dialog box and create a :class:`tabview.NewTab` object for each newly imported image."""
+        """Open the file dialog box and create a :class:`tabview.NewTab` object for each newly imported image.
+
+        Each tab shows a placeholder until its image has been decoded by a background thread. Several images are
+        decoded at the same time, and an image that cannot be decoded has its tab closed without affecting the others.
+        """
 
         supported_files = self._model.SUPPORTED_IMAGE_TYPES
         file_names, _ = self._view.show_file_dialog_box(supported_files)
@@ -202,13 +258,80 @@ class ColourPaletteExtractorController(QRunnable):
             new_image_data = None
 
             if file_name != "":
-                new_image_data_id, new_image_data = self._model.add_image(file_name)
+                new_image_data_id, new_image_data = self._model.add_image(file_name, load=False)
             else:
                 print("No image selected...")
 
             if new_image_data is not None:
-                # Create new tab linked to the image
-                self._create_new_tab(new_image_data_id, new_image_data)
+                # Create new tab linked to the image and decode the image in the background
+                new_tab = self._create_new_tab(new_image_data_id, new_image_data)
+                self._load_image_worker(new_tab)
+
+    def _load_image_worker(self, tab: NewTab) -> None:
+        """Generate a new thread to decode the image linked to the given tab.
+
+        Args:
+            tab (NewTab): The tab showing a placeholder for the image to be decoded.
+        """
+
+        worker = Worker(self._load_image, function_type="image", tab=tab)
+        worker.signals.thumbnail.connect(self._show_thumbnail_image)
+        worker.signals.loaded.connect(self._show_loaded_image)
+        worker.signals.error.connect(self._show_error_generation_dialog_box)
+        self._decode_thread_pool.start(worker)
+
+    def _load_image(self, tab: NewTab, progress_callback: QtCore.SignalInstance,
+                    thumbnail_callback: QtCore.SignalInstance) -> None:
+        """Decode the image linked to the given tab.
+
+        Large JPEG images are first decoded at a reduced resolution, which is shown until the image has been decoded
+        and later used to preview its colour palette (see :meth:`ImageData.load_preview`).
+
+        Args:
+            tab (NewTab): The tab linked to the image to be decoded.
+            progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI (NOT IN USE).
+            thumbnail_callback (QtCore.SignalInstance): Signal that when emitted, shows the reduced resolution image.
+        """
+
+        image_data = self._model.get_image_data(tab.image_id)
+        if image_data is None:  # Tab may have been closed before the image was decoded
+            return
+
+        image_data.load_preview(self._model.preview_max_pixels)
+        if not image_data.loaded:
+            thumbnail_callback.emit(tab)
+        image_data.load()
+
+    def _show_thumbnail_image(self, tab: NewTab) -> None:
+        """Replace the placeholder of the given tab with the reduced resolution version of its image.
+
+        Args:
+            tab (NewTab): The tab whose image is being decoded.
+        """
+
+        image_data = self._model.get_image_data(tab.image_id)
+        if image_data is None or image_data.loaded:  # Tab was closed or the image has already been decoded
+            return
+
+        tab.image_display.show_preview_image(image_data.preview_image, image_data.preview_scale)
+
+    def _show_loaded_image(self, tab: NewTab) -> None:
+        """Replace the placeholder of the given tab with its decoded image and allow its colour palette to be generated.
+
+        Args:
+            tab (NewTab): The tab whose image has been decoded.
+        """
+
+        image_data = self._model.get_image_data(tab.image_id)
+        if image_data is None:  # Tab was closed while the image was being decoded
+            return
+
+        tab.image_display.show_loaded_image(image_data.image)
+        tab.generate_palette_available = True
+        tab.status_bar_state = 0  # Tab status to generate colour palette
+
+        if tab is self._view.tabs.currentWidget():
+            self.current_tab_changed(-3)  # Update GUI view
 
     def _generate_all(self, batch_type: str) -> None:
         """Generate the colour palette or colour palette report for all possible images.
@@ -234,16 +357,35 @@ class ColourPaletteExtractorController(QRunnable):
         # Update model thread counter
         self._model.active_thread_counter = num_tabs
 
+        # Colour palettes of large images are generated by worker processes, whose progress is passed on by the pump
+        if batch_type == "colour palette":
+            self._progress_pump.start()
+
         thread_count = 0  # Used for keeping track of the number of reports being generated
 
-        # Generate worker for each tab
-        for i in range(num_tabs):
-            tab = self._view.tabs.widget(i)
+        # Generate worker for each tab (starting with the visible tab)
+        current_tab = self._view.tabs.currentWidget()
+        tabs = sorted([self._view.tabs.widget(i) for i in range(num_tabs)], key=lambda tab: tab is not current_tab)
+        for tab in tabs:
 
-            # Generate the colour palette for the given tab
+            # Queue the generation of the colour palette for the given tab (started once it fits the memory budget)
             if batch_type == "colour palette":
-                self._generate_worker(main_function=batch_type, tab=tab, batch_generation=True)
-                thread_count += 1
+
+                # Tab already queued to apply new relevancy parameters, so it is started as part of the batch instead
+                if tab in self._queued_parameter_updates:
+                    self._queued_parameter_updates.discard(tab)
+                    thread_count += 1
+
+                # Tab's colour palette is already being generated with the current parameters
+                elif tab in self._batch_scheduler:
+                    self._model.active_thread_counter -= 1
+
+                # Check if the tab's image has been decoded
+                elif self._model.get_image_data(tab.image_id).loaded:
+                    self._batch_scheduler.add(tab, self._model.estimate_palette_peak_bytes(tab.image_id))
+                    thread_count += 1
+                else:
+                    self._model.active_thread_counter -= 1
 
             # Generate the colour palette report for the given tab
             elif batch_type == "report":
@@ -260,9 +402,14 @@ class ColourPaletteExtractorController(QRunnable):
                                  + "The provided string was: " + batch_type + "...")
 
         # Let the user know that the colour palette needs to be generated before generating the report
-        if batch_type == "report" and thread_count == 0:
-            message = "You need to generate the colour palette for at least one image " \
-                      + "before you can generate a report!"
+        if thread_count == 0:
+            if batch_type == "report":
+                message = "You need to generate the colour palette for at least one image " \
+                          + "before you can generate a report!"
+            else:
+                self._progress_pump.stop()
+                message = "You need to wait for at least one image to finish loading " \
+                          + "before you can generate its colour palette!"
             msg_box = otherviews.ErrorBox(box_type="information")
             msg_box.setInformativeText(message)
             msg_box.exec_()
@@ -275,14 +422,55 @@ class ColourPaletteExtractorController(QRunnable):
 
         # Show overall progress widget
         self._view.batch_progress_widget.show_widget(total_count=thread_count, batch_type=batch_type)
+        self._update_batch_queue_depth()
+
+    def _start_batch_job(self, tab: NewTab) -> None:
+        """Start the generation of the colour palette for the given tab, once admitted by the batch scheduler.
+
+        The colour palette is either generated as part of a batch or again with new relevancy parameters (see
+        :meth:`_queue_parameter_update`).
 
-    def _generate_worker(self, main_function: str, tab: NewTab = None, batch_generation: bool = False) -> None:
+        Args:
+            tab (NewTab): The tab linked to the image whose colour palette is to be generated.
+        """
+
+        batch_generation = tab not in self._queued_parameter_updates
+        self._queued_parameter_updates.discard(tab)
+
+        if tab.image_id in self._model.image_data_id_dictionary:
+            self._generate_worker(main_function="colour palette", tab=tab, batch_generation=batch_generation,
+                                  scheduled=True)
+        else:  # Tab was closed while waiting to be started
+            if batch_generation:
+                self._finish_generation(-2)
+            self._batch_scheduler.finish(tab)
+
+    def _finish_batch_job(self, tab: NewTab) -> None:
+        """Let the batch scheduler start the next colour palettes, now that the given tab's has been generated.
+
+        Args:
+            tab (NewTab): The tab linked to the image whose colour palette has been generated.
+        """
+
+        self._batch_scheduler.finish(tab)
+        self._update_batch_queue_depth()
+
+    def _update_batch_queue_depth(self) -> None:
+        """Show the number of colour palettes being generated and waiting to be started in the batch progress widget."""
+
+        self._view.batch_progress_widget.set_queue_depth(running_count=self._batch_scheduler.running_count,
+                                                         queued_count=self._batch_scheduler.queue_depth)
+
+    def _generate_worker(self, main_function: str, tab: NewTab = None, batch_generation: bool = False,
+                         scheduled: bool = False) -> None:
         """Generate a new thread to either generate the colour palette or the colour palette report for the given tab.
 
         Args:
             main_function (str): The action to be run. This can either be 'colour palette' or 'report'.
             tab (NewTab): The tab to perform the main_function on.
             batch_generation (bool): True if the worker is being generated as part of a batch. Otherwise False.
+            scheduled (bool): True if the worker was admitted by the batch scheduler, which is told when the worker
+                has finished. Otherwise False.
 
         Raises:
             ValueError: For an invalid main_function.
@@ -294,7 +482,8 @@ class ColourPaletteExtractorController(QRunnable):
 
         # Select primary function
         if main_function == "colour palette":
-            worker = Worker(self._generate_colour_palette, function_type=main_function, tab=tab)
+            worker = Worker(self._generate_colour_palette, function_type=main_function, tab=tab,
+                            use_process_pool=batch_generation)
         elif main_function == "report":
             worker = Worker(self._generate_report, function_type=main_function, tab=tab)
         else:
@@ -303,6 +492,9 @@ class ColourPaletteExtractorController(QRunnable):
 
         # Connect additional worker signals and start the thread
         self._connect_worker_signals(worker=worker, batch_generation=batch_generation)
+        if scheduled:
+            worker.signals.finished.connect(lambda _: self._finish_batch_job(tab))  # Start the next queued tabs
+        worker.signals.finished.connect(lambda _: self._update_tab_awaiting_parameters(tab))
         QThreadPool.globalInstance().start(worker)
 
     def _connect_worker_signals(self, worker: Worker, batch_generation: bool) -> None:
@@ -321,6 +513,7 @@ class ColourPaletteExtractorController(QRunnable):
             worker.signals.finished.connect(self.current_tab_changed)  # Function called at the very end
 
         worker.signals.progress.connect(self._update_progress_bar)  # Intermediate Progress
+        worker.signals.preview.connect(self._show_colour_palette_preview)  # Provisional colour palette
         worker.signals.error.connect(self._show_error_generation_dialog_box)
         # worker.signals.result.connect(self._update_tab)  # Uses the result of the main function (NOT IN USE)
 
@@ -333,8 +526,8 @@ class ColourPaletteExtractorController(QRunnable):
 
         Args:
             tab (NewTab): The tab for which the error occurred.
-            error_type (int): Specify if no error occurred during generation (0), an error occurred during the
-                colour palette generation (1) or an error occurred during the colour palette report generation (2).
+            error_type (int): Specify if an error occurred during the colour palette generation (0), the colour
+                palette report generation (1) or while decoding the image (2).
             error_info(tuple[type[Exception], Exception, str]): THe exception type, the exception and the stack trace
                 associated with the error.
 
@@ -347,13 +540,22 @@ class ColourPaletteExtractorController(QRunnable):
         value = error_info[1]
         traceback = error_info[2]
 
+        # Close the tab of an image that could not be decoded (any other images continue to be loaded)
+        if error_type == 2:
+            tab_index = self._view.tabs.indexOf(tab)
+            if tab_index != -1:
+                self._close_current_tab(tab_index)
+
         error_msg_box = otherviews.ErrorBox(box_type="error")
         error_msg_box.append_title(value)
         error_msg_box.setInformativeText(traceback)
         error_msg_box.exec_()
 
         # Re-enable correct buttons for the given tab upon an error and update the status bar
-        if error_type == 0:  # Palette generation error
+        if error_type == 2:  # Image decoding error
+            return
+
+        elif error_type == 0:  # Palette generation error
             self._toggle_tab_button_states(tab=tab, activate=True, palette_generated=False)
             tab.status_bar_state = 0  # Tab status to generate colour palette
 
@@ -364,7 +566,8 @@ class ColourPaletteExtractorController(QRunnable):
         else:
             raise ValueError("The error_occurred value must be either "
                              + "0 (colour palette generation error), "
-                             + "or 1 (colour palette report generation error. The value provided was: "
+                             + "1 (colour palette report generation error) "
+                             + "or 2 (image decoding error). The value provided was: "
                              + str(error_type) + "...")
 
         # Update GUI and progress bar
@@ -376,6 +579,14 @@ class ColourPaletteExtractorController(QRunnable):
         # Update batch progress widget to let user know the threads are being stopped
         self._view.batch_progress_widget.set_cancel_text()
 
+        # Remove the colour palettes that have not been started from the queue
+        for tab in self._batch_scheduler.cancel():
+            if tab in self._queued_parameter_updates:  # Not part of the batch, the previous colour palette is kept
+                self._queued_parameter_updates.discard(tab)
+                self._toggle_tab_button_states(tab=tab, activate=True)
+            else:
+                self._finish_generation(-2)
+
         # Update stop preferences
         for _, image_data in self._model.image_data_id_dictionary.items():
             image_data.continue_thread = False
@@ -422,6 +633,84 @@ class ColourPaletteExtractorController(QRunnable):
         """
         self._model.set_algorithm(algorithm)
 
+    def _set_algorithm_parameters(self) -> None:
+        """Set the relevancy parameters of the algorithm to those shown in the preferences dialog box.
+
+        Called once the parameters have not been changed for :attr:`ALGORITHM_PARAMETERS_DELAY` ms (or when the
+        preferences dialog box is closed). The colour palette of each image that already has one is generated again
+        with the new parameters. If the binned image of an image has been kept by the model, only the relevancy of each
+        cube needs to be decided again, otherwise the colour palette is generated from scratch. The colour palettes are
+        queued by the batch scheduler, so that only those fitting the memory budget are generated at the same time (see
+        :meth:`_queue_parameter_update`). The colour palettes being generated (or whose reports are being generated)
+        are generated again once their threads have finished.
+        """
+
+        self._algorithm_parameters_timer.stop()
+
+        parameters = self._view.preferences.get_algorithm_parameters()
+        if parameters == self._model.get_algorithm_parameters():
+            return
+
+        try:
+            self._model.set_algorithm_parameters(parameters)
+        except ValueError as error:
+            print(error)
+            return
+
+        for i in range(self._view.tabs.count()):
+            tab = self._view.tabs.widget(i)
+            if tab in self._batch_scheduler:
+                if not self._batch_scheduler.is_queued(tab):  # Running, queued tabs are started with new parameters
+                    self._tabs_awaiting_parameters.add(tab)
+            elif tab.generate_report_available:
+                self._queue_parameter_update(tab)
+            elif tab.status_bar_state in (1, 3):  # Generating colour palette or report
+                self._tabs_awaiting_parameters.add(tab)
+
+    def _apply_pending_algorithm_parameters(self) -> None:
+        """Apply relevancy parameters that are still waiting for the delay to pass (e.g., when the dialog is closed)."""
+
+        if self._algorithm_parameters_timer.isActive():
+            self._set_algorithm_parameters()
+
+    def _update_tab_awaiting_parameters(self, tab: NewTab) -> None:
+        """Generate the colour palette of the given tab again if the relevancy parameters changed while it was busy.
+
+        Nothing is done if the tab has been closed or its colour palette was not generated (e.g., it was cancelled).
+
+        Args:
+            tab (NewTab): The tab whose thread has finished.
+        """
+
+        if tab not in self._tabs_awaiting_parameters:
+            return
+        running = tab in self._batch_scheduler and not self._batch_scheduler.is_queued(tab)
+        if running or tab.status_bar_state in (1, 3):
+            return  # Another thread of the tab is still running
+
+        self._tabs_awaiting_parameters.discard(tab)
+        if tab in self._batch_scheduler:
+            return  # Queued, so it is started with the new parameters
+        if tab.image_id not in self._model.image_data_id_dictionary or not tab.generate_report_available:
+            return
+
+        self._queue_parameter_update(tab)
+
+    def _queue_parameter_update(self, tab: NewTab) -> None:
+        """Queue the generation of the colour palette of the given tab again with the new relevancy parameters.
+
+        The colour palette is started by the batch scheduler once it fits the memory budget, with the peak memory
+        estimated by the model (much lower if the binned image of the tab's image can be reused). It is generated by a
+        thread (not as part of a batch).
+
+        Args:
+            tab (NewTab): The tab whose colour palette has already been generated.
+        """
+
+        self._toggle_tab_button_states(tab=tab, activate=False)  # Prevent a second update starting
+        self._queued_parameter_updates.add(tab)
+        self._batch_scheduler.add(tab, self._model.estimate_palette_peak_bytes(tab.image_id))
+
     def _stop_current_thread(self) -> None:
         """Stop the thread generating a colour palette or report for the image shown by the current tab."""
         tab = self._view.tabs.currentWidget()
@@ -460,10 +749,14 @@ class ColourPaletteExtractorController(QRunnable):
         # Create new tab linked to the image
         self._create_new_tab(image_data_id=new_image_data_id, new_image_data=new_image_data)
 
-    def _create_new_tab(self, image_data_id: str, new_image_data: ImageData) -> None:
-        """Create and display a new :class:`tabview.NewTab` in the main window."""
+    def _create_new_tab(self, image_data_id: str, new_image_data: ImageData) -> NewTab:
+        """Create and display a new :class:`tabview.NewTab` in the main window.
+
+        Returns:
+            (NewTab): The new tab.
+        """
 
-        self._view.create_new_tab(image_id=image_data_id, image_data=new_image_data)
+        return self._view.create_new_tab(image_id=image_data_id, image_data=new_image_data)
 
     def _close_current_tab(self, tab_index: int) -> None:
         """Close the :class:`tabview.NewTab` with the index number tab_index.
@@ -481,6 +774,8 @@ class ColourPaletteExtractorController(QRunnable):
 
         # Remove image_data from dictionary in model
         self._model.remove_image_data(image_data_id)
+        self._colour_palette_previews.pop(image_data_id, None)
+        self._tabs_awaiting_parameters.discard(self._view.tabs.widget(tab_index))
 
         # Close currently selected tab in GUI
         self._view.close_current_tab(tab_index)
@@ -512,6 +807,27 @@ class ColourPaletteExtractorController(QRunnable):
                 else:
                     self.current_tab_changed(-3)  # Generating colour palette report
 
+    def _show_colour_palette_preview(self, tab: NewTab, colour_palette: list[np.array],
+                                     relative_frequencies: list[float]) -> None:
+        """Show the provisional colour palette of the given tab in the colour palette dock.
+
+        The provisional colour palette is kept, so that it is shown again if the user returns to the tab, until it is
+        replaced by the final colour palette.
+
+        Args:
+            tab (NewTab): Tab linked to the image whose colour palette is being generated.
+            colour_palette (list[np.array]): The colours in the provisional colour palette.
+            relative_frequencies (list[float]): The relative frequencies of the colours in the provisional colour
+                palette.
+        """
+
+        if tab.status_bar_state != 1:
+            return  # Colour palette has already been generated (or cancelled)
+
+        self._colour_palette_previews[tab.image_id] = (colour_palette, relative_frequencies)
+        if tab == self._view.tabs.currentWidget():
+            self._view.colour_palette_dock.add_colour_palette(colour_palette, tab.image_id, relative_frequencies)
+
     def _finish_generation(self, i: int) -> None:
         """Update tab with the given tab index i and the GUI actions after generation of the colour palette or report.
 
@@ -530,6 +846,7 @@ class ColourPaletteExtractorController(QRunnable):
 
         # If no more active threads
         if self._model.active_thread_counter == 0:
+            self._progress_pump.stop()
             self._view.batch_progress_widget.close()  # Close the batch progress dialog box
 
             # Re-enable batch actions
@@ -567,12 +884,18 @@ class ColourPaletteExtractorController(QRunnable):
         progress_callback.emit(tab, 100)  # Update GUI
         print("Generated PDF colour palette report for image: " + image_id + "...")
 
-    def _generate_colour_palette(self, tab: NewTab, progress_callback: QtCore.SignalInstance):
+    def _generate_colour_palette(self, tab: NewTab, progress_callback: QtCore.SignalInstance,
+                                 preview_callback: QtCore.SignalInstance, use_process_pool: bool = False):
         """Generate the colour palette for the image linked to the given tab.
 
         Args:
             tab (NewTab): Tab linked to the image that is to have its colour palette generated.
             progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI.
+            preview_callback (QtCore.SignalInstance): Signal that when emitted, is used to show a provisional colour
+                palette while the colour palette is being generated.
+            use_process_pool (bool): If True, the colour palette of a large image is generated by one of the model's
+                worker processes (see :meth:`ColourPaletteExtractorModel.generate_palette`), with this thread only
+                waiting for the result. Its progress is passed on to the GUI by the progress pump.
         """
 
         if tab is None:
@@ -587,16 +910,26 @@ class ColourPaletteExtractorController(QRunnable):
         # Generate colour palette
         image_id = tab.image_id
         print("Generating colour palette for image: " + image_id + "...")
-        self._model.generate_palette(image_id, tab, progress_callback)
+        progress_reporter = ThrottledProgressReporter(  # Limit the number of signals queued in the event loop
+            SignalProgressReporter(progress_callback, tab, self._model.get_image_data(image_id)))
+        self._model.generate_palette(image_id, progress_reporter,
+                                     preview=lambda colour_palette, relative_frequencies: preview_callback.emit(
+                                         tab, colour_palette, relative_frequencies),
+                                     use_process_pool=use_process_pool)
+        progress_reporter.flush()
 
         # Update tab properties and refresh tab if it still exists
         if image_id in self._model.image_data_id_dictionary:
-            recoloured_image = self._model.get_image_data(image_id).recoloured_image
+            image_data = self._model.get_image_data(image_id)
 
-            if recoloured_image is None:
+            if not image_data.recoloured_image_available:
                 palette_generated = False
                 tab.status_bar_state = 0  # Colour palette ws not generated
 
+            elif image_data.colour_palette_cached:
+                palette_generated = True
+                tab.status_bar_state = 4  # Tab status to colour palette loaded from cache
+
             else:
                 palette_generated = True
                 tab.status_bar_state = 2  # Tab status to colour palette generated
@@ -640,6 +973,7 @@ class ColourPaletteExtractorController(QRunnable):
         # Reset image data
         image_id = tab.image_id
         image_data = self._model.get_image_data(image_id)
+        self._colour_palette_previews.pop(image_id, None)  # Remove provisional colour palette
         image_data.colour_palette = []  # Remove colour palette
         image_data.recoloured_image = None  # Remove recoloured image
 
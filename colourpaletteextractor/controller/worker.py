@@ -16,15 +16,18 @@
 
 
 import sys
+import threading
 import traceback
 
-from PySide2.QtCore import QRunnable, Slot, QObject, Signal
+from PySide2.QtCore import QRunnable, Slot, QObject, Signal, SignalInstance
 
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.progressreporter import ProgressReporter
 from colourpaletteextractor.view.tabview import NewTab
 
 
 class Worker(QRunnable):
-    """Worker thread used to generate the colour palette or report for an image.
+    """Worker thread used to load an image, or to generate the colour palette or report for an image.
 
 
     Inherits from QRunnable to handler worker thread setup, signals and wrap-up.
@@ -34,10 +37,10 @@ class Worker(QRunnable):
     Accessed: 01/08/21
 
     Args:
-        fn: The function or method to be run as a new thread (generating an image's colour palette or its colour palette
-            report.
+        fn: The function or method to be run as a new thread (decoding an image, or generating an image's colour palette
+            or its colour palette report.
         tab (NewTab): :class:`tabview.NewTab` object associated with the image to be processed.
-        function_type (str): The action to be run. This can either be 'colour palette' or 'report'.
+        function_type (str): The action to be run. This can either be 'image', 'colour palette' or 'report'.
         *args: Arguments to pass to the callback function
         *kwargs: Keywords to pass to the callback function
 
@@ -60,8 +63,8 @@ class Worker(QRunnable):
     def __init__(self, fn, function_type: str, tab: NewTab, *args, **kwargs):
         super(Worker, self).__init__()
 
-        if function_type != "colour palette" and function_type != "report":
-            raise ValueError("The batch_type should either be 'colour palette' or 'report'. "
+        if function_type != "image" and function_type != "colour palette" and function_type != "report":
+            raise ValueError("The batch_type should either be 'image', 'colour palette' or 'report'. "
                              + "The provided string was: " + function_type + "...")
 
         # Store constructor arguments (re-used for processing)
@@ -74,6 +77,10 @@ class Worker(QRunnable):
 
         # Add the callback to our kwargs
         self._kwargs['progress_callback'] = self.signals.progress
+        if function_type == "colour palette":
+            self._kwargs['preview_callback'] = self.signals.preview
+        elif function_type == "image":
+            self._kwargs['thumbnail_callback'] = self.signals.thumbnail
 
     @Slot()
     def run(self):
@@ -93,13 +100,17 @@ class Worker(QRunnable):
                 self.signals.error.emit(self._tab, 0, (exc_type, value, traceback.format_exc()))
             elif self._function_type == "report":
                 self.signals.error.emit(self._tab, 1, (exc_type, value, traceback.format_exc()))
+            elif self._function_type == "image":
+                self.signals.error.emit(self._tab, 2, (exc_type, value, traceback.format_exc()))
 
         else:
             self.signals.result.emit(None)  # Return the result of the processing (NOT IN USE)
+            if self._function_type == "image":
+                self.signals.loaded.emit(self._tab)
         finally:
             if self._function_type == "colour palette":
                 self.signals.finished.emit(-2)  # Done
-            elif self._function_type == "report":
+            elif self._function_type == "report" or self._function_type == "image":
                 self.signals.finished.emit(-3)  # Done
 
 
@@ -118,7 +129,7 @@ class WorkerSignals(QObject):
     finished = Signal(int)
     """Integer emitted upon finishing.
     
-     When generating a colour palette, the value is -2. When generating a report, the value is -3. 
+     When generating a colour palette, the value is -2. When generating a report or loading an image, the value is -3. 
      This is used to reload the tab displaying the image with the correct settings and colour palette.
     
     """
@@ -136,3 +147,71 @@ class WorkerSignals(QObject):
     the image.
     
     """
+
+    loaded = Signal(object)
+    """NewTab object whose image has been decoded, emitted once the image can be shown in place of its placeholder."""
+
+    thumbnail = Signal(object)
+    """NewTab object for which a reduced resolution version of its image has been decoded, shown until the image has
+    been decoded.
+    
+    Only emitted when loading large JPEG images.
+    
+    """
+
+    preview = Signal(object, object, object)
+    """NewTab object for which a provisional colour palette has been generated, the colours in the provisional colour
+    palette and their relative frequencies.
+    
+    Only emitted when the colour palette of a large image is generated progressively.
+    
+    """
+
+
+class SignalProgressReporter(ProgressReporter):
+    """Qt implementation of :class:`ProgressReporter` used to update the GUI while an algorithm is running.
+
+    The progress is emitted with the tab of the image being analysed, and the execution status is taken from the
+    image's :class:`ImageData` object (set to False when the user cancels the colour palette generation). As each
+    emitted signal is queued in the GUI's event loop, the progress reporter should be wrapped by a
+    :class:`colourpaletteextractor.model.progressreporter.ThrottledProgressReporter`.
+
+    Args:
+        progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI.
+        tab (NewTab): The tab associated with the image being analysed.
+        image_data (ImageData): `ImageData` object that holds the image being analysed.
+    """
+
+    def __init__(self, progress_callback: SignalInstance, tab: NewTab, image_data: ImageData):
+        self._progress_callback = progress_callback
+        self._tab = tab
+        self._image_data = image_data
+
+    def report_progress(self, percent: float) -> None:
+        """Emit the progress of the algorithm to the GUI.
+
+        Args:
+            percent (float): The percentage of the algorithm that has been completed.
+        """
+
+        self._progress_callback.emit(self._tab, percent)
+
+    @property
+    def continue_thread(self) -> bool:
+        """Specify if the algorithm should continue running.
+
+        Returns:
+            (bool): True if the algorithm should continue. False if it should be cancelled.
+        """
+
+        return self._image_data.continue_thread
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """The cancellation token of the image being analysed, set when the user cancels the colour palette generation.
+
+        Returns:
+            (threading.Event): The cancellation token.
+        """
+
+        return self._image_data.cancel_event
@@ -13,16 +13,233 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
 from typing import Union
 
 import numpy as np
 
 
+class CielabCubeTable:
+    """A compact table of the occupied cubes in the CIELAB colour space for an image.
+
+    Rather than one Python object per cube, the properties of the cubes are stored in contiguous, typed arrays with one
+    row per occupied cube (struct-of-arrays layout). Individual cubes can still be accessed as :class:`CielabCube`
+    objects, which act as thin views onto a single row of the table.
+
+    The cube coordinates do not refer to the actual L*, a* and b* values, but depend on the `CUBE_SIZE` specified by
+    the colour palette algorithm (in particular, any variant on the `Nieves 2020`_ algorithm).
+
+    Args:
+        coordinates (np.array): The cube coordinates ([L*, a*, b*]) of each occupied cube (one row per cube).
+        pixel_counts (np.array): The number of pixels in each cube.
+        lab_sums (np.array): The sum of the [L*, a*, b*] values of the pixels in each cube (one row per cube).
+        pixel_rows (np.array): (Optional) The row of the table that each pixel in the image has been assigned to.
+        lab (np.array): (Optional) The image in the CIELAB colour space (one row per pixel).
+        c_stars (np.array): (Optional) The C* values corresponding to each pixel in the image.
+
+    Raises:
+        ValueError: If the number of rows in the provided arrays do not match.
+
+    .. _Nieves 2020:
+       https://doi.org/10.1364/AO.378659
+    """
+
+    def __init__(self, coordinates: np.array, pixel_counts: np.array, lab_sums: np.array,
+                 pixel_rows: np.array = None, lab: np.array = None, c_stars: np.array = None):
+
+        if not len(coordinates) == len(pixel_counts) == len(lab_sums):
+            raise ValueError("The coordinates (" + str(len(coordinates)) + "), pixel counts ("
+                             + str(len(pixel_counts)) + ") and L*a*b* sums (" + str(len(lab_sums))
+                             + ") must have the same number of rows!")
+
+        num_cubes = len(coordinates)
+
+        self._coordinates = np.asarray(coordinates, dtype=np.int64)
+        self._pixel_counts = np.asarray(pixel_counts, dtype=np.int64)
+        self._lab_sums = np.asarray(lab_sums, dtype=np.float64)
+
+        self._mean_colours = np.zeros([num_cubes, 3])  # Mean colour of each cube
+        self._relevant = np.zeros(num_cubes, dtype=bool)  # Cubes are initially not considered to be relevant colours
+        self._pixel_counts_after_reassignment = np.zeros(num_cubes, dtype=np.int64)
+
+        # References to the per-pixel data (used to obtain the pixels of an individual cube on request)
+        self._pixel_rows = pixel_rows
+        self._lab = lab
+        self._c_stars = c_stars
+
+    def __len__(self) -> int:
+        return len(self._coordinates)
+
+    def __getitem__(self, index: int) -> CielabCube:
+        if not -len(self) <= index < len(self):
+            raise IndexError("Cube index " + str(index) + " is out of range for a table of "
+                             + str(len(self)) + " cubes!")
+        return CielabCube(self, index % len(self))
+
+    @property
+    def coordinates(self) -> np.array:
+        """The coordinates of each cube ([L*, a*, b*], one row per cube).
+
+        Returns:
+            (np.array): The cube coordinates.
+        """
+
+        return self._coordinates
+
+    @property
+    def pixel_counts(self) -> np.array:
+        """The number of pixels assigned to each cube.
+
+        Returns:
+            (np.array): The number of pixels in each cube.
+        """
+
+        return self._pixel_counts
+
+    @property
+    def lab_sums(self) -> np.array:
+        """The sum of the [L*, a*, b*] values of the pixels in each cube (one row per cube).
+
+        Returns:
+            (np.array): The L*a*b* sums of each cube.
+        """
+
+        return self._lab_sums
+
+    @property
+    def mean_colours(self) -> np.array:
+        """The mean colour of the pixels in each cube as [L*,a*,b*] triplets (one row per cube).
+
+        Returns:
+            (np.array): The mean colour of each cube.
+        """
+
+        return self._mean_colours
+
+    @property
+    def relevant(self) -> np.array:
+        """The relevancy status of each cube.
+
+        Returns:
+            (np.array): Boolean array that is True for each relevant cube.
+        """
+
+        return self._relevant
+
+    @relevant.setter
+    def relevant(self, value: np.array) -> None:
+        self._relevant[:] = value
+
+    @property
+    def pixel_counts_after_reassignment(self) -> np.array:
+        """The number of pixels in the recoloured image with each cube's mean colour.
+
+        Returns:
+            (np.array): The number of pixels with each cube's mean colour.
+        """
+
+        return self._pixel_counts_after_reassignment
+
+    @pixel_counts_after_reassignment.setter
+    def pixel_counts_after_reassignment(self, value: np.array) -> None:
+        self._pixel_counts_after_reassignment[:] = value
+
+    def copy(self) -> CielabCubeTable:
+        """Get a new table of the same cubes, with the relevancy status and recoloured pixel counts reset.
+
+        The cube coordinates, pixel counts, L*a*b* sums and per-pixel data are shared with this table (not copied).
+
+        Returns:
+            (CielabCubeTable): The new table of cubes.
+        """
+
+        return CielabCubeTable(coordinates=self._coordinates,
+                               pixel_counts=self._pixel_counts,
+                               lab_sums=self._lab_sums,
+                               pixel_rows=self._pixel_rows,
+                               lab=self._lab,
+                               c_stars=self._c_stars)
+
+    def calculate_mean_colours(self) -> None:
+        """Calculate the mean colour of the pixels in each cube.
+
+        Nothing is calculated for cubes with no pixels.
+        """
+
+        occupied = self._pixel_counts != 0
+        self._mean_colours[occupied] = self._lab_sums[occupied] / self._pixel_counts[occupied, np.newaxis]
+
+    def get_pixels(self, index: int) -> np.array:
+        """Get the pixels ([L*, a*, b*] triplets) assigned to the cube in the given row.
+
+        Args:
+            index (int): The row of the cube in the table.
+
+        Returns:
+            (np.array): The pixels in the cube (one row per pixel).
+
+        Raises:
+            ValueError: If the table does not hold references to the per-pixel data.
+        """
+
+        return self._lab[self._get_pixel_mask(index)]
+
+    def get_c_stars(self, index: int) -> np.array:
+        """Get the C* (chroma, relative saturation) values of the pixels assigned to the cube in the given row.
+
+        Args:
+            index (int): The row of the cube in the table.
+
+        Returns:
+            (np.array): The C* values of the pixels in the cube.
+
+        Raises:
+            ValueError: If the table does not hold references to the per-pixel data.
+        """
+
+        return self._c_stars[self._get_pixel_mask(index)]
+
+    def get_cubes(self, indices: np.array = None) -> list[CielabCube]:
+        """Get a list of :class:`CielabCube` views onto the rows of the table.
+
+        Args:
+            indices (np.array): (Optional) The rows of the cubes to return. By default all cubes are returned.
+
+        Returns:
+            (list[CielabCube]): The list of cubes.
+        """
+
+        if indices is None:
+            indices = range(len(self))
+
+        return [CielabCube(self, int(index)) for index in indices]
+
+    def _get_pixel_mask(self, index: int) -> np.array:
+        """Get a boolean mask of the pixels assigned to the cube in the given row.
+
+        Args:
+            index (int): The row of the cube in the table.
+
+        Returns:
+            (np.array): Boolean array that is True for each pixel in the cube.
+
+        Raises:
+            ValueError: If the table does not hold references to the per-pixel data.
+        """
+
+        if self._pixel_rows is None or self._lab is None or self._c_stars is None:
+            raise ValueError("The CIELAB cube table does not hold references to the pixels of the image!")
+
+        return self._pixel_rows == index
+
+
 class CielabCube:
     """A cube representing a fixed region in the CIELAB colour space.
 
     The cube is used to hold pixels in an image that exist within the cube's region of the CIELAB colour space. The
-    input parameters do not refer to the actual L*, a* and b* values, but depend on the `CUBE_SIZE` specified by the
+    cube itself is a thin view onto a single row of a :class:`CielabCubeTable`, where its properties are stored. The
+    cube's coordinates do not refer to the actual L*, a* and b* values, but depend on the `CUBE_SIZE` specified by the
     colour palette algorithm (in particular, any variant on the `Nieves 2020`_ algorithm).
 
     In the case of the :class:`nieves2020.Nieves2020CentredCubes` algorithm, the coordinates refer to the centre of the
@@ -30,30 +247,37 @@ class CielabCube:
     closest to the origin.
 
     Args:
-        l_star_coord (int): Perceptual lightness cube coordinate
-        a_star_coord (int): Green-red cube coordinate
-        b_star_coord (int): Blue-yellow cube coordinate
+        table (CielabCubeTable): The table holding the cube's properties.
+        index (int): The row of the cube in the table.
 
     .. _Nieves 2020:
        https://doi.org/10.1364/AO.378659
     """
 
-    def __init__(self, l_star_coord: int, a_star_coord: int, b_star_coord: int):
+    def __init__(self, table: CielabCubeTable, index: int):
 
-        self._l_star_coord = l_star_coord
-        self._a_star_coord = a_star_coord
-        self._b_star_coord = b_star_coord
+        self._table = table
+        self._index = index
 
-        self._coordinates = np.array([self._l_star_coord, self._a_star_coord, self._b_star_coord])
+    @property
+    def table(self) -> CielabCubeTable:
+        """The table holding the cube's properties.
 
-        self._pixels = []  # List of pixels
+        Returns:
+            (CielabCubeTable): The table holding the cube's properties.
+        """
 
-        self._pixel_count_after_reassignment = 0  #
+        return self._table
 
-        self._mean_colour = np.empty([3])  # Mean colour of cube
-        self._c_stars = []  # List of C* values for pixels in the cube
+    @property
+    def index(self) -> int:
+        """The row of the cube in its table.
 
-        self._relevant = False  # Cube is initially not considered to be a relevant colour
+        Returns:
+            (int): The row of the cube in its table.
+        """
+
+        return self._index
 
     @property
     def pixel_count_after_reassignment(self) -> int:
@@ -63,22 +287,32 @@ class CielabCube:
             (int): The number of pixels with the cube's mean colour.
         """
 
-        return self._pixel_count_after_reassignment
+        return int(self._table.pixel_counts_after_reassignment[self._index])
 
     def increment_pixel_count_after_reassignment(self) -> None:
         """Increase the number of pixels with this cube's mean colour by one."""
 
-        self._pixel_count_after_reassignment += 1
+        self._table.pixel_counts_after_reassignment[self._index] += 1
+
+    @property
+    def pixel_count(self) -> int:
+        """The number of pixels assigned to the cube.
+
+        Returns:
+            (int): The number of pixels in the cube.
+        """
+
+        return int(self._table.pixel_counts[self._index])
 
     @property
-    def pixels(self) -> list[np.array]:
-        """The list of pixels ([L*, a*, b*] triplets) in the cube.
+    def pixels(self) -> np.array:
+        """The pixels ([L*, a*, b*] triplets) in the cube.
 
         Returns:
-            (list[np.array]): The list of pixels in the cube.
+            (np.array): The pixels in the cube (one row per pixel).
         """
 
-        return self._pixels
+        return self._table.get_pixels(self._index)
 
     @property
     def coordinates(self) -> np.array:
@@ -92,7 +326,7 @@ class CielabCube:
             (np.array): The cube's coordinates.
         """
 
-        return self._coordinates
+        return self._table.coordinates[self._index]
 
     @property
     def mean_colour(self) -> np.array:
@@ -102,7 +336,7 @@ class CielabCube:
             (np.array): The mean colour of the cube as a [L*,a*,b*] triplet.
         """
 
-        return self._mean_colour
+        return self._table.mean_colours[self._index]
 
     def calculate_mean_colour(self) -> None:
         """Calculate the mean colour of the pixels in the cube.
@@ -110,9 +344,9 @@ class CielabCube:
         Nothing is calculated if the number of pixels in the cube is equal to 0.
         """
 
-        pixel_array = np.array(self._pixels)  # Convert from a list to a Numpy array
-        if pixel_array.size != 0:
-            self._mean_colour = pixel_array.mean(axis=0)
+        pixel_count = self._table.pixel_counts[self._index]
+        if pixel_count != 0:
+            self._table.mean_colours[self._index] = self._table.lab_sums[self._index] / pixel_count
 
     @property
     def relevant(self) -> bool:
@@ -122,11 +356,11 @@ class CielabCube:
             (bool): True if the cube is a relevant cube. Otherwise False.
         """
 
-        return self._relevant
+        return bool(self._table.relevant[self._index])
 
     @relevant.setter
     def relevant(self, value: bool) -> None:
-        self._relevant = value
+        self._table.relevant[self._index] = value
 
     @property
     def l_stars(self) -> np.array:
@@ -136,21 +370,20 @@ class CielabCube:
             (np.array): Array of L* values for all pixels in the cube.
         """
 
-        pixel_array = np.array(self._pixels)
-        return pixel_array[:, 0]  # First column of each row representing a pixel
+        return self.pixels[:, 0]  # First column of each row representing a pixel
 
     @property
-    def c_stars(self) -> list[np.float64]:
+    def c_stars(self) -> np.array:
         """The C* (chroma, relative saturation) values for all of the pixels in the cube.
 
         .. math::
-            C^{*} = \sqrt{{a^{*}}^{2} + {b^{*}}^{2}}
+            C^{*} = \\sqrt{{a^{*}}^{2} + {b^{*}}^{2}}
 
         Returns:
-            (list[np.float64]): The list of C* values for all pixels in the cube.
+            (np.array): Array of C* values for all pixels in the cube.
         """
 
-        return self._c_stars
+        return self._table.get_c_stars(self._index)
 
     def get_l_star_percentile_value(self, percentile: float) -> Union[int, np.percentile]:
         """Returns the L* value for the given percentile based on the pixels in the cube.
@@ -163,8 +396,7 @@ class CielabCube:
                 value is 0.
         """
 
-        pixel_array = np.array(self._pixels)
-        l_stars_array = pixel_array[:, 0]  # First column of each row representing a pixel
+        l_stars_array = self.l_stars
 
         if l_stars_array.size != 0:
             return np.percentile(l_stars_array, percentile)
@@ -182,24 +414,13 @@ class CielabCube:
                 value is 0.
         """
 
-        c_stars_array = np.array(self._c_stars)
+        c_stars_array = self.c_stars
 
         if c_stars_array.size != 0:
             return np.percentile(c_stars_array, percentile)
         else:
             return 0
 
-    def add_pixel_to_cube(self, pixel: np.array, c_star: np.float64) -> None:
-        """Assign a pixel to the cube.
-
-        Args:
-            pixel (np.array): The pixel as a [L*,a*,b*] triplet.
-            c_star (np.float64): The C* (chroma, relative saturation) value for the pixel.
-        """
-
-        self._pixels.append(pixel)
-        self._c_stars.append(c_star)
-
 
 def get_relative_frequencies(relevant_cubes: list[CielabCube], total_pixels: int) -> list[float]:
     """Calculate the relative frequency of each colour (relevant colour) in the recoloured image.
@@ -18,18 +18,29 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from skimage import color
-from skimage import img_as_ubyte
+from skimage import img_as_float, img_as_ubyte
 import time
+from typing import TYPE_CHECKING
 
 import colourpaletteextractor.model.algorithms.cielabcube as cielabcube
 import colourpaletteextractor.model.algorithms.palettealgorithm as palettealgorithm
 
 from colourpaletteextractor import _settings
 
+if TYPE_CHECKING:
+    from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+    from colourpaletteextractor.model.tiledimage import TiledImage
+
+
+class NoRelevantCubesError(ValueError):
+    """Raised when none of the cubes of an image meet the relevancy requirements, so no colour palette is found."""
+
+
 class Nieves2020(palettealgorithm.PaletteAlgorithm, ABC):
     """Abstract class representing an algorithm to extract the colour palette from an image.
 
@@ -57,6 +68,34 @@ class Nieves2020(palettealgorithm.PaletteAlgorithm, ABC):
     MIN_L_STAR = 80
     """Minimum L* value for secondary relevancy requirements (units)."""
 
+    # Default execution constants
+    RECOLOUR_CHUNK_BYTES = 64 * 1024 ** 2
+    """Maximum memory (bytes) used per chunk of pixels when searching for the closest relevant colour (64 MiB)."""
+
+    UNIQUE_COLOURS = False
+    """Generate the colour palette from the image's unique colours, weighted by the number of times they occur."""
+
+    DENSE_COLOUR_HISTOGRAM_MIN_PIXELS = 2 ** 22
+    """Minimum number of pixels in an RGB image for its unique colours to be counted with a dense 24-bit histogram."""
+
+    DENSE_CUBE_GRID_MAX_CELLS = 2 ** 20
+    """Maximum number of cells in the grid of cubes for the pixels in every cell to be counted with a dense array."""
+
+    WORKERS = 1
+    """Number of threads used to generate the colour palette of an image."""
+
+    SINGLE_PRECISION = False
+    """Store the image in the CIELAB colour space and its C* values as 32-bit floats rather than 64-bit floats."""
+
+    PEAK_BYTES_PER_PIXEL = 48
+    """Estimate of the peak memory (bytes) used per pixel (measured as 44 bytes for a 21 megapixel photograph)."""
+
+    SINGLE_PRECISION_PEAK_BYTES_PER_PIXEL = 32
+    """Estimate of the peak memory (bytes) used per pixel when using single precision (measured as 28 bytes)."""
+
+    CUBE_PEAK_BYTES = 512
+    """Estimate of the peak memory (bytes) used per cube when deciding the relevancy of the cubes (measured as 360)."""
+
     def __init__(self, name, url):
 
         super().__init__(name, url)
@@ -70,632 +109,1646 @@ class Nieves2020(palettealgorithm.PaletteAlgorithm, ABC):
         self._secondary_threshold = Nieves2020.SECONDARY_THRESHOLD
         self._min_l_star = Nieves2020.MIN_L_STAR
 
-    def generate_colour_palette(self, image: np.array) -> tuple[np.array, list[np.array], list[float]]:
-        """Generate the colour palette and the recoloured image of the provided image.
-
-        Args:
-            image (np.array): The image for which the colour palette is to be generated (in sRGB colour space).
-
-        Returns:
-            (np.array): The recoloured image using only the colours in the colour palette.
-            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
-            (list[float]): The relative frequencies of the colours in the recoloured image.
-        """
+        # Set the execution parameters for the algorithm to the default values
+        self._recolour_chunk_bytes = Nieves2020.RECOLOUR_CHUNK_BYTES
+        self._unique_colours = Nieves2020.UNIQUE_COLOURS
+        self._dense_histogram_min_pixels = Nieves2020.DENSE_COLOUR_HISTOGRAM_MIN_PIXELS
+        self._dense_cube_grid_max_cells = Nieves2020.DENSE_CUBE_GRID_MAX_CELLS
+        self._workers = Nieves2020.WORKERS
+        self._single_precision = Nieves2020.SINGLE_PRECISION
 
-        # Initial progress = 0%
-        self._set_progress(0)
-        if not self._continue_thread:
-            return None, [], []
-
-        # Convert greyscale image into an RGB image
-        if image.ndim == 2:
-            image = color.gray2rgb(image)
+        # Image binned during the last colour palette generation
+        self._binned_image = None
 
-        # Step 1: Compute L*, a*, b* and C* of each pixel (under D65 illuminant)
-        lab = convert_rgb_2_lab(image)
-        c_stars = get_c_stars(lab)
-        pixel_count = lab.size / lab.shape[2]
+        # Workspace that the per-pixel arrays are borrowed from (None to always allocate them)
+        self._workspace = None
 
-        # Progress = 5%
-        self._set_progress(5)
-        if not self._continue_thread:
-            return None, [], []
+    @property
+    def parameters(self) -> dict:
+        """Get the parameters of the algorithm that affect the generated colour palette.
 
-        # Step 2: Divide CIELAB colour space into cubes
-        cubes, cube_assignments = self._divide_cielab_space(lab, 10)  # Progress = 10%
-        if not self._continue_thread:
-            return None, [], []
+        The execution parameters that do not change the colour palette (e.g., :attr:`workers`) are not included. The
+        relevancy parameters are always given as floats, so that equal values compare (and serialise) the same.
 
-        # Steps 3-12: Determine if cube colour is relevant
-        self._assign_pixels_to_cube(lab, cubes, cube_assignments, c_stars, 25)  # Progress = 25%
-        if not self._continue_thread:
-            return None, [], []
+        Returns:
+            (dict): The names and values of the parameters.
+        """
 
-        self._set_cubes_relevance_status(cubes, pixel_count, c_stars, 40)  # Progress = 40%
-        if not self._continue_thread:
-            return None, [], []
+        return {"cube_size": self._cube_size,
+                "threshold": float(self._threshold),
+                "c_star_percentile": float(self._c_star_percentile),
+                "secondary_threshold": float(self._secondary_threshold),
+                "min_l_star": float(self._min_l_star),
+                "unique_colours": self._unique_colours,
+                "single_precision": self._single_precision}
 
-        # Step 13: Obtain relevant colours
-        relevant_cubes = self._get_relevant_cubes(cubes, 50)
-        if not self._continue_thread:
-            return None, [], []
+    @property
+    def binning_parameters(self) -> dict:
+        """Get the parameters of the algorithm that affect how the image is binned (see :meth:`bin_image`).
 
-        if _settings.__VERBOSE__:
-            print("Number of relevant colours:", len(relevant_cubes))
+        Returns:
+            (dict): The names and values of the parameters, including the name of the algorithm.
+        """
 
-        # Step 14-19: Segmenting image in terms of relevant colours
-        self._update_pixel_colours(lab, cubes, cube_assignments, relevant_cubes, 90)  # Progress = 90%
-        if not self._continue_thread:
-            return None, [], []
+        return {"algorithm": type(self).__name__,
+                "cube_size": self._cube_size,
+                "unique_colours": self._unique_colours,
+                "single_precision": self._single_precision}
 
-        # Convert image back from CIELAB back into RGB
-        recoloured_image = convert_lab_2_rgb(lab)
-        self._set_progress(95)  # Progress = 95%
-        if not self._continue_thread:
-            return None, [], []
+    @property
+    def binned_image(self) -> BinnedImage:
+        """The image binned during the last colour palette generation.
 
-        # Get colour palette as a list of rgb colours
-        colour_palette = []
-        for cube in relevant_cubes:
-            colour = convert_lab_2_rgb(cube.mean_colour)  # Scale to 8-bit
-            colour_palette.append(colour)
+        Returns:
+            (BinnedImage): The binned image, or None if no image has been binned.
+        """
 
-            if _settings.__VERBOSE__:
-                lab_mean_colour = cube.mean_colour.copy()
-                print("Cube mean CIELAB colour:", lab_mean_colour, "Cube mean sRGB colour:", colour)
+        return self._binned_image
 
-        # Progress = 97%
-        self._set_progress(97)
-        if not self._continue_thread:
-            return None, [], []
+    @property
+    def workspace(self) -> PaletteWorkspace:
+        """The workspace that the algorithm borrows its per-pixel arrays from.
 
-        # Get relative frequency of each colour
-        relative_frequencies = cielabcube.get_relative_frequencies(relevant_cubes=relevant_cubes,
-                                                                   total_pixels=int(pixel_count))
+        When generating the colour palettes of many images of the same size, the arrays used for one image (e.g., the
+        cube of each pixel and the colour palette index of each pixel) are given back to the workspace and reused for
+        the next image, rather than being allocated again. The arrays kept by the binned image (see
+        :attr:`binned_image`) are only given back by :meth:`release_binned_image`.
 
-        # Progress = 100%
-        self._set_progress(100)
+        Returns:
+            (PaletteWorkspace): The workspace, or None if the arrays are always allocated.
+        """
 
-        return recoloured_image, colour_palette, relative_frequencies
+        return self._workspace
 
-    @abstractmethod
-    def _divide_cielab_space(self, lab, final_percent) -> tuple[np.array, np.array]:
-        """Generate CIELAB cubes for the image, returning the coordinates of the cube that each pixel is to be assigned.
+    @workspace.setter
+    def workspace(self, value: PaletteWorkspace) -> None:
+        self._workspace = value
 
-        Args:
-            lab (np.array): The image in the CIELAB colour space.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+    @property
+    def cube_size(self) -> int:
+        """Delta-E* length of cube side (units).
 
         Returns:
-            (np.array): Array of :class:`cielabcube.CielabCube` objects for pixels to be assigned to.
-            (np.array): Array of cube coordinates corresponding to each pixel in the image.
+            (int): The cube size.
         """
 
-        pass
+        return self._cube_size
 
-    def _assign_pixels_to_cube(self, lab: np.array, cubes: np.array, cube_assignments: np.array,
-                               c_stars: np.array, final_percent: int) -> None:
-        """Add each pixel to their assigned CIELAB cube.
+    @cube_size.setter
+    def cube_size(self, value: int) -> None:
+        if value <= 0:
+            raise ValueError("The cube size must be greater than 0 (value of " + str(value) + " provided)!")
+        self._cube_size = value
 
-        Args:
-            lab (np.array): The image in the CIELAB colour space.
-            cubes (np.array): Array of :class:`cielabcube.CielabCube` objects for pixels to be assigned to.
-            cube_assignments (np.array): Array of cube coordinates corresponding to each pixel in the image.
-            c_stars (np.array): Array of C* values corresponding to each pixel in the image.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+    @property
+    def threshold(self) -> float:
+        """Minimum proportion of the image's pixels in a cube (0.03 = 3%) for primary relevancy requirements.
+
+        Returns:
+            (float): The primary threshold.
         """
 
-        start_time = time.time()
-        rows = lab.shape[0]
-        cols = lab.shape[1]
+        return self._threshold
 
-        # Get progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, rows)
-        update_progress = 0
+    @threshold.setter
+    def threshold(self, value: float) -> None:
+        if not 0 <= value <= 1:
+            raise ValueError("The threshold must be between 0 and 1 (value of " + str(value) + " provided)!")
+        self._threshold = value
 
-        if _settings.__VERBOSE__:
-            print("Assigning each pixel to the appropriate CIELAB cube...")
+    @property
+    def secondary_threshold(self) -> float:
+        """Minimum proportion of the image's pixels in a cube for secondary relevancy requirements.
 
-        for i in range(rows):  # For each row of image
-            for j in range(cols):  # For each column of image
-                pixel = lab[i, j]
-                c_star = c_stars[i, j]
-                pixel_coordinates = cube_assignments[i, j]
-                cube = cubes[pixel_coordinates[0], pixel_coordinates[1], pixel_coordinates[2]]
-                cube.add_pixel_to_cube(pixel, c_star)
-
-            # Update progress bar (every eighth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        Returns:
+            (float): The secondary threshold.
+        """
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+        return self._secondary_threshold
 
-        if _settings.__VERBOSE__:
-            print("--- %s seconds for Python cube assignment loop ---" % (time.time() - start_time))
+    @secondary_threshold.setter
+    def secondary_threshold(self, value: float) -> None:
+        if not 0 <= value <= 1:
+            raise ValueError("The secondary threshold must be between 0 and 1 (value of " + str(value)
+                             + " provided)!")
+        self._secondary_threshold = value
 
-    def _set_cubes_relevance_status(self, cubes: np.array, pixel_count: int, c_stars: np.array,
-                                    final_percent: int) -> None:
-        """Set the relevancy status of each cube according to the requirements specified by Nieves et al. (2020).
+    @property
+    def c_star_percentile(self) -> float:
+        """x-th percentile of the image's C* values for secondary relevancy requirements.
 
-        If the cube is found to meet the relevancy requirements, it will contribute a colour towards the image's
-        colour palette.
+        Returns:
+            (float): The C* percentile.
+        """
 
-        Args:
-            cubes (np.array): Array of :class:`cielabcube.CielabCube` objects that pixels have been assigned to.
-            pixel_count (int): The number of pixels in the image.
-            c_stars (np.array): Array of C* values corresponding to each pixel in the image.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+        return self._c_star_percentile
 
-        Raises:
-            ValueError: If the number of pixels analysed does not match the total number of pixels in the image (not all
-                of the pixels have been accounted for).
-        """
+    @c_star_percentile.setter
+    def c_star_percentile(self, value: float) -> None:
+        if not 0 <= value <= 100:
+            raise ValueError("The C* percentile must be between 0 and 100 (value of " + str(value) + " provided)!")
+        self._c_star_percentile = value
 
-        # Primary relevancy variables
-        threshold_pixel_count = pixel_count * self._threshold  # Minimum number of pixels to be in a cube
+    @property
+    def min_l_star(self) -> float:
+        """Minimum L* value for secondary relevancy requirements (units).
 
-        # Secondary relevancy variables
-        c_star_image_percentile_value = np.percentile(c_stars, self._c_star_percentile)
-        secondary_threshold_pixel_count = pixel_count * self._secondary_threshold  # Secondary minimum number of pixels
+        Returns:
+            (float): The minimum L* value.
+        """
 
-        if _settings.__VERBOSE__:
-            print("Secondary pixel count threshold:", secondary_threshold_pixel_count)
+        return self._min_l_star
 
-        # Dimensions of matrix of cubes
-        l_star_dim = cubes.shape[0]
-        a_star_dim = cubes.shape[1]
-        b_star_dim = cubes.shape[2]
+    @min_l_star.setter
+    def min_l_star(self, value: float) -> None:
+        if not 0 <= value <= 100:
+            raise ValueError("The minimum L* value must be between 0 and 100 (value of " + str(value)
+                             + " provided)!")
+        self._min_l_star = value
 
-        tot_pixels = 0  # Number of pixels that have been processed. Initially 0
+    @property
+    def recolour_chunk_bytes(self) -> int:
+        """The maximum memory (bytes) used per chunk of pixels when searching for the closest relevant colour.
 
-        # Get progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, l_star_dim)
-        update_progress = 0
-
-        for i in range(l_star_dim):
-            for j in range(a_star_dim):
-                for k in range(b_star_dim):
-                    cube = cubes[i, j, k]
-
-                    # Step 4: Get cube pixel count
-                    num_pixels = len(cube.pixels)
-                    tot_pixels = tot_pixels + num_pixels  # Update current pixel count
-
-                    # Step 5: Calculate mean pixel colour (cube colour)
-                    cube.calculate_mean_colour()
-
-                    # Step 6-11: Determine if cube is relevant
-                    if num_pixels > threshold_pixel_count:  # possibly >= (pseudo-code in paper uses >)
-
-                        if _settings.__VERBOSE__:
-                            print("Cube with coordinates: " + str(cube.coordinates)
-                                  + " meets primary requirements with:", num_pixels, "out of", pixel_count, "pixels")
-
-                        cube.relevant = True
-
-                    elif num_pixels == 0:  # No pixels in cube
-                        cube.relevant = False
-
-                    else:  # Secondary relevance checks
-                        # At least 3/8% of pixels in cube have L* > 80
-                        # OR At least 3/8% of pixels in cube have C* above 50th percentile OF THE IMAGE
-
-                        # Get number of pixels in cube that meet the secondary C* requirements
-                        c_stars = cube.c_stars
-                        c_star_cube_count = np.count_nonzero(c_stars > c_star_image_percentile_value)
-
-                        # Get the number of pixels in cube that meet the secondary L* requirements
-                        l_stars = cube.l_stars
-                        l_star_cube_count = np.count_nonzero(l_stars > self._min_l_star)
-
-                        # Check if cube meets secondary relevancy requirements
-                        if c_star_cube_count > secondary_threshold_pixel_count:
-                            cube.relevant = True
-
-                            if _settings.__VERBOSE__:
-                                print("Cube below with coordinates: " + str(cube.coordinates)
-                                      + " meets secondary requirements for C*...")
-                                print("----C* cube count:", c_star_cube_count,
-                                      "; L* cube count:", l_star_cube_count,
-                                      "; Threshold pixel count:", threshold_pixel_count,
-                                      "; Secondary threshold pixel count", secondary_threshold_pixel_count,
-                                      "; Number of pixels:", num_pixels, "out of", pixel_count)
-
-                        elif l_star_cube_count > secondary_threshold_pixel_count:
-                            cube.relevant = True
-
-                            if _settings.__VERBOSE__:
-                                print("Cube below with coordinates: " + str(cube.coordinates)
-                                      + " meets tertiary requirements for L*...")
-                                print("----C* cube count:", c_star_cube_count,
-                                      "; L* cube count:", l_star_cube_count,
-                                      "; Threshold pixel count:", threshold_pixel_count,
-                                      "; Secondary threshold pixel count", secondary_threshold_pixel_count,
-                                      "; Number of pixels:", num_pixels, "out of", pixel_count)
-
-                        else:
-                            cube.relevant = False
-
-            # Update progress bar (every fourth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        Returns:
+            (int): The maximum memory used per chunk of pixels.
+        """
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+        return self._recolour_chunk_bytes
 
-        if tot_pixels != pixel_count:
-            raise ValueError("Not all of the pixels have been accounted for!",
-                             tot_pixels, "analysed out of", str(pixel_count) + ".")
+    @recolour_chunk_bytes.setter
+    def recolour_chunk_bytes(self, value: int) -> None:
+        if value <= 0:
+            raise ValueError("The memory limit for each chunk of pixels must be greater than 0 bytes (value of "
+                             + str(value) + " provided)!")
+        self._recolour_chunk_bytes = value
 
-    def _get_relevant_cubes(self, cubes: np.array, final_percent: int):
-        """Get the list of the relevant cubes.
+    @property
+    def unique_colours(self) -> bool:
+        """Specify if the colour palette is generated from the image's unique colours rather than from every pixel.
 
-        Args:
-            cubes (np.array): Array of :class:`cielabcube.CielabCube` objects that pixels have been assigned to.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+        In this mode, the image is collapsed to its distinct colours and the number of times each one occurs. Only
+        those colours are converted to the CIELAB colour space, assigned to cubes and recoloured, with each colour
+        weighted by its number of occurrences. The results are then scattered back to the pixels of the image. As
+        photographs rarely contain more than a few hundred thousand distinct colours, this is much faster for large
+        images and produces the same colour palette and relative frequencies.
 
         Returns:
-            list(cielabcube.CielabCube): List of relevant cubes.
-
-        Raises:
-            ValueError: If no relevant cubes are found.
+            (bool): True if the colour palette is generated from the image's unique colours. Otherwise False.
         """
 
-        relevant_cubes = []
-        num_relevant_cubes = 0
+        return self._unique_colours
 
-        l_star_dim = cubes.shape[0]
-        a_star_dim = cubes.shape[1]
-        b_star_dim = cubes.shape[2]
+    @unique_colours.setter
+    def unique_colours(self, value: bool) -> None:
+        self._unique_colours = value
 
-        # Getting progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, l_star_dim)
-        update_progress = True
+    @property
+    def dense_cube_grid_max_cells(self) -> int:
+        """The maximum number of cells in the grid of cubes for the pixels in every cell to be counted.
 
-        for i in range(l_star_dim):
-            for j in range(a_star_dim):
-                for k in range(b_star_dim):
-                    cube = cubes[i, j, k]
+        Larger grids (e.g., for small cube sizes or images with a wide gamut) only store the occupied cubes.
 
-                    if cube.relevant:
-                        relevant_cubes.append(cube)
-                        num_relevant_cubes += 1
+        Returns:
+            (int): The maximum number of cells.
+        """
 
-            # Update progress bar (every eighth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        return self._dense_cube_grid_max_cells
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+    @dense_cube_grid_max_cells.setter
+    def dense_cube_grid_max_cells(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("The maximum number of cells in the grid of cubes cannot be negative (value of "
+                             + str(value) + " provided)!")
+        self._dense_cube_grid_max_cells = value
 
-        # Check that at least one relevant cube has been found
-        if num_relevant_cubes > 0:
-            return relevant_cubes
-        else:
-            raise ValueError("No relevant cubes found!")
+    @property
+    def workers(self) -> int:
+        """The number of threads used to generate the colour palette of an image.
 
-    def _update_pixel_colours(self, lab: np.array, cubes: np.array, cube_assignments: np.array,
-                              relevant_cubes: list[cielabcube.CielabCube], final_percent: int) -> None:
-        """Update the colours in the image using the mean colours from the cubes that are deemed to be relevant.
+        With more than one worker, the image is split into bands of rows (or chunks of pixels) for the stages that
+        are carried out independently for each pixel: counting the unique colours of the image (merged from the
+        counts of each band), the conversion to the CIELAB colour space, the search for the closest relevant colour
+        and building the index map. The per-cube sums and counts are calculated by the workers for chunks of pixels
+        whose size does not depend on the number of workers (:const:`COUNT_CHUNK_SIZE`), and the results of the chunks
+        are added together in the order of the chunks (see :func:`reduce_in_order`). The floating point sums are
+        therefore bit-identical, and the colour palette identical, for any number of workers.
 
-        Args:
-            lab (np.array): The image in the CIELAB colour space.
-            cubes (np.array): Array of :class:`cielabcube.CielabCube` objects that pixels have been assigned to.
-            cube_assignments (np.array): Array of cube coordinates corresponding to each pixel in the image.
-            relevant_cubes(list(cielabcube.CielabCube): List of relevant cubes.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+        Returns:
+            (int): The number of threads.
         """
 
-        # Get array of relevant_cube mean colours
-        relevant_cubes_mean_colours = []
-        for cube in relevant_cubes:
-            relevant_cubes_mean_colours.append(cube.mean_colour)
-        relevant_cubes_mean_colours = np.array(relevant_cubes_mean_colours)
+        return self._workers
 
-        start_time = time.time()
-        rows = lab.shape[0]
-        cols = lab.shape[1]
+    @workers.setter
+    def workers(self, value: int) -> None:
+        if value < 1:
+            raise ValueError("The number of workers must be at least 1 (value of " + str(value) + " provided)!")
+        self._workers = value
 
-        # Get progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, rows)
-        update_progress = 0
+    @property
+    def single_precision(self) -> bool:
+        """Specify if the image is stored in the CIELAB colour space (with its C* values) as 32-bit floats.
 
-        if _settings.__VERBOSE__:
-            print("Updating pixel colours...")
+        This halves the memory used by the largest arrays of the algorithm (the L*, a*, b* and C* values of each pixel
+        are kept for as long as the binned image, see :class:`BinnedImage`) and the search for the closest relevant
+        colour of each pixel is also carried out in single precision. The L*, a* and b* sums of each cube are still
+        accumulated as 64-bit floats.
 
-        # Update each pixel's colour
-        for i in range(rows):  # For each row of image
-            for j in range(cols):  # For each column of image
-                pixel_coordinates = cube_assignments[i, j]
+        For a 21 megapixel photograph, the peak memory used to generate the colour palette falls from 64 to 38 bytes
+        per pixel.
 
-                # Check if pixel is in the relevant cube by finding the
-                # cube it was assigned to and checking if it is a relevant cube
-                cube = cubes[pixel_coordinates[0], pixel_coordinates[1], pixel_coordinates[2]]
+        The colour palette can differ slightly from the one generated with 64-bit floats, as pixels on the boundary of
+        a cube (or equidistant from two relevant colours) may be assigned differently. For the bundled sample images
+        (with cube sizes of 5, 10 and 20), the same cubes are relevant and the colour palettes have the same 8-bit
+        colours, with a maximum delta-E (CIE76) of 0.00001 between the mean colours of the relevant cubes and a
+        maximum difference in relative frequency of 0.000001 (a single pixel).
 
-                if cube.relevant:
-                    lab[i, j] = cube.mean_colour  # Assign cube's mean colour
-                    cube.increment_pixel_count_after_reassignment()  # Increase count of pixels with this colour by one
-                else:
-                    # Calculate closest relevant cube and use the mean colour for the pixel
-                    pixel = np.full((relevant_cubes_mean_colours.shape[0], lab.shape[2]), lab[i, j])
-                    euclidean_distances = np.linalg.norm(pixel - relevant_cubes_mean_colours, axis=1)
-                    min_distance_index = np.argmin(euclidean_distances)  # If there is a tie, the first colour is chosen
-
-                    # Update pixel's colour with the closest colour
-                    new_pixel_colour = relevant_cubes_mean_colours[min_distance_index]
-                    lab[i, j] = new_pixel_colour
-                    relevant_cubes[min_distance_index] \
-                        .increment_pixel_count_after_reassignment()  # Increase count of pixels with this colour by one
-
-            # Update progress bar (every eighth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        Returns:
+            (bool): True if 32-bit floats are used. Otherwise False.
+        """
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+        return self._single_precision
 
-        if _settings.__VERBOSE__:
-            print("--- %s seconds for Python pixel colour update loop ---" % (time.time() - start_time))
+    @single_precision.setter
+    def single_precision(self, value: bool) -> None:
+        self._single_precision = value
 
+    @property
+    def lab_dtype(self) -> np.dtype:
+        """The floating point type used to store the image in the CIELAB colour space (see :attr:`single_precision`).
 
-class Nieves2020OffsetCubes(Nieves2020):
-    """Subclass of :class:`Nieves2020` with the cube coordinates corresponding to the cube's corner closest the origin.
+        Returns:
+            (np.dtype): float32 if using single precision. Otherwise float64.
+        """
 
-    As a result, there are eight cube that touch the origin in the CIELAB colour space.
-    """
+        return np.dtype(np.float32 if self._single_precision else np.float64)
 
-    NAME = "Nieves, Gomez-Robledo, Chen and Romero (2020) - Cube corners at CIELAB origin"
-    """Name of the algorithm."""
+    def estimate_peak_bytes(self, shape: tuple) -> int:
+        """Estimate the peak memory used to generate the colour palette of an image, excluding the image itself.
 
-    URL = "https://doi.org/10.1364/AO.378659"
-    "Link to more information about the algorithm."
+        The per-pixel arrays (see :attr:`PEAK_BYTES_PER_PIXEL` and :attr:`SINGLE_PRECISION_PEAK_BYTES_PER_PIXEL`) are
+        added to the memory used per chunk when recolouring the image (see :attr:`recolour_chunk_bytes`).
 
-    def __init__(self):
-        """Constructor."""
-        super().__init__(Nieves2020OffsetCubes.NAME, Nieves2020OffsetCubes.URL)
+        Args:
+            shape (tuple): The shape of the image.
 
-    def _get_cube_assignments(self, lab: np.array) -> np.array:
-        """Get an array of cube coordinates corresponding to each pixel's assignment.
+        Returns:
+            (int): The estimated peak memory (bytes).
+        """
 
-        * Divide each pixel's L*, a*, and b* value by :attr:`Nieves2020.CUBE_SIZE` (20), returning
-        the number of times each value fits completely with no remainder (floor divide).
+        bytes_per_pixel = Nieves2020.SINGLE_PRECISION_PEAK_BYTES_PER_PIXEL if self._single_precision \
+            else Nieves2020.PEAK_BYTES_PER_PIXEL
+        return bytes_per_pixel * shape[0] * shape[1] + self._recolour_chunk_bytes
+
+    def estimate_peak_bytes_from_binned_image(self, binned_image: BinnedImage) -> int:
+        """Estimate the peak memory used to generate the colour palette of an image that has already been binned.
+
+        Only the palette index of each entry of the binned image (see :attr:`BinnedImage.lab`), the index map and the
+        memory used per chunk when recolouring the image (see :attr:`recolour_chunk_bytes`) are needed, as the binned
+        image itself is already held (see :meth:`generate_colour_palette_index_map_from_binned_image`).
 
         Args:
-            lab (np.array): The image in the CIELAB colour space.
+            binned_image (BinnedImage): The image binned by :meth:`bin_image`.
 
         Returns:
-            (np.array): Array of cube coordinates corresponding to each pixel in the image.
+            (int): The estimated peak memory (bytes).
         """
-        # Calculate how many cubes to generate
-        return (np.floor_divide(lab, self._cube_size)).astype(int)  # Cube coordinates for each pixel
 
-    def _divide_cielab_space(self, lab: np.array, final_percent: int) -> Optional[tuple[np.array, np.array]]:
-        """Generate CIELAB cubes for the image, returning the coordinates of the cube that each pixel is to be assigned.
+        entry_count = binned_image.cube_rows.shape[0]
+        index_bytes = np.dtype(np.uint16).itemsize  # Palettes of more than 2 ** 16 colours are not expected
+        return ((np.dtype(np.int32).itemsize + index_bytes) * entry_count + index_bytes * binned_image.pixel_count
+                + Nieves2020.CUBE_PEAK_BYTES * len(binned_image.cubes) + self._recolour_chunk_bytes)
 
-        Returns none if the thread created to generate the colour palette is cancelled.
+    def generate_colour_palette(self, image: np.array) -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the recoloured image of the provided image.
+
+        The recoloured image is built from the index map of the image (see
+        :meth:`generate_colour_palette_index_map`).
 
         Args:
-            lab (np.array): The image in the CIELAB colour space.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+            image (np.array): The image for which the colour palette is to be generated (in sRGB colour space).
 
         Returns:
-            (np.array): Array of :class:`cielabcube.CielabCube` objects for pixels to be assigned to.
-            (np.array): Array of cube coordinates corresponding to each pixel in the image.
+            (np.array): The recoloured image using only the colours in the colour palette.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
         """
 
-        # Calculate how many cubes to generate
-        cube_assignments = self._get_cube_assignments(lab)  # Cube coordinates for each pixel
+        index_map, colour_palette, relative_frequencies = self.generate_colour_palette_index_map(image)
+        if index_map is None:
+            return None, [], []
 
-        # Check extent of cube generation
-        l_star_max = cube_assignments[:, :, 0].max()
-        l_star_min = 0  # l_star_min is always 0
-        a_star_max = cube_assignments[:, :, 1].max()
-        a_star_min = cube_assignments[:, :, 1].min()
-        b_star_max = cube_assignments[:, :, 2].max()
-        b_star_min = cube_assignments[:, :, 2].min()
+        recoloured_image = palettealgorithm.get_recoloured_image(index_map, colour_palette)
+        return recoloured_image, colour_palette, relative_frequencies
 
-        if _settings.__VERBOSE__:
-            print("l* range: " + str(l_star_min) + "," + str(l_star_max))
-            print("a* range: " + str(a_star_min) + "," + str(a_star_max))
-            print("b* range: " + str(b_star_min) + "," + str(b_star_max))
+    def generate_colour_palette_index_map(self, image: np.array) -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the palette index map of the provided image.
 
-        # Make sure ranges are valid and always include 0 in the range
-        if a_star_min > 0:
-            a_star_min = 0
-        if b_star_min > 0:
-            b_star_min = 0
-        if a_star_max < 0:
-            a_star_max = 0
-        if b_star_max < 0:
-            b_star_max = 0
+        Only the colours in the colour palette are converted back into the sRGB colour space.
 
-        # Ranges for each component
-        l_star_range = l_star_max - l_star_min + 1
-        a_star_range = a_star_max - a_star_min + 1
-        b_star_range = b_star_max - b_star_min + 1
+        Args:
+            image (np.array): The image for which the colour palette is to be generated (in sRGB colour space).
 
-        # Get progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, l_star_range)
-        update_progress = 0
-
-        # Generate required cubes and adding them to the 3D array of cubes
-        cubes = np.empty([l_star_range, a_star_range, b_star_range], dtype=cielabcube.CielabCube)
-        for l_star in range(l_star_min, l_star_max + 1):
-            for a_star in range(a_star_min, a_star_max + 1):
-                for b_star in range(b_star_min, b_star_max + 1):
-
-                    # Generate new cube
-                    cubes[l_star, a_star, b_star] = cielabcube.CielabCube(l_star, a_star, b_star)
-                    # This approach works as negative l_Star will be assigned to the far right of the cube and work back
-
-            # Update progress bar (every eighth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        Returns:
+            (np.array): The index of the colour in the colour palette for each pixel in the image.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
+        """
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+        binned_image = self.bin_image(image)
+        if binned_image is None:
+            return None, [], []
 
-        if _settings.__VERBOSE__:
-            print(cubes.size, "CIELAB cubes generated...")
+        return self.generate_colour_palette_index_map_from_binned_image(binned_image)
 
-        return cubes, cube_assignments
+    def bin_image(self, image: np.array) -> BinnedImage:
+        """Convert the provided image to the CIELAB colour space and assign its pixels to cubes.
 
+        These stages do not depend on the relevancy parameters of the algorithm, so the binned image can be used to
+        generate the colour palette again after changing them (see
+        :meth:`generate_colour_palette_index_map_from_binned_image`). The binned image is also kept by the algorithm
+        (see :attr:`binned_image`).
 
-class Nieves2020CentredCubes(Nieves2020):
-    """Subclass of :class:`Nieves2020` with the cube coordinates corresponding to the centre of the cube.
+        Args:
+            image (np.array): The image for which the colour palette is to be generated (in sRGB colour space).
 
-    As a result, there is only one cube that touches the origin in the CIELAB colour space (is in fact centred on the
-     origin).
-    """
+        Returns:
+            (BinnedImage): The binned image, or None if the thread was cancelled.
+        """
 
-    NAME = "Nieves, Gomez-Robledo, Chen and Romero (2020) - Cube centred on CIELAB origin"
-    """Name of the algorithm."""
+        # Initial progress = 0%
+        self._set_progress(0)
+        if not self.continue_thread:
+            return None
 
-    URL = "https://doi.org/10.1364/AO.378659"
-    "Link to more information about the algorithm."
+        # View greyscale image as an RGB image
+        image = get_rgb_view(image)
 
-    def __init__(self):
+        # Step 1: Compute L*, a*, b* and C* of each pixel (under D65 illuminant)
+        # or, if using the unique colours of the image, of each unique colour weighted by its number of pixels
+        if self._unique_colours:
+            colours, inverse, weights = get_unique_colours(image, self._dense_histogram_min_pixels, self._workers)
+            lab = self._borrow((colours.shape[0], 3), self.lab_dtype)
+            convert_rgb_2_lab(colours[:, np.newaxis, :], workers=self._workers, dtype=self.lab_dtype, out=lab)
+        else:
+            inverse = None
+            weights = None
+            lab = self._borrow((image.shape[0] * image.shape[1], 3), self.lab_dtype)
+            convert_rgb_2_lab(image, workers=self._workers, dtype=self.lab_dtype, out=lab)
+        c_stars = get_c_stars(lab, out=self._borrow(lab.shape[:1], self.lab_dtype))
 
-        super().__init__(Nieves2020CentredCubes.NAME, Nieves2020CentredCubes.URL)
+        # Progress = 5%
+        self._set_progress(5)
+        binned_image = self._bin_lab(image.shape[:2], lab, c_stars, weights, inverse) if self.continue_thread else None
+        if binned_image is None:
+            self._give_back(lab)
+            self._give_back(c_stars)
 
-    def _get_cube_assignments(self, lab: np.array) -> np.array:
-        """Get an array of cube coordinates corresponding to each pixel's assignment.
+        return binned_image
 
-        * Temporarily round each pixel LAB value to the nearest multiple of :attr:`Nieves2020.CUBE_SIZE` (20).
-        * Divide all of these values by 20 to get each pixel's cube assignment.
+    def _bin_lab(self, shape: tuple[int, int], lab: np.array, c_stars: np.array, weights: np.array = None,
+                 inverse: np.array = None) -> BinnedImage:
+        """Assign the pixels (or unique colours) of an image in the CIELAB colour space to cubes.
 
         Args:
-            lab (np.array): The image in the CIELAB colour space.
+            shape (tuple[int, int]): The height and width of the image (pixels).
+            lab (np.array): The pixels (or unique colours) of the image in the CIELAB colour space (one row per entry).
+            c_stars (np.array): The C* value of each entry of `lab`.
+            weights (np.array): (Optional) The number of pixels represented by each entry of `lab`. By default, each
+                entry is a single pixel.
+            inverse (np.array): (Optional) The entry of `lab` corresponding to each pixel in the image.
 
         Returns:
-            (np.array): Array of cube coordinates corresponding to each pixel in the image.
+            (BinnedImage): The binned image, or None if the thread was cancelled (the arrays it borrowed from the
+                workspace are then given back, but not `lab` and `c_stars`).
         """
 
-        cube_assignments = self._cube_size * np.round(lab / self._cube_size)
-        cube_assignments = (cube_assignments / self._cube_size).astype(int)
-        return cube_assignments  # Cube coordinates for each pixel
-
-    def _divide_cielab_space(self, lab: np.array, final_percent: int) -> Optional[tuple[np.array, np.array]]:
-        """Generate CIELAB cubes for the image, returning the coordinates of the cube that each pixel is to be assigned.
-
-        Returns none if the thread created to generate the colour palette is cancelled.
+        # Step 2: Divide CIELAB colour space into cubes
+        cube_keys, grid_bounds = self._divide_cielab_space(lab, 10)  # Progress = 10%
+        if not self.continue_thread:
+            self._give_back(cube_keys)
+            return None
+
+        # Steps 3-5: Assign each pixel to a cube
+        cubes, cube_rows = self._assign_pixels_to_cube(lab, cube_keys, grid_bounds, c_stars,
+                                                       25, weights)  # Progress = 25%
+        self._give_back(cube_keys)
+        if not self.continue_thread:
+            self._give_back(cube_rows)
+            return None
+
+        self._binned_image = BinnedImage(binning_parameters=self.binning_parameters,
+                                         shape=shape,
+                                         lab=lab,
+                                         c_stars=c_stars,
+                                         cubes=cubes,
+                                         cube_rows=cube_rows,
+                                         weights=weights,
+                                         inverse=inverse)
+        return self._binned_image
+
+    def generate_colour_palette_index_map_tiled(self, tiled_image: TiledImage, index_map_file: str = None) \
+            -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the palette index map of an image read in tiles (out-of-core).
+
+        The image is read twice, one tile at a time, so it is never held in memory. The first pass counts the pixels of
+        each of the 2^24 possible colours. The colour palette is then generated from the image's unique colours,
+        weighted by their counts, which gives the same colour palette as :attr:`unique_colours`. The second pass looks
+        up the palette index of each pixel from its colour and writes the palette index map to a .npy file, one tile
+        at a time.
+
+        The memory used is set by the size of the tiles and the number of unique colours in the image (at most 2^24),
+        rather than the number of pixels: around 300 MiB for an image with a few hundred thousand unique colours,
+        whatever its size (see :mod:`colourpaletteextractor.benchmarks.tiledbenchmark`), compared to around 48 bytes
+        per pixel when the image is held in memory.
 
         Args:
-            lab (np.array): The image in the CIELAB colour space.
-            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+            tiled_image (TiledImage): The image (see :func:`colourpaletteextractor.model.tiledimage.open_tiled_image`).
+            index_map_file (str): (Optional) Path to the .npy file the palette index map is written to. If None, the
+                second pass is skipped and only the colour palette is generated.
 
         Returns:
-            (np.array): Array of :class:`cielabcube.CielabCube` objects for pixels to be assigned to.
-            (np.array): Array of cube coordinates corresponding to each pixel in the image.
+            (np.array): The index of the colour in the colour palette for each pixel in the image (memory-mapped from
+                `index_map_file`), or None if no file was given.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
         """
 
-        # Calculate how many cubes to generate
-        cube_assignments = self._get_cube_assignments(lab)
+        # Initial progress = 0%
+        self._set_progress(0)
+        if not self.continue_thread:
+            return None, [], []
 
-        l_star_max = cube_assignments[:, :, 0].max()
-        l_star_min = 0  # l_star_min is always 0
-        a_star_max = cube_assignments[:, :, 1].max()
-        a_star_min = cube_assignments[:, :, 1].min()
-        b_star_max = cube_assignments[:, :, 2].max()
-        b_star_min = cube_assignments[:, :, 2].min()
+        # Pass one: count the pixels of each colour
+        tile_count = max(tiled_image.tile_count, 1)
+        histogram = np.zeros(2 ** 24, dtype=np.int64)
+        for tile_number, (_, _, tile) in enumerate(tiled_image.tiles(), start=1):
+            histogram += np.bincount(pack_colours(tile.reshape(-1, 3)), minlength=histogram.size)
 
-        if _settings.__VERBOSE__:
-            print("l* range: " + str(l_star_min) + "," + str(l_star_max))
-            print("a* range: " + str(a_star_min) + "," + str(a_star_max))
-            print("b* range: " + str(b_star_min) + "," + str(b_star_max))
+            self._set_progress(5 * tile_number / tile_count)
+            if not self.continue_thread:
+                return None, [], []
 
-        # Make sure ranges are valid and always include 0 in the range
-        if a_star_min > 0:
-            a_star_min = 0
-        if b_star_min > 0:
-            b_star_min = 0
-        if a_star_max < 0:
-            a_star_max = 0
-        if b_star_max < 0:
-            b_star_max = 0
+        packed_colours = np.flatnonzero(histogram)
+        weights = histogram[packed_colours]
+        del histogram
 
-        # Ranges for each component
-        l_star_range = l_star_max - l_star_min + 1
-        a_star_range = a_star_max - a_star_min + 1
-        b_star_range = b_star_max - b_star_min + 1
+        # Compute L*, a*, b* and C* of each unique colour (weighted by its number of pixels)
+        colours = unpack_colours(packed_colours)
+        lab = self._borrow((colours.shape[0], 3), self.lab_dtype)
+        convert_rgb_2_lab(colours[:, np.newaxis, :], workers=self._workers, dtype=self.lab_dtype, out=lab)
+        c_stars = get_c_stars(lab, out=self._borrow(lab.shape[:1], self.lab_dtype))
 
-        # Get progress bar increments
-        increment_percent = self._get_increment_percent(final_percent, l_star_range)
-        update_progress = 0
-
-        # Generate required cubes and adding them to the 3D array of cubes
-        cubes = np.empty([l_star_range, a_star_range, b_star_range], dtype=cielabcube.CielabCube)
-        for l_star in range(l_star_min, l_star_max + 1):
-            for a_star in range(a_star_min, a_star_max + 1):
-                for b_star in range(b_star_min, b_star_max + 1):
-
-                    # Generate new cube
-                    cubes[l_star, a_star, b_star] = cielabcube.CielabCube(l_star, a_star, b_star)
-                    # This approach works as negative l_Star will be assigned to the far right of the cube and work back
-
-            # Update progress bar (every eighth loop to reduce GUI thread burden)
-            if update_progress == 7:
-                self._increment_progress(8 * increment_percent)
-                update_progress = 0
-                if not self._continue_thread:
-                    return
-            else:
-                update_progress += 1
+        # Progress = 5%
+        self._set_progress(5)
+        binned_image = self._bin_lab(tiled_image.shape, lab, c_stars, weights) if self.continue_thread else None
+        if binned_image is None:
+            self._give_back(lab)
+            self._give_back(c_stars)
+            return None, [], []
 
-        # Set progress bar (prevent rounding issues)
-        self._set_progress(final_percent)
+        palette_indices = None
+        try:
+            palette_indices, colour_palette, relative_frequencies = self._generate_colour_palette_from_binned_image(
+                binned_image)
+            if palette_indices is None:
+                return None, [], []
 
-        if _settings.__VERBOSE__:
-            print(cubes.size, "CIELAB cubes generated...")
+            # Pass two: look up the palette index of each pixel from its colour
+            index_map = None
+            if index_map_file is not None:
+                lookup = np.zeros(2 ** 24, dtype=palettealgorithm.get_index_map_dtype(len(colour_palette)))
+                lookup[packed_colours] = palette_indices
+                index_map = np.lib.format.open_memmap(index_map_file, mode="w+", dtype=lookup.dtype,
+                                                      shape=tiled_image.shape)
 
-        return cubes, cube_assignments
+                for tile_number, (row, column, tile) in enumerate(tiled_image.tiles(), start=1):
+                    index_map[row:row + tile.shape[0], column:column + tile.shape[1]] = \
+                        lookup[pack_colours(tile.reshape(-1, 3))].reshape(tile.shape[:2])
 
+                    self._set_progress(97 + 3 * tile_number / tile_count)
+                    if not self.continue_thread:
+                        return None, [], []
 
-def convert_rgb_2_lab(image: np.array) -> np.array:
-    """Convert an image from the sRGB colour space to the CIELAB colour space.
+                index_map.flush()
 
-    The alpha channel of the image (RGBA) is removed if present.
+        finally:
+            if palette_indices is not None:
+                self._give_back(palette_indices)
+            self.release_binned_image()  # Only the unique colours were binned, so it cannot be reused
 
-    Illuminant = D65 (name of the illuminant)
-    Observer = 2 (aperture angle of observer)
+        # Progress = 100%
+        self._set_progress(100)
 
-    Args:
-        image (np.array): The image in the sRGB colour space.
+        return index_map, colour_palette, relative_frequencies
+
+    def can_reuse_binned_image(self, binned_image: BinnedImage) -> bool:
+        """Check if the colour palette can be generated from the provided binned image.
+
+        Args:
+            binned_image (BinnedImage): The binned image.
+
+        Returns:
+            (bool): True if the image was binned by this algorithm with the same binning parameters. Otherwise False.
+        """
+
+        return binned_image is not None and not binned_image.released \
+            and binned_image.binning_parameters == self.binning_parameters
+
+    def release_binned_image(self) -> None:
+        """Give the arrays of the image binned during the last colour palette generation back to the workspace.
+
+        Used when the binned image is no longer needed (e.g., when generating the colour palettes of a batch of
+        images), so that its arrays can be reused for the next image (see :attr:`workspace`). The binned image can no
+        longer be used afterwards.
+        """
+
+        if self._binned_image is not None and self._workspace is not None:
+            self._binned_image.give_back(self._workspace)
+        self._binned_image = None
+
+    def generate_colour_palette_index_map_from_binned_image(self, binned_image: BinnedImage) \
+            -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the palette index map of an image that has already been binned.
+
+        Only the relevancy of each cube is decided and the image recoloured, using the current relevancy parameters
+        of the algorithm (:attr:`threshold`, :attr:`secondary_threshold`, :attr:`c_star_percentile` and
+        :attr:`min_l_star`). The binned image itself is left unchanged.
+
+        Args:
+            binned_image (BinnedImage): The image binned by :meth:`bin_image`.
+
+        Returns:
+            (np.array): The index of the colour in the colour palette for each pixel in the image.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
+
+        Raises:
+            ValueError: If the image was binned by a different algorithm or with different binning parameters.
+        """
+
+        if not self.can_reuse_binned_image(binned_image):
+            raise ValueError("The binned image was generated with different binning parameters ("
+                             + str(binned_image.binning_parameters) + ") to the algorithm ("
+                             + str(self.binning_parameters) + ")!")
+
+        self._binned_image = binned_image
+        palette_indices, colour_palette, relative_frequencies = self._generate_colour_palette_from_binned_image(
+            binned_image)
+        if palette_indices is None:
+            return None, [], []
+
+        # Scatter the palette indices of the unique colours back to each pixel of the image
+        index_map = palette_indices.astype(palettealgorithm.get_index_map_dtype(len(colour_palette)))
+        self._give_back(palette_indices)
+        if binned_image.inverse is not None:
+            index_map = take(index_map, binned_image.inverse, self._workers)
+        index_map = index_map.reshape(binned_image.shape)
+
+        # Progress = 100%
+        self._set_progress(100)
+
+        return index_map, colour_palette, relative_frequencies
+
+    def generate_colour_palette_sweep(self, image: np.array, cube_sizes: list[int],
+                                      thresholds: list[float]) -> list[dict]:
+        """Generate the colour palette of the provided image for every combination of cube size and threshold.
+
+        The image is collapsed to its unique colours, weighted by the number of times they occur, which are only
+        converted to the CIELAB colour space (with their C* values) once. This weighted histogram of the image's
+        distinct L*a*b* values is the finest possible histogram of the image, so each cube size is binned from it
+        exactly, and each threshold then only decides the relevancy of the cubes again (see
+        :meth:`generate_colour_palette_index_map_from_binned_image`). The colour palettes are the same as those
+        generated by :meth:`generate_colour_palette` for each combination in turn.
+
+        For a 2.3 megapixel photograph, sweeping 5 cube sizes and 5 thresholds takes around 4 seconds, compared to
+        around 22 seconds when generating each colour palette in turn (a speed-up of around 5 times, see
+        :mod:`colourpaletteextractor.benchmarks.sweepbenchmark`).
+
+        The other parameters of the algorithm (e.g., :attr:`c_star_percentile`) are kept the same for each
+        combination.
+
+        Args:
+            image (np.array): The image for which the colour palettes are to be generated (in sRGB colour space).
+            cube_sizes (list[int]): The cube sizes (delta-E* length of cube side) to be used.
+            thresholds (list[float]): The primary thresholds to be used.
+
+        Returns:
+            (list[dict]): One row for each colour of each colour palette (sorted from largest relative frequency to
+                smallest), with the cube size, threshold, rank of the colour (from 1), its red, green and blue values
+                and its relative frequency. A combination with no relevant cubes has a single row, with a rank of 0,
+                no colour (None) and a relative frequency of 0. An empty list is returned if the thread was
+                cancelled.
+
+        Raises:
+            ValueError: If a cube size or threshold is not valid.
+        """
+
+        cube_size, threshold, unique_colours = self._cube_size, self._threshold, self._unique_colours
+
+        # View greyscale image as an RGB image
+        image = get_rgb_view(image)
+
+        # Compute L*, a*, b* and C* of each unique colour once
+        colours, inverse, weights = get_unique_colours(image, self._dense_histogram_min_pixels, self._workers)
+        lab = convert_rgb_2_lab(colours[:, np.newaxis, :], workers=self._workers, dtype=self.lab_dtype).reshape(-1, 3)
+        c_stars = get_c_stars(lab)
+
+        rows = []
+        try:
+            self._unique_colours = True
+            for new_cube_size in cube_sizes:
+                self.cube_size = new_cube_size
+                binned_image = self._bin_lab(image.shape[:2], lab, c_stars, weights, inverse)
+                if binned_image is None:
+                    return []
+
+                try:
+                    for new_threshold in thresholds:
+                        self.threshold = new_threshold
+                        try:
+                            palette_indices, colour_palette, relative_frequencies = \
+                                self._generate_colour_palette_from_binned_image(binned_image)
+                        except NoRelevantCubesError:  # The remaining combinations are still generated
+                            rows.append({"cube_size": new_cube_size,
+                                         "threshold": new_threshold,
+                                         "rank": 0,
+                                         "red": None,
+                                         "green": None,
+                                         "blue": None,
+                                         "relative_frequency": 0.0})
+                            continue
+                        if palette_indices is not None:
+                            self._give_back(palette_indices)
+                        if not self.continue_thread:
+                            return []
+
+                        palette = sorted(zip(relative_frequencies, colour_palette), key=lambda pair: pair[0],
+                                         reverse=True)
+                        for rank, (relative_frequency, colour) in enumerate(palette, start=1):
+                            rows.append({"cube_size": new_cube_size,
+                                         "threshold": new_threshold,
+                                         "rank": rank,
+                                         "red": int(colour[0]),
+                                         "green": int(colour[1]),
+                                         "blue": int(colour[2]),
+                                         "relative_frequency": relative_frequency})
+                finally:
+                    self._give_back(binned_image.cube_rows)
+        finally:
+            self._cube_size, self._threshold, self._unique_colours = cube_size, threshold, unique_colours
+            self._binned_image = None  # Binned with the parameters of the last combination
+
+        return rows
+
+    def _generate_colour_palette_from_binned_image(self, binned_image: BinnedImage) \
+            -> tuple[np.array, list[np.array], list[float]]:
+        """Decide the relevancy of the cubes of a binned image and recolour the image (steps 6-19).
+
+        Args:
+            binned_image (BinnedImage): The image binned by :meth:`bin_image`.
+
+        Returns:
+            (np.array): The index of the colour in the colour palette for each entry of the binned image.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
+        """
+
+        cubes = binned_image.cubes.copy()  # Relevancy status and recoloured pixel counts for this colour palette
+
+        # Progress = 25%
+        self._set_progress(25)
+        if not self.continue_thread:
+            return None, [], []
+
+        # Steps 6-12: Determine if cube colour is relevant
+        self._set_cubes_relevance_status(binned_image, cubes, 40)  # Progress = 40%
+        if not self.continue_thread:
+            return None, [], []
+
+        # Step 13: Obtain relevant colours
+        relevant_cubes = self._get_relevant_cubes(cubes, 50)
+        if not self.continue_thread:
+            return None, [], []
+
+        if _settings.__VERBOSE__:
+            print("Number of relevant colours:", len(relevant_cubes))
+
+        # Step 14-19: Segmenting image in terms of relevant colours
+        palette_indices = self._update_pixel_colours(binned_image.lab, cubes, binned_image.cube_rows,
+                                                     relevant_cubes, 90, binned_image.weights)  # Progress = 90%
+        if palette_indices is None:
+            return None, [], []
+
+        # The palette indices are borrowed from the workspace, so are given back unless they are returned
+        completed = False
+        try:
+            if not self.continue_thread:
+                return None, [], []
+
+            # Get colour palette as a list of rgb colours
+            colour_palette = []
+            for cube in relevant_cubes:
+                colour = convert_lab_2_rgb(cube.mean_colour)  # Scale to 8-bit
+                colour_palette.append(colour)
+
+                if _settings.__VERBOSE__:
+                    lab_mean_colour = cube.mean_colour.copy()
+                    print("Cube mean CIELAB colour:", lab_mean_colour, "Cube mean sRGB colour:", colour)
+
+            # Progress = 95%
+            self._set_progress(95)
+            if not self.continue_thread:
+                return None, [], []
+
+            # Get relative frequency of each colour
+            relative_frequencies = cielabcube.get_relative_frequencies(relevant_cubes=relevant_cubes,
+                                                                       total_pixels=binned_image.pixel_count)
+
+            # Progress = 97%
+            self._set_progress(97)
+
+            completed = True
+            return palette_indices, colour_palette, relative_frequencies
+
+        finally:
+            if not completed:
+                self._give_back(palette_indices)
+
+    def _borrow(self, shape: tuple[int, ...], dtype: np.dtype) -> np.array:
+        """Borrow an array from the algorithm's workspace (see :attr:`workspace`), or allocate it if there is none.
+
+        Args:
+            shape (tuple[int, ...]): The shape of the array.
+            dtype (np.dtype): The type of the array.
+
+        Returns:
+            (np.array): The array (its values are not initialised).
+        """
+
+        if self._workspace is None:
+            return np.empty(shape, dtype=dtype)
+
+        return self._workspace.borrow(shape, dtype)
+
+    def _give_back(self, array: np.array) -> None:
+        """Give an array that is no longer needed back to the algorithm's workspace (see :attr:`workspace`).
+
+        Args:
+            array (np.array): The array.
+        """
+
+        if self._workspace is not None:
+            self._workspace.give_back(array)
+
+    @abstractmethod
+    def _get_cube_coordinates(self, lab: np.array, out: np.array) -> np.array:
+        """Get the cube coordinates of each pixel's assignment, as whole numbers in a floating point array.
+
+        The coordinates are calculated in the provided output array, without creating any temporary arrays.
+
+        Args:
+            lab (np.array): The pixels in the CIELAB colour space (one row per pixel).
+            out (np.array): Floating point array of the same shape as `lab` to store the cube coordinates in.
+
+        Returns:
+            (np.array): The output array of cube coordinates corresponding to each pixel.
+        """
+
+        pass
+
+    def _divide_cielab_space(self, lab: np.array, final_percent: int) -> tuple[np.array, np.array]:
+        """Divide the CIELAB colour space into cubes, returning the flat index of the cube each pixel is assigned to.
+
+        The extent of the grid of cubes covering the image's pixels is found from the cubes of the smallest and largest
+        L*, a* and b* values (the cube coordinates never decrease as the values increase). The cube coordinates of each
+        pixel are then packed into a single flat index into the grid of cubes, with negative coordinates wrapped
+        around to the far end of each axis. The flat indices are stored in the smallest integer type that can hold
+        them and are calculated in chunks of :const:`CUBE_KEY_CHUNK_PIXELS` pixels, so the cube coordinates of every
+        pixel are never stored at once.
+
+        Only the extent of the grid of cubes is determined here; the cubes themselves are only created for the cubes
+        that are occupied by at least one pixel (see :meth:`_assign_pixels_to_cube`).
+
+        Args:
+            lab (np.array): The image in the CIELAB colour space (one row per pixel).
+            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+
+        Returns:
+            (np.array): Array of flat cube indices corresponding to each pixel in the image.
+            (np.array): The minimum and maximum cube coordinates ([min, max]) for the L*, a* and b* axes of the grid of
+                cubes.
+        """
+
+        # Check extent of cube generation
+        extremes = np.array([[lab[:, channel].min() for channel in range(3)],
+                             [lab[:, channel].max() for channel in range(3)]])
+        extremes = self._get_cube_coordinates(extremes, np.empty(extremes.shape)).astype(int)
+        l_star_max = extremes[1, 0]
+        l_star_min = 0  # l_star_min is always 0
+        a_star_max = extremes[1, 1]
+        a_star_min = extremes[0, 1]
+        b_star_max = extremes[1, 2]
+        b_star_min = extremes[0, 2]
+
+        if _settings.__VERBOSE__:
+            print("l* range: " + str(l_star_min) + "," + str(l_star_max))
+            print("a* range: " + str(a_star_min) + "," + str(a_star_max))
+            print("b* range: " + str(b_star_min) + "," + str(b_star_max))
+
+        # Make sure ranges are valid and always include 0 in the range
+        if a_star_min > 0:
+            a_star_min = 0
+        if b_star_min > 0:
+            b_star_min = 0
+        if a_star_max < 0:
+            a_star_max = 0
+        if b_star_max < 0:
+            b_star_max = 0
+
+        grid_bounds = np.array([[l_star_min, l_star_max],
+                                [a_star_min, a_star_max],
+                                [b_star_min, b_star_max]])
+
+        # Pack the cube coordinates of each pixel into a flat index into the grid of cubes, using a lookup table of
+        # the (wrapped) contribution of each coordinate to the flat index for each axis
+        grid_shape = grid_bounds[:, 1] - grid_bounds[:, 0] + 1
+        strides = np.array([grid_shape[1] * grid_shape[2], grid_shape[2], 1])
+        key_dtype = get_key_dtype(int(np.prod(grid_shape)))
+        lowest = np.minimum(extremes[0], grid_bounds[:, 0])
+        key_tables = [((np.arange(lowest[axis], extremes[1, axis] + 1) % grid_shape[axis]) * strides[axis])
+                      .astype(key_dtype) for axis in range(3)]
+        cube_keys = self._borrow(lab.shape[:1], key_dtype)
+
+        def get_chunk_keys(start: int) -> None:
+            if not self.continue_thread:  # Skip the remaining chunks once cancelled
+                return
+            stop = start + CUBE_KEY_CHUNK_PIXELS
+            coordinates = self._get_cube_coordinates(lab[start:stop], np.empty(lab[start:stop].shape))
+            coordinates = np.subtract(coordinates, lowest, out=np.empty(coordinates.shape, dtype=np.intp),
+                                      casting="unsafe")  # Offset into the lookup tables
+            keys = cube_keys[start:stop]
+            np.take(key_tables[0], coordinates[:, 0], out=keys)
+            keys += key_tables[1][coordinates[:, 1]]
+            keys += key_tables[2][coordinates[:, 2]]
+
+        run_in_parallel(get_chunk_keys, range(0, lab.shape[0], CUBE_KEY_CHUNK_PIXELS), self._workers)
+
+        # Set progress bar
+        self._set_progress(final_percent)
+
+        return cube_keys, grid_bounds
+
+    def _assign_pixels_to_cube(self, lab: np.array, cube_keys: np.array, grid_bounds: np.array,
+                               c_stars: np.array, final_percent: int, weights: np.array = None) \
+            -> tuple[cielabcube.CielabCubeTable, np.array]:
+        """Assign each pixel to their CIELAB cube, returning the table of occupied cubes.
+
+        Rather than visiting each pixel in turn, the flat index into the grid of cubes of every pixel (see
+        :meth:`_divide_cielab_space`) is used to count the pixels in each cube. The occupied cubes are then given one
+        row each in a
+        :class:`cielabcube.CielabCubeTable`, with the pixel count and the L*, a* and b* sums of each cube obtained in
+        bulk using :func:`np.bincount`.
+
+        If the grid has more than :attr:`dense_cube_grid_max_cells` cells (e.g., for small cube sizes), the occupied
+        cubes are instead found from the sorted unique flat indices of the pixels, so that the memory used depends on
+        the number of occupied cubes rather than the volume of the grid. Both give the same table of cubes.
+
+        Args:
+            lab (np.array): The image in the CIELAB colour space.
+            cube_keys (np.array): Array of flat cube indices corresponding to each pixel in the image.
+            grid_bounds (np.array): The minimum and maximum cube coordinates ([min, max]) for the L*, a* and b* axes of
+                the grid of cubes.
+            c_stars (np.array): Array of C* values corresponding to each pixel in the image.
+            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+            weights (np.array): (Optional) The number of pixels represented by each entry of `lab` (when using the
+                unique colours of the image). By default, each entry is a single pixel.
+
+        Returns:
+            (cielabcube.CielabCubeTable): The table of cubes containing at least one pixel.
+            (np.array): Array of the table rows (cubes) corresponding to each pixel in the image.
+        """
+
+        start_time = time.time()
+
+        # Get progress bar increments (one step for each bulk pass)
+        increment_percent = self._get_increment_percent(final_percent, 2)
+
+        if _settings.__VERBOSE__:
+            print("Assigning each pixel to the appropriate CIELAB cube...")
+
+        grid_shape = tuple(grid_bounds[:, 1] - grid_bounds[:, 0] + 1)
+        grid_size = int(np.prod(grid_shape))
+
+        # Give each occupied cube a row in the table (in order of their flat index), counting their pixels
+        if grid_size <= self._dense_cube_grid_max_cells:
+            # Count the pixels in every cell of the grid
+            grid_pixel_counts = get_counts(cube_keys, grid_size, weights, workers=self._workers)
+            occupied_cubes = np.flatnonzero(grid_pixel_counts)
+            grid_rows = np.full(grid_size, -1, dtype=np.int32)
+            grid_rows[occupied_cubes] = np.arange(occupied_cubes.size)
+            cube_rows = take(grid_rows, cube_keys, out=self._borrow(cube_keys.shape, np.int32))
+            pixel_counts = grid_pixel_counts[occupied_cubes]
+        else:
+            # Only the occupied cubes are stored, keyed by their sorted flat indices
+            occupied_cubes, inverse = np.unique(cube_keys, return_inverse=True)
+            cube_rows = self._borrow(cube_keys.shape, np.int32)
+            cube_rows[:] = inverse.ravel()
+            pixel_counts = get_counts(cube_rows, occupied_cubes.size, weights, workers=self._workers)
+
+        # Recover the (unwrapped) cube coordinates of each occupied cube
+        coordinates = np.stack(np.unravel_index(occupied_cubes, grid_shape), axis=1)
+        coordinates = np.where(coordinates > grid_bounds[:, 1], coordinates - grid_shape, coordinates)
+
+        self._increment_progress(increment_percent)
+
+        # Get the sum of the pixel colours in each cube (in chunks, as np.bincount converts the rows to pointer sized
+        # integers and the colours to 64-bit floats). The chunks are summed by the workers, but added to the total in
+        # order, so the sums are identical for any number of workers
+        flat_rows = cube_rows.ravel()
+        flat_lab = lab.reshape(-1, lab.shape[-1])
+        lab_sums = np.zeros((occupied_cubes.size, flat_lab.shape[1]))
+
+        def get_chunk_lab_sums(start: int) -> np.array:
+            if not self.continue_thread:
+                return None
+            stop = start + COUNT_CHUNK_SIZE
+            chunk_rows = flat_rows[start:stop].astype(np.intp)
+            return [np.bincount(chunk_rows,
+                                weights=flat_lab[start:stop, channel] if weights is None
+                                else flat_lab[start:stop, channel] * weights[start:stop],
+                                minlength=occupied_cubes.size) for channel in range(flat_lab.shape[1])]
+
+        def add_chunk_lab_sums(chunk_lab_sums: list[np.array]) -> None:
+            if chunk_lab_sums is not None:
+                for channel, channel_sums in enumerate(chunk_lab_sums):
+                    lab_sums[:, channel] += channel_sums
+
+        reduce_in_order(get_chunk_lab_sums, add_chunk_lab_sums, range(0, flat_rows.size, COUNT_CHUNK_SIZE),
+                        self._workers)
+
+        cubes = cielabcube.CielabCubeTable(coordinates=coordinates,
+                                           pixel_counts=pixel_counts,
+                                           lab_sums=lab_sums,
+                                           pixel_rows=flat_rows,
+                                           lab=flat_lab,
+                                           c_stars=c_stars.ravel())
+
+        # Set progress bar (prevent rounding issues)
+        self._set_progress(final_percent)
+
+        if _settings.__VERBOSE__:
+            print(len(cubes), "occupied CIELAB cubes generated...")
+            print("--- %s seconds for vectorised cube assignment ---" % (time.time() - start_time))
+
+        return cubes, cube_rows
+
+    def _set_cubes_relevance_status(self, binned_image: BinnedImage, cubes: cielabcube.CielabCubeTable,
+                                    final_percent: int) -> None:
+        """Set the relevancy status of each cube according to the requirements specified by Nieves et al. (2020).
+
+        If the cube is found to meet the relevancy requirements, it will contribute a colour towards the image's
+        colour palette.
+
+        Args:
+            binned_image (BinnedImage): The image binned by :meth:`bin_image`.
+            cubes (cielabcube.CielabCubeTable): Table of cubes that pixels have been assigned to.
+            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+
+        Raises:
+            ValueError: If the number of pixels analysed does not match the total number of pixels in the image (not all
+                of the pixels have been accounted for).
+        """
+
+        pixel_count = binned_image.pixel_count
+
+        # Primary relevancy variables
+        threshold_pixel_count = pixel_count * self._threshold  # Minimum number of pixels to be in a cube
+
+        # Secondary relevancy variables
+        secondary_threshold_pixel_count = pixel_count * self._secondary_threshold  # Secondary minimum number of pixels
+
+        if _settings.__VERBOSE__:
+            print("Secondary pixel count threshold:", secondary_threshold_pixel_count)
+
+        # Step 4: Get cube pixel counts
+        num_pixels = cubes.pixel_counts
+        tot_pixels = num_pixels.sum()  # Number of pixels that have been processed
+
+        # Step 5: Calculate mean pixel colour (cube colour)
+        cubes.calculate_mean_colours()
+
+        # Get number of pixels in each cube that meet the secondary C* and L* requirements
+        # At least 3/8% of pixels in cube have L* > 80
+        # OR At least 3/8% of pixels in cube have C* above 50th percentile OF THE IMAGE
+        # (kept by the binned image, so are only counted again if the C* percentile or minimum L* value change)
+        c_star_cube_counts, l_star_cube_counts = binned_image.get_secondary_cube_counts(self._c_star_percentile,
+                                                                                        self._min_l_star,
+                                                                                        self._workers)
+
+        # Step 6-11: Determine if cube is relevant
+        meets_primary = num_pixels > threshold_pixel_count  # possibly >= (pseudo-code in paper uses >)
+        meets_secondary_c_star = c_star_cube_counts > secondary_threshold_pixel_count
+        meets_secondary_l_star = l_star_cube_counts > secondary_threshold_pixel_count
+        cubes.relevant = (num_pixels != 0) & (meets_primary | meets_secondary_c_star | meets_secondary_l_star)
+
+        if _settings.__VERBOSE__:
+            for i in np.flatnonzero(cubes.relevant):
+                if meets_primary[i]:
+                    print("Cube with coordinates: " + str(cubes.coordinates[i])
+                          + " meets primary requirements with:", num_pixels[i], "out of", pixel_count, "pixels")
+                    continue
+                elif meets_secondary_c_star[i]:
+                    print("Cube below with coordinates: " + str(cubes.coordinates[i])
+                          + " meets secondary requirements for C*...")
+                else:
+                    print("Cube below with coordinates: " + str(cubes.coordinates[i])
+                          + " meets tertiary requirements for L*...")
+                print("----C* cube count:", c_star_cube_counts[i],
+                      "; L* cube count:", l_star_cube_counts[i],
+                      "; Threshold pixel count:", threshold_pixel_count,
+                      "; Secondary threshold pixel count", secondary_threshold_pixel_count,
+                      "; Number of pixels:", num_pixels[i], "out of", pixel_count)
+
+        # Set progress bar
+        self._set_progress(final_percent)
+
+        if tot_pixels != pixel_count:
+            raise ValueError("Not all of the pixels have been accounted for!",
+                             tot_pixels, "analysed out of", str(pixel_count) + ".")
+
+    def _get_relevant_cubes(self, cubes: cielabcube.CielabCubeTable, final_percent: int) \
+            -> list[cielabcube.CielabCube]:
+        """Get the list of the relevant cubes.
+
+        Args:
+            cubes (cielabcube.CielabCubeTable): Table of cubes that pixels have been assigned to.
+            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+
+        Returns:
+            list(cielabcube.CielabCube): List of relevant cubes.
+
+        Raises:
+            NoRelevantCubesError: If no relevant cubes are found.
+        """
+
+        relevant_cubes = cubes.get_cubes(np.flatnonzero(cubes.relevant))
+
+        # Set progress bar
+        self._set_progress(final_percent)
+
+        # Check that at least one relevant cube has been found
+        if len(relevant_cubes) > 0:
+            return relevant_cubes
+        else:
+            raise NoRelevantCubesError("No relevant cubes found!")
+
+    def _update_pixel_colours(self, lab: np.array, cubes: cielabcube.CielabCubeTable, cube_rows: np.array,
+                              relevant_cubes: list[cielabcube.CielabCube], final_percent: int,
+                              weights: np.array = None) -> np.array:
+        """Recolour the image using the mean colours from the cubes that are deemed to be relevant.
+
+        Pixels in a relevant cube take on the mean colour of that cube. For all of the remaining pixels, the closest
+        relevant colour is found in chunks using a broadcast search, with the size of each chunk limited by
+        :attr:`recolour_chunk_bytes` (per worker, see :attr:`workers`). The number of pixels recoloured with each
+        relevant colour is then counted in one pass.
+
+        Args:
+            lab (np.array): The image in the CIELAB colour space.
+            cubes (cielabcube.CielabCubeTable): Table of cubes that pixels have been assigned to.
+            cube_rows (np.array): Array of the table rows (cubes) corresponding to each pixel in the image.
+            relevant_cubes(list(cielabcube.CielabCube): List of relevant cubes.
+            final_percent (int): Percentage value that the progress bar should finish on after completing this method.
+            weights (np.array): (Optional) The number of pixels represented by each entry of `lab` (when using the
+                unique colours of the image). By default, each entry is a single pixel.
+
+        Returns:
+            (np.array): The index of the relevant colour (in `relevant_cubes`) taken on by each entry of `lab`, or None
+                if the thread was cancelled.
+        """
+
+        start_time = time.time()
+
+        # Get array of relevant_cube mean colours
+        relevant_rows = np.array([cube.index for cube in relevant_cubes])
+        flat_lab = lab.reshape(-1, lab.shape[-1])
+        relevant_cubes_mean_colours = cubes.mean_colours[relevant_rows].astype(flat_lab.dtype)
+
+        if _settings.__VERBOSE__:
+            print("Updating pixel colours...")
+
+        # Pixels in a relevant cube are assigned the cube's mean colour
+        palette_rows = np.full(len(cubes), -1, dtype=np.int32)
+        palette_rows[relevant_rows] = np.arange(len(relevant_rows))
+        palette_indices = take(palette_rows, cube_rows, out=self._borrow(cube_rows.shape, np.int32))
+
+        # All other pixels are assigned the closest relevant colour
+        non_relevant_pixels = np.flatnonzero(palette_indices < 0)
+        chunk_size = get_chunk_size(len(relevant_rows), self._recolour_chunk_bytes, flat_lab.itemsize)
+        chunk_starts = range(0, non_relevant_pixels.size, chunk_size)
+
+        # Get progress bar increments
+        increment_percent = self._get_increment_percent(final_percent, len(chunk_starts) + 1)
+
+        def get_chunk_closest_colour_indices(start: int) -> np.array:
+            chunk = non_relevant_pixels[start:start + chunk_size]
+            return get_closest_colour_indices(flat_lab[chunk], relevant_cubes_mean_colours)
+
+        executor = ThreadPoolExecutor(self._workers) if self._workers > 1 else None
+        try:
+            results = map(get_chunk_closest_colour_indices, chunk_starts) if executor is None \
+                else executor.map(get_chunk_closest_colour_indices, chunk_starts)
+
+            for start, closest_colour_indices in zip(chunk_starts, results):
+                palette_indices[non_relevant_pixels[start:start + chunk_size]] = closest_colour_indices
+
+                self._increment_progress(increment_percent)
+                if not self.continue_thread:
+                    self._give_back(palette_indices)
+                    return None
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)  # Only unfinished chunks when cancelled
+
+        # Count the number of pixels with each relevant colour
+        cubes.pixel_counts_after_reassignment[relevant_rows] = get_counts(palette_indices, len(relevant_rows), weights,
+                                                                          workers=self._workers)
+
+        # Set progress bar (prevent rounding issues)
+        self._set_progress(final_percent)
+
+        if _settings.__VERBOSE__:
+            print(non_relevant_pixels.size, "pixels reassigned to their closest relevant colour...")
+            print("--- %s seconds for vectorised pixel colour update ---" % (time.time() - start_time))
+
+        return palette_indices
+
+
+class Nieves2020OffsetCubes(Nieves2020):
+    """Subclass of :class:`Nieves2020` with the cube coordinates corresponding to the cube's corner closest the origin.
+
+    As a result, there are eight cube that touch the origin in the CIELAB colour space.
+    """
+
+    NAME = "Nieves, Gomez-Robledo, Chen and Romero (2020) - Cube corners at CIELAB origin"
+    """Name of the algorithm."""
+
+    URL = "https://doi.org/10.1364/AO.378659"
+    "Link to more information about the algorithm."
+
+    def __init__(self):
+        """Constructor."""
+        super().__init__(Nieves2020OffsetCubes.NAME, Nieves2020OffsetCubes.URL)
+
+    def _get_cube_coordinates(self, lab: np.array, out: np.array) -> np.array:
+        """Get the cube coordinates of each pixel's assignment, as whole numbers in a floating point array.
+
+        * Divide each pixel's L*, a*, and b* value by :attr:`Nieves2020.CUBE_SIZE` (20), returning
+        the number of times each value fits completely with no remainder (floor divide).
+
+        Args:
+            lab (np.array): The pixels in the CIELAB colour space (one row per pixel).
+            out (np.array): Floating point array of the same shape as `lab` to store the cube coordinates in.
+
+        Returns:
+            (np.array): The output array of cube coordinates corresponding to each pixel.
+        """
+
+        return np.floor_divide(lab, self._cube_size, out=out)  # Cube coordinates for each pixel
+
+
+class Nieves2020CentredCubes(Nieves2020):
+    """Subclass of :class:`Nieves2020` with the cube coordinates corresponding to the centre of the cube.
+
+    As a result, there is only one cube that touches the origin in the CIELAB colour space (is in fact centred on the
+     origin).
+    """
+
+    NAME = "Nieves, Gomez-Robledo, Chen and Romero (2020) - Cube centred on CIELAB origin"
+    """Name of the algorithm."""
+
+    URL = "https://doi.org/10.1364/AO.378659"
+    "Link to more information about the algorithm."
+
+    def __init__(self):
+
+        super().__init__(Nieves2020CentredCubes.NAME, Nieves2020CentredCubes.URL)
+
+    def _get_cube_coordinates(self, lab: np.array, out: np.array) -> np.array:
+        """Get the cube coordinates of each pixel's assignment, as whole numbers in a floating point array.
+
+        * Temporarily round each pixel LAB value to the nearest multiple of :attr:`Nieves2020.CUBE_SIZE` (20).
+        * Divide all of these values by 20 to get each pixel's cube assignment.
+
+        Args:
+            lab (np.array): The pixels in the CIELAB colour space (one row per pixel).
+            out (np.array): Floating point array of the same shape as `lab` to store the cube coordinates in.
+
+        Returns:
+            (np.array): The output array of cube coordinates corresponding to each pixel.
+        """
+
+        np.divide(lab, self._cube_size, out=out)
+        np.round(out, out=out)
+        out *= self._cube_size
+        out /= self._cube_size
+        return np.trunc(out, out=out)  # Cube coordinates for each pixel
+
+
+class BinnedImage:
+    """The pixels of an image after they have been assigned to the cubes of the CIELAB colour space.
+
+    Holds the results of the stages of the `Nieves 2020`_ algorithm that do not depend on the relevancy parameters
+    (the conversion to the CIELAB colour space and the assignment of the pixels to cubes): the cube histogram, the C*
+    distribution of the image and the cube of each pixel. A colour palette can then be generated again from the binned
+    image with a different threshold, secondary threshold, C* percentile or minimum L* value, without repeating these
+    stages (see :meth:`Nieves2020.generate_colour_palette_index_map_from_binned_image`).
+
+    The secondary C* and L* counts of each cube are kept for the last C* percentile and minimum L* value used.
+
+    Args:
+        binning_parameters (dict): The names and values of the algorithm parameters used to bin the image.
+        shape (tuple[int, int]): The height and width of the image (pixels).
+        lab (np.array): The pixels (or unique colours) of the image in the CIELAB colour space (one row per entry).
+        c_stars (np.array): The C* value of each entry of `lab`.
+        cubes (cielabcube.CielabCubeTable): The table of cubes containing at least one pixel.
+        cube_rows (np.array): The table row (cube) of each entry of `lab`.
+        weights (np.array): (Optional) The number of pixels represented by each entry of `lab` (when using the unique
+            colours of the image). By default, each entry is a single pixel.
+        inverse (np.array): (Optional) The entry of `lab` corresponding to each pixel in the image (when using the
+            unique colours of the image).
+
+    .. _Nieves 2020:
+       https://doi.org/10.1364/AO.378659
+    """
+
+    def __init__(self, binning_parameters: dict, shape: tuple[int, int], lab: np.array, c_stars: np.array,
+                 cubes: cielabcube.CielabCubeTable, cube_rows: np.array, weights: np.array = None,
+                 inverse: np.array = None):
+
+        self._binning_parameters = dict(binning_parameters)
+        self._shape = tuple(shape)
+        self._lab = lab
+        self._c_stars = c_stars
+        self._cubes = cubes
+        self._cube_rows = cube_rows
+        self._weights = weights
+        self._inverse = inverse
+
+        # Secondary counts of each cube for the last C* percentile and minimum L* value used
+        self._c_star_percentile = None
+        self._c_star_percentile_value = None
+        self._min_l_star = None
+        self._secondary_cube_counts = None
+
+    @property
+    def binning_parameters(self) -> dict:
+        """The names and values of the algorithm parameters used to bin the image.
+
+        Returns:
+            (dict): The binning parameters.
+        """
+
+        return self._binning_parameters
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The height and width of the image (pixels).
+
+        Returns:
+            (tuple[int, int]): The shape of the image.
+        """
+
+        return self._shape
+
+    @property
+    def pixel_count(self) -> int:
+        """The number of pixels in the image.
+
+        Returns:
+            (int): The number of pixels.
+        """
+
+        return self._shape[0] * self._shape[1]
+
+    @property
+    def lab(self) -> np.array:
+        """The pixels (or unique colours) of the image in the CIELAB colour space (one row per entry).
+
+        Returns:
+            (np.array): The L*a*b* values.
+        """
+
+        return self._lab
+
+    @property
+    def c_stars(self) -> np.array:
+        """The C* value of each entry of :attr:`lab`.
+
+        Returns:
+            (np.array): The C* values.
+        """
+
+        return self._c_stars
+
+    @property
+    def cubes(self) -> cielabcube.CielabCubeTable:
+        """The table of cubes containing at least one pixel.
+
+        Returns:
+            (cielabcube.CielabCubeTable): The table of cubes.
+        """
+
+        return self._cubes
+
+    @property
+    def cube_rows(self) -> np.array:
+        """The table row (cube) of each entry of :attr:`lab`.
+
+        Returns:
+            (np.array): The cube of each entry.
+        """
+
+        return self._cube_rows
+
+    @property
+    def weights(self) -> np.array:
+        """The number of pixels represented by each entry of :attr:`lab`.
+
+        Returns:
+            (np.array): The weight of each entry, or None if each entry is a single pixel.
+        """
+
+        return self._weights
+
+    @property
+    def inverse(self) -> np.array:
+        """The entry of :attr:`lab` corresponding to each pixel in the image.
+
+        Returns:
+            (np.array): The entry of each pixel, or None if each entry is a single pixel.
+        """
+
+        return self._inverse
+
+    @property
+    def released(self) -> bool:
+        """Specify if the arrays of the binned image have been given back to a workspace (see :meth:`give_back`).
+
+        Returns:
+            (bool): True if the binned image can no longer be used. Otherwise False.
+        """
+
+        return self._cubes is None
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the arrays of the binned image (bytes).
+
+        Returns:
+            (int): The number of bytes.
+        """
+
+        arrays = [self._lab, self._c_stars, self._cube_rows, self._weights, self._inverse]
+        if self._cubes is not None:
+            arrays += [self._cubes.coordinates, self._cubes.pixel_counts, self._cubes.lab_sums]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def give_back(self, workspace: PaletteWorkspace) -> None:
+        """Give the per-pixel arrays of the binned image back to a workspace, so that they can be reused.
+
+        The binned image can no longer be used afterwards (see :attr:`released`).
+
+        Args:
+            workspace (PaletteWorkspace): The workspace.
+        """
+
+        for array in [self._lab, self._c_stars, self._cube_rows]:
+            workspace.give_back(array)
+
+        self._lab = None
+        self._c_stars = None
+        self._cube_rows = None
+        self._cubes = None
+        self._weights = None
+        self._inverse = None
+        self._secondary_cube_counts = None
+
+    def get_c_star_percentile_value(self, percentile: float) -> float:
+        """Get the C* value of the image at the given percentile.
+
+        Args:
+            percentile (float): The percentile to calculate the C* value for.
+
+        Returns:
+            (float): The C* value for the chosen percentile.
+        """
+
+        if self._c_star_percentile != percentile:
+            self._c_star_percentile_value = get_weighted_percentile(self._c_stars, percentile, self._weights)
+            self._c_star_percentile = percentile
+            self._secondary_cube_counts = None
+
+        return self._c_star_percentile_value
+
+    def get_secondary_cube_counts(self, percentile: float, min_l_star: float, workers: int = 1) \
+            -> tuple[np.array, np.array]:
+        """Get the number of pixels in each cube that meet the secondary C* and L* requirements.
+
+        Both counts are obtained in a single pass over the pixels (see :func:`get_secondary_counts`).
+
+        Args:
+            percentile (float): The percentile of the image's C* values that the C* value of a pixel must be above.
+            min_l_star (float): The L* value that the L* value of a pixel must be above.
+            workers (int): The number of threads the pixels are counted by. The default is 1.
+
+        Returns:
+            (np.array): The number of pixels in each cube with a C* value above the image's C* value at the percentile.
+            (np.array): The number of pixels in each cube with an L* value above `min_l_star`.
+        """
+
+        c_star_percentile_value = self.get_c_star_percentile_value(percentile)
+        if self._secondary_cube_counts is None or self._min_l_star != min_l_star:
+            self._secondary_cube_counts = get_secondary_counts(self._cube_rows, len(self._cubes),
+                                                               self._c_stars, c_star_percentile_value,
+                                                               self._lab[:, 0], min_l_star, self._weights, workers)
+            self._min_l_star = min_l_star
+
+        return self._secondary_cube_counts
+
+
+def get_rgb_view(image: np.array) -> np.array:
+    """Get a greyscale image as an RGB image, without copying it.
+
+    Like :func:`skimage.color.gray2rgb`, but the three colour channels are a read-only view of the greyscale image.
+
+    Args:
+        image (np.array): The image ([x, y] array for a greyscale image).
+
+    Returns:
+        (np.array): The RGB image. Images that are not greyscale are returned unchanged.
+    """
+
+    if image.ndim == 2:
+        return np.broadcast_to(image[..., np.newaxis], image.shape + (3,))
+
+    return image
+
+
+def convert_rgb_2_lab(image: np.array, use_lookup_table: bool = True, workers: int = 1,
+                      dtype: np.dtype = np.float64, out: np.array = None) -> np.array:
+    """Convert an image from the sRGB colour space to the CIELAB colour space.
+
+    The alpha channel of the image (RGBA) is removed if present.
+
+    Illuminant = D65 (name of the illuminant)
+    Observer = 2 (aperture angle of observer)
+
+    8-bit images (with no transparent pixels) are converted using a lookup table for the linearisation of each
+    colour channel (see :func:`convert_rgb_2_lab_with_lookup_table`). All other images are converted with
+    :func:`skimage.color.rgb2lab` in chunks of pixels (see :func:`convert_rgb_2_lab_in_chunks`).
+
+    The image is never written to, so it can be a read-only view.
+
+    Args:
+        image (np.array): The image in the sRGB colour space.
+        use_lookup_table (bool): If True, 8-bit images are converted using the lookup table. The default is True.
+        workers (int): The number of threads used by the conversion. The default is 1.
+        dtype (np.dtype): The floating point type of the converted image. The default is float64.
+        out (np.array): (Optional) Array of type `dtype` to store the converted pixels in (one row per pixel). By
+            default, a new array is created.
+
+    Returns:
+        (np.array): The image in the CIELAB colour space.
+    """
+
+    if use_lookup_table and image.dtype == np.uint8:
+        if image.shape[2] == 3:
+            return convert_rgb_2_lab_with_lookup_table(image, workers, dtype, out)
+        elif np.all(image[..., 3] == 255):
+            return convert_rgb_2_lab_with_lookup_table(image[..., :3], workers, dtype, out)  # All pixels are opaque
+
+    return convert_rgb_2_lab_in_chunks(image, workers, dtype, out)
+
+
+def convert_rgb_2_lab_in_chunks(image: np.array, workers: int = 1, dtype: np.dtype = np.float64,
+                                out: np.array = None) -> np.array:
+    """Convert an image from the sRGB colour space to the CIELAB colour space with :func:`skimage.color.rgb2lab`.
+
+    The pixels are converted in chunks of :const:`LAB_LOOKUP_TABLE_CHUNK_PIXELS` pixels, so that the floating point
+    copies of the image made by :func:`skimage.color.rgb2lab` (and by :func:`skimage.color.rgba2rgb` when removing the
+    alpha channel) are only the size of a chunk. As each pixel is converted independently, the result is the same as
+    converting the whole image at once (to within 1e-10 units).
+
+    Args:
+        image (np.array): The image in the sRGB colour space (with 3 or 4 colour channels).
+        workers (int): The number of threads the chunks of pixels are shared between. The default is 1.
+        dtype (np.dtype): The floating point type of the converted image. The default is float64.
+        out (np.array): (Optional) Array of type `dtype` to store the converted pixels in (one row per pixel). By
+            default, a new array is created.
+
+    Returns:
+        (np.array): The image in the CIELAB colour space.
+    """
+
+    pixels = image.reshape(-1, image.shape[-1])
+    lab = np.empty((pixels.shape[0], 3), dtype=dtype) if out is None else out
+
+    def convert_chunk(start: int) -> None:
+        chunk = pixels[start:start + LAB_LOOKUP_TABLE_CHUNK_PIXELS, np.newaxis, :]
+        if chunk.shape[-1] == 4:
+            chunk = color.rgba2rgb(chunk)  # Removing alpha channel
+        lab[start:start + LAB_LOOKUP_TABLE_CHUNK_PIXELS] = color.rgb2lab(chunk, illuminant="D65")[:, 0, :]
+
+    run_in_parallel(convert_chunk, range(0, pixels.shape[0], LAB_LOOKUP_TABLE_CHUNK_PIXELS), workers)
+
+    return lab.reshape(image.shape[:-1] + (3,))
+
+
+D65_WHITE_POINT = np.array([0.95047, 1., 1.08883])
+"""XYZ tristimulus values of the D65 illuminant (2 degree observer)."""
+
+LAB_LOOKUP_TABLE_CHUNK_PIXELS = 2 ** 18
+"""Number of pixels converted at once by :func:`convert_rgb_2_lab_with_lookup_table` and
+:func:`convert_rgb_2_lab_in_chunks`."""
+
+_srgb_linearisation_table = None
+
+
+def get_srgb_linearisation_table() -> np.array:
+    """Get the linear RGB value of each 8-bit sRGB colour channel value.
+
+    The table is only calculated once and is then reused.
+
+    Returns:
+        (np.array): The 256 linear RGB values, indexed by the 8-bit sRGB value.
+    """
+
+    global _srgb_linearisation_table
+
+    if _srgb_linearisation_table is None:
+        values = img_as_float(np.arange(256, dtype=np.uint8))
+        table = np.where(values > 0.04045, np.power((values + 0.055) / 1.055, 2.4), values / 12.92)
+        table.setflags(write=False)
+        _srgb_linearisation_table = table
+
+    return _srgb_linearisation_table
+
+
+def convert_rgb_2_lab_with_lookup_table(image: np.array, workers: int = 1, dtype: np.dtype = np.float64,
+                                        out: np.array = None) -> np.array:
+    """Convert an 8-bit image from the sRGB colour space to the CIELAB colour space using a lookup table.
+
+    Each colour channel is linearised by looking up its value in :func:`get_srgb_linearisation_table`, instead of
+    being decoded per pixel. The remaining steps (sRGB to XYZ and XYZ to CIELAB) are carried out in chunks of pixels,
+    so that only the CIELAB image and a few chunk-sized temporary arrays are created. The chunks are always converted
+    with 64-bit floats, so a 32-bit CIELAB image is only rounded once.
+
+    The result is the same as :func:`skimage.color.rgb2lab` (illuminant = D65, observer = 2) to within 1e-10 units
+    for every 24-bit colour.
+
+    Args:
+        image (np.array): The 8-bit image in the sRGB colour space (with 3 colour channels).
+        workers (int): The number of threads the chunks of pixels are shared between. The default is 1.
+        dtype (np.dtype): The floating point type of the converted image. The default is float64.
+        out (np.array): (Optional) Array of type `dtype` to store the converted pixels in (one row per pixel). By
+            default, a new array is created.
 
     Returns:
         (np.array): The image in the CIELAB colour space.
     """
 
-    if image.shape[2] == 4:
-        image = color.rgba2rgb(image)  # Removing alpha channel if present
+    from skimage.color import colorconv  # Imported here, as it loads SciPy (slowing down importing this module)
+
+    table = get_srgb_linearisation_table()
+    rgb_to_xyz = colorconv.xyz_from_rgb.T
+    pixels = image.reshape(-1, 3)
+    lab = np.empty(pixels.shape, dtype=dtype) if out is None else out
+
+    def convert_chunk(start: int) -> None:
+        stop = start + LAB_LOOKUP_TABLE_CHUNK_PIXELS
+
+        # sRGB -> XYZ
+        xyz = table[pixels[start:stop]] @ rgb_to_xyz
 
-    return color.rgb2lab(image, illuminant="D65")
+        # XYZ -> CIELAB
+        xyz /= D65_WHITE_POINT
+        mask = xyz > 0.008856
+        xyz[mask] = np.cbrt(xyz[mask])
+        xyz[~mask] = 7.787 * xyz[~mask] + 16. / 116.
+
+        chunk = lab[start:stop]
+        np.multiply(xyz[:, 1], 116., out=chunk[:, 0])
+        chunk[:, 0] -= 16.
+        np.subtract(xyz[:, 0], xyz[:, 1], out=chunk[:, 1])
+        chunk[:, 1] *= 500.
+        np.subtract(xyz[:, 1], xyz[:, 2], out=chunk[:, 2])
+        chunk[:, 2] *= 200.
+
+    run_in_parallel(convert_chunk, range(0, pixels.shape[0], LAB_LOOKUP_TABLE_CHUNK_PIXELS), workers)
+
+    return lab.reshape(image.shape)
 
 
 def convert_lab_2_rgb(image: np.array) -> np.array:
@@ -719,7 +1772,7 @@ def convert_lab_2_rgb(image: np.array) -> np.array:
     return new_image
 
 
-def get_c_stars(lab: np.array) -> np.array:
+def get_c_stars(lab: np.array, out: np.array = None) -> np.array:
     """Get the matrix of C* (chroma) values for each pixel in the image.
 
     .. math::
@@ -727,13 +1780,453 @@ def get_c_stars(lab: np.array) -> np.array:
 
     Args:
         lab (np.array): The image in the CIELAB colour space.
+        out (np.array): (Optional) Array to store the C* values in. By default, a new array is created.
 
     Returns:
         (np.array): Array of C* values corresponding to each pixel in the image.
     """
 
-    lab_squared = np.square(lab)  # Square each element of CIELAB image
-    a_star_squared = lab_squared[:, :, 1]
-    b_star_squared = lab_squared[:, :, 2]
-    c_stars = np.sqrt(a_star_squared + b_star_squared)  # C* = sqrt(a*^2 + b*^2)
-    return c_stars
+    # a*^2 + b*^2, without squaring the image
+    c_stars = np.einsum("...i,...i->...", lab[..., 1:], lab[..., 1:], out=out)
+    return np.sqrt(c_stars, out=c_stars)  # C* = sqrt(a*^2 + b*^2)
+
+
+CUBE_KEY_CHUNK_PIXELS = 2 ** 18
+"""Number of pixels assigned to cubes at once by :meth:`Nieves2020._divide_cielab_space`."""
+
+
+def get_key_dtype(num_keys: int) -> np.dtype:
+    """Get the smallest signed integer type that can hold the given number of keys (from 0).
+
+    Args:
+        num_keys (int): The number of possible keys.
+
+    Returns:
+        (np.dtype): The integer type (int16, int32 or int64).
+    """
+
+    for dtype in [np.int16, np.int32]:
+        if num_keys <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def get_chunk_size(num_colours: int, max_chunk_bytes: int, itemsize: int = 8) -> int:
+    """Get the number of pixels that can be compared against the given number of colours within the memory limit.
+
+    Each pixel in a chunk requires a [L*, a*, b*] difference and a squared distance for each colour (32 bytes per
+    colour for 64-bit floats). At least one pixel is always included in a chunk.
+
+    Args:
+        num_colours (int): The number of colours each pixel is compared against.
+        max_chunk_bytes (int): The maximum memory (bytes) to be used per chunk.
+        itemsize (int): The size (bytes) of each value of the differences and squared distances. The default is 8.
+
+    Returns:
+        (int): The number of pixels per chunk.
+    """
+
+    bytes_per_pixel = 4 * itemsize * max(num_colours, 1)
+    return max(1, max_chunk_bytes // bytes_per_pixel)
+
+
+def get_closest_colour_indices(pixels: np.array, colours: np.array) -> np.array:
+    """Get the index of the closest colour (shortest Euclidean distance) to each pixel.
+
+    If there is a tie, the first colour is chosen.
+
+    Args:
+        pixels (np.array): The pixels as an array of [L*, a*, b*] triplets (one row per pixel).
+        colours (np.array): The colours to choose from as an array of [L*, a*, b*] triplets (one row per colour).
+
+    Returns:
+        (np.array): The index of the closest colour to each pixel.
+    """
+
+    differences = pixels[:, np.newaxis, :] - colours[np.newaxis, :, :]
+    squared_distances = np.einsum("ijk,ijk->ij", differences, differences)
+    return np.argmin(squared_distances, axis=1)  # If there is a tie, the first colour is chosen
+
+
+def get_unique_colours(image: np.array, dense_histogram_min_pixels: int = 2 ** 22, workers: int = 1) \
+        -> tuple[np.array, np.array, np.array]:
+    """Get the unique colours of an 8-bit image, the unique colour of each pixel and the number of times each occurs.
+
+    The colour channels of each pixel are packed into a single integer. For large RGB images, the colours are counted
+    with a dense histogram over all 2^24 possible colours (linear time). Otherwise, they are found by sorting.
+
+    With more than one worker, the pixels are packed in bands of rows of the image. When the colours are found by
+    sorting, the unique colours of each band are found separately and are then merged. As the counts are integers,
+    the result is the same for any number of workers.
+
+    Args:
+        image (np.array): The 8-bit image ([x, y, n] array with n colour channels).
+        dense_histogram_min_pixels (int): Minimum number of pixels in an RGB image for a dense histogram to be used.
+        workers (int): The number of threads the bands of the image are shared between. The default is 1.
+
+    Returns:
+        (np.array): The unique colours in the image (one row per colour, sorted by their packed value).
+        (np.array): The index of the unique colour of each pixel in the image (flattened).
+        (np.array): The number of pixels with each unique colour.
+    """
+
+    channels = image.shape[-1]
+    pixels = image.reshape(-1, channels)
+    bands = get_bands(pixels.shape[0], workers)
+
+    # Pack the colour channels of each pixel into one integer
+    packed_colours = np.empty(pixels.shape[0], dtype=np.uint32)
+
+    def pack_band(band: slice) -> None:
+        packed_colours[band] = pack_colours(pixels[band])
+
+    run_in_parallel(pack_band, bands, workers)
+
+    if channels <= 3 and pixels.shape[0] >= dense_histogram_min_pixels:
+        histogram = np.bincount(packed_colours, minlength=2 ** (8 * channels))
+        unique_packed_colours = np.flatnonzero(histogram)
+        counts = histogram[unique_packed_colours]
+        lookup = np.empty(histogram.size, dtype=np.intp)
+        lookup[unique_packed_colours] = np.arange(unique_packed_colours.size)
+        inverse = take(lookup, packed_colours, workers)
+
+    elif workers > 1:
+        # Get the unique colours of each band...
+        def get_band_unique_colours(band: slice) -> tuple[np.array, np.array]:
+            return np.unique(packed_colours[band], return_counts=True)
+
+        band_unique_packed_colours, band_counts = zip(*run_in_parallel(get_band_unique_colours, bands, workers))
+
+        # ...and merge them
+        unique_packed_colours, band_inverse = np.unique(np.concatenate(band_unique_packed_colours),
+                                                        return_inverse=True)
+        counts = get_counts(band_inverse.ravel(), unique_packed_colours.size, np.concatenate(band_counts))
+
+        inverse = np.empty(pixels.shape[0], dtype=np.intp)
+
+        def get_band_inverse(band: slice) -> None:
+            inverse[band] = np.searchsorted(unique_packed_colours, packed_colours[band])
+
+        run_in_parallel(get_band_inverse, bands, workers)
+
+    else:
+        unique_packed_colours, inverse, counts = np.unique(packed_colours, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+
+    return unpack_colours(unique_packed_colours, channels), inverse, counts
+
+
+def pack_colours(pixels: np.array) -> np.array:
+    """Pack the (up to four) 8-bit colour channels of each pixel into a single integer.
+
+    Args:
+        pixels (np.array): The 8-bit pixels ([n, c] array with c colour channels).
+
+    Returns:
+        (np.array): The packed colour of each pixel.
+    """
+
+    channels = pixels.shape[-1]
+    packed_colours = np.zeros(pixels.shape[0], dtype=np.uint32)
+    for channel in range(channels):
+        packed_colours |= pixels[:, channel].astype(np.uint32) << np.uint32(8 * (channels - channel - 1))
+
+    return packed_colours
+
+
+def unpack_colours(packed_colours: np.array, channels: int = 3) -> np.array:
+    """Unpack colours packed into a single integer (see :func:`pack_colours`) into their 8-bit colour channels.
+
+    Args:
+        packed_colours (np.array): The packed colours.
+        channels (int): The number of colour channels packed into each colour. The default is 3.
+
+    Returns:
+        (np.array): The colours (one row per colour).
+    """
+
+    colours = np.empty([packed_colours.size, channels], dtype=np.uint8)
+    for channel in range(channels):
+        colours[:, channel] = (packed_colours >> (8 * (channels - channel - 1))) & 0xFF
+
+    return colours
+
+
+def get_bands(length: int, bands: int) -> list[slice]:
+    """Split an array into (nearly) equally sized bands.
+
+    Args:
+        length (int): The length of the array.
+        bands (int): The number of bands.
+
+    Returns:
+        (list[slice]): The slice of the array for each band.
+    """
+
+    edges = np.linspace(0, length, min(bands, max(length, 1)) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(edges[:-1], edges[1:])]
+
+
+def run_in_parallel(function, arguments, workers: int = 1) -> list:
+    """Call the function for each argument, sharing the calls between a number of threads.
+
+    Args:
+        function (Callable): The function to call.
+        arguments (Iterable): The argument for each call.
+        workers (int): The number of threads. If 1, the function is called in the current thread.
+
+    Returns:
+        (list): The value returned by each call, in the order of the arguments.
+    """
+
+    if workers == 1:
+        return [function(argument) for argument in arguments]
+
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(function, arguments))
+
+
+def reduce_in_order(function, reduce, arguments, workers: int = 1) -> None:
+    """Call the function for each argument, sharing the calls between a number of threads, and reduce their values.
+
+    The values are reduced in the order of the arguments (in the current thread), so the result is the same for any
+    number of threads (e.g., floating-point sums are added in the same order). At most two values per thread are
+    held at once.
+
+    Args:
+        function (Callable): The function to call.
+        reduce (Callable): The function called with the value returned by each call, in the order of the arguments.
+        arguments (Iterable): The argument for each call.
+        workers (int): The number of threads. If 1, the function is called in the current thread.
+    """
+
+    if workers == 1:
+        for argument in arguments:
+            reduce(function(argument))
+        return
+
+    with ThreadPoolExecutor(workers) as executor:
+        pending = deque()
+        for argument in arguments:
+            pending.append(executor.submit(function, argument))
+            if len(pending) == 2 * workers:
+                reduce(pending.popleft().result())
+        while pending:
+            reduce(pending.popleft().result())
+
+
+def take(values: np.array, indices: np.array, workers: int = 1, out: np.array = None) -> np.array:
+    """Take the values at the given indices (see :func:`np.take`), sharing bands of the indices between threads.
+
+    Each band is taken in chunks of :const:`COUNT_CHUNK_SIZE` indices, so compact (non-pointer sized) indices are
+    never all converted to pointer sized integers at once.
+
+    Args:
+        values (np.array): The 1-D array of values.
+        indices (np.array): The 1-D array of indices of the values to take.
+        workers (int): The number of threads. The default is 1.
+        out (np.array): (Optional) Array to store the values in. By default, a new array is created.
+
+    Returns:
+        (np.array): The values at the given indices.
+    """
+
+    if workers == 1 and out is None:
+        return values[indices]
+
+    taken_values = np.empty(indices.shape, dtype=values.dtype) if out is None else out
+
+    def take_band(band: slice) -> None:
+        for start in range(band.start, band.stop, COUNT_CHUNK_SIZE):
+            stop = min(start + COUNT_CHUNK_SIZE, band.stop)
+            taken_values[start:stop] = values[indices[start:stop]]
+
+    run_in_parallel(take_band, get_bands(indices.shape[0], workers), workers)
+    return taken_values
+
+
+COUNT_CHUNK_SIZE = 2 ** 20
+"""Number of compact indices counted at once by :func:`get_counts`."""
+
+
+def get_counts(indices: np.array, length: int, weights: np.array = None, condition: np.array = None,
+               workers: int = 1) -> np.array:
+    """Count the number of pixels for each index, optionally only counting those pixels that meet a condition.
+
+    Args:
+        indices (np.array): The index (e.g., cube or colour) of each entry.
+        length (int): The number of possible indices.
+        weights (np.array): (Optional) The number of pixels represented by each entry. By default, each entry is a
+            single pixel.
+        condition (np.array): (Optional) Boolean array that is True for each entry to be counted.
+        workers (int): The number of threads the chunks of compact indices are counted by. The default is 1.
+
+    Returns:
+        (np.array): The number of pixels for each index.
+    """
+
+    # Count compact (non-pointer sized) indices in chunks, as np.bincount converts them to pointer sized integers
+    if indices.dtype != np.intp and indices.size > COUNT_CHUNK_SIZE:
+        chunk_size = max(COUNT_CHUNK_SIZE, length)
+        counts = np.zeros(length, dtype=np.int64)
+
+        def count_chunk(start: int) -> np.array:
+            stop = start + chunk_size
+            return get_counts(indices[start:stop].astype(np.intp), length,
+                              None if weights is None else weights[start:stop],
+                              None if condition is None else condition[start:stop])
+
+        def add_chunk_counts(chunk_counts: np.array) -> None:
+            counts[:] += chunk_counts
+
+        reduce_in_order(count_chunk, add_chunk_counts, range(0, indices.size, chunk_size), workers)
+        return counts
+
+    if weights is None and condition is None:
+        return np.bincount(indices, minlength=length)
+    elif weights is None:
+        counts = np.bincount(indices, weights=condition, minlength=length)
+    elif condition is None:
+        counts = np.bincount(indices, weights=weights, minlength=length)
+    else:
+        counts = np.bincount(indices, weights=np.where(condition, weights, 0), minlength=length)
+
+    return counts.astype(np.int64)
+
+
+def get_secondary_counts(indices: np.array, length: int, c_stars: np.array, c_star_threshold: float,
+                         l_stars: np.array, l_star_threshold: float, weights: np.array = None, workers: int = 1) \
+        -> tuple[np.array, np.array]:
+    """Count the number of pixels for each index with a C* value above a threshold and with an L* value above another.
+
+    Both counts are obtained in a single pass, by counting each index and combination of the two conditions together.
+    Large arrays are counted in chunks, which are shared between the workers.
+
+    Args:
+        indices (np.array): The index (e.g., cube) of each entry.
+        length (int): The number of possible indices.
+        c_stars (np.array): The C* value of each entry.
+        c_star_threshold (float): The C* value that the C* value of an entry must be above to be counted.
+        l_stars (np.array): The L* value of each entry.
+        l_star_threshold (float): The L* value that the L* value of an entry must be above to be counted.
+        weights (np.array): (Optional) The number of pixels represented by each entry. By default, each entry is a
+            single pixel.
+        workers (int): The number of threads the chunks are counted by. The default is 1.
+
+    Returns:
+        (np.array): The number of pixels for each index with a C* value above `c_star_threshold`.
+        (np.array): The number of pixels for each index with an L* value above `l_star_threshold`.
+    """
+
+    # Count large arrays in chunks, so that the keys of every entry are never stored at once
+    if indices.size > COUNT_CHUNK_SIZE:
+        chunk_size = max(COUNT_CHUNK_SIZE, length)
+        c_star_counts = np.zeros(length, dtype=np.int64)
+        l_star_counts = np.zeros(length, dtype=np.int64)
+
+        def count_chunk(start: int) -> tuple[np.array, np.array]:
+            stop = start + chunk_size
+            return get_secondary_counts(indices[start:stop], length, c_stars[start:stop], c_star_threshold,
+                                        l_stars[start:stop], l_star_threshold,
+                                        None if weights is None else weights[start:stop])
+
+        def add_chunk_counts(chunk_counts: tuple[np.array, np.array]) -> None:
+            c_star_counts[:] += chunk_counts[0]
+            l_star_counts[:] += chunk_counts[1]
+
+        reduce_in_order(count_chunk, add_chunk_counts, range(0, indices.size, chunk_size), workers)
+        return c_star_counts, l_star_counts
+
+    # Combine the index and the two conditions of each entry into a single key (index * 4 + C* bit * 2 + L* bit)
+    conditions = np.greater(c_stars, c_star_threshold).view(np.uint8) << 1
+    conditions |= np.greater(l_stars, l_star_threshold).view(np.uint8)
+    keys = indices.astype(np.int64) << 2
+    keys += conditions
+
+    counts = np.bincount(keys, weights=weights, minlength=4 * length).reshape(length, 4).astype(np.int64)
+    return counts[:, 2] + counts[:, 3], counts[:, 1] + counts[:, 3]
+
+
+PERCENTILE_HISTOGRAM_BINS = 2 ** 12
+"""Number of bins of the histogram used to find a weighted percentile (see :func:`get_ranked_value`)."""
+
+
+def get_ranked_value(values: np.array, rank: int, weights: np.array = None) -> float:
+    """Get the value at the given position in the sorted values, with each value repeated by its weight.
+
+    Without weights, the value is selected (partially sorted) using :func:`np.partition`. With weights, a histogram of
+    the values (weighted by their number of occurrences) is used to find the bin containing the position, so that
+    only the values in that bin need to be searched in turn. Neither sorts all of the values.
+
+    Args:
+        values (np.array): The values.
+        rank (int): The position (from 0) in the sorted, repeated values.
+        weights (np.array): (Optional) The number of times each value occurs. By default, each value occurs once.
+
+    Returns:
+        (float): The value at the given position.
+    """
+
+    if weights is None:
+        return np.partition(values, rank)[rank]
+
+    lowest = values.min()
+    highest = values.max()
+    if lowest == highest:
+        return lowest
+
+    # Histogram of the values (the bin of each value never decreases as the value increases)
+    bins = PERCENTILE_HISTOGRAM_BINS
+    bin_indices = ((values - lowest) * (bins / (highest - lowest))).astype(np.intp)
+    np.minimum(bin_indices, bins - 1, out=bin_indices)
+    cumulative_weights = np.cumsum(np.bincount(bin_indices, weights=weights, minlength=bins))
+
+    # Search the values in the bin containing the position (the lowest or highest value is always excluded)
+    rank_bin = int(np.searchsorted(cumulative_weights, rank, side="right"))
+    in_bin = bin_indices == rank_bin
+    bin_rank = rank - (int(cumulative_weights[rank_bin - 1]) if rank_bin > 0 else 0)
+    return get_ranked_value(values[in_bin], bin_rank, weights[in_bin])
+
+
+def get_weighted_percentile(values: np.array, percentile: float, weights: np.array = None) -> float:
+    """Get the value at the given percentile, with each value repeated by its weight.
+
+    The result is the same as calling :func:`np.percentile` (linear interpolation) on the values after repeating
+    each value by its (integer) weight, without creating the repeated array or sorting the values (see
+    :func:`get_ranked_value`).
+
+    Args:
+        values (np.array): The values.
+        percentile (float): The percentile to calculate the value for.
+        weights (np.array): (Optional) The number of times each value occurs. By default, each value occurs once.
+
+    Returns:
+        (float): The value for the chosen percentile.
+    """
+
+    count = values.size if weights is None else int(weights.sum())
+
+    # Virtual position of the percentile in the repeated (sorted) values, as used by np.percentile
+    virtual_index = (count - 1) * np.true_divide(percentile, 100)
+    if virtual_index >= count - 1:
+        previous_index = next_index = count - 1
+    elif virtual_index < 0:
+        previous_index = next_index = 0
+    else:
+        previous_index = int(np.floor(virtual_index))
+        next_index = previous_index + 1
+    gamma = virtual_index - np.floor(virtual_index)
+
+    # Values at these positions in the repeated values
+    if weights is None and next_index != previous_index:
+        previous_value, next_value = np.partition(values, [previous_index, next_index])[[previous_index, next_index]]
+    else:
+        previous_value = get_ranked_value(values, previous_index, weights)
+        next_value = previous_value if next_index == previous_index else get_ranked_value(values, next_index, weights)
+
+    # Linear interpolation (matching np.percentile)
+    difference = next_value - previous_value
+    if gamma >= 0.5:
+        return next_value - difference * (1 - gamma)
+    else:
+        return previous_value + difference * gamma
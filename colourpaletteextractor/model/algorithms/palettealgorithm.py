@@ -18,14 +18,14 @@
 from __future__ import annotations
 
 import inspect
+import threading
 from abc import ABC, abstractmethod
 from typing import Optional
 
 import numpy as np
-from PySide2 import QtCore
+from skimage import color
 
-import colourpaletteextractor.view.tabview as tabview
-import colourpaletteextractor.model.imagedata as imagedata
+from colourpaletteextractor.model.progressreporter import ProgressReporter
 
 
 def get_implemented_algorithms():
@@ -68,6 +68,143 @@ def get_implemented_algorithms():
     return result
 
 
+def get_index_map_dtype(num_colours: int) -> type:
+    """Get the smallest unsigned integer type that can index every colour in a colour palette.
+
+    Args:
+        num_colours (int): The number of colours in the colour palette.
+
+    Returns:
+        (type): The Numpy integer type for the palette index map.
+    """
+
+    if num_colours <= 2 ** 8:
+        return np.uint8
+    elif num_colours <= 2 ** 16:
+        return np.uint16
+    else:
+        return np.uint32
+
+
+def get_recoloured_image(index_map: np.array, colour_palette: list[np.array]) -> np.array:
+    """Build the recoloured image from its palette index map and colour palette.
+
+    Args:
+        index_map (np.array): The index of the colour in the colour palette for each pixel in the image.
+        colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) in the colour palette.
+
+    Returns:
+        (np.array): The recoloured image using only the colours in the colour palette.
+    """
+
+    colours = np.asarray(colour_palette, dtype=np.uint8).reshape(-1, 3)
+    return np.take(colours, index_map, axis=0)
+
+
+def get_index_map(recoloured_image: np.array, colour_palette: list[np.array]) -> np.array:
+    """Get the palette index map of a recoloured image.
+
+    Args:
+        recoloured_image (np.array): The recoloured image using only the colours in the colour palette.
+        colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) in the colour palette.
+
+    Returns:
+        (np.array): The index of the colour in the colour palette for each pixel in the image.
+
+    Raises:
+        ValueError: If the recoloured image contains a colour that is not in the colour palette.
+    """
+
+    def pack(colours: np.array) -> np.array:
+        colours = colours.astype(np.uint32)
+        return (colours[..., 0] << 16) | (colours[..., 1] << 8) | colours[..., 2]
+
+    palette_colours = pack(np.asarray(colour_palette, dtype=np.uint8).reshape(-1, 3))
+    image_colours = pack(recoloured_image)
+
+    order = np.argsort(palette_colours, kind="stable")
+    positions = np.searchsorted(palette_colours[order], image_colours)
+    positions = np.minimum(positions, order.size - 1)
+    if not np.array_equal(palette_colours[order][positions], image_colours):
+        raise ValueError("The recoloured image contains colours that are not in the colour palette!")
+
+    return order[positions].astype(get_index_map_dtype(order.size))
+
+
+def get_read_only_view(image: np.array) -> np.array:
+    """Get a read-only view of an image, so that it can be passed to an algorithm without copying it.
+
+    Args:
+        image (np.array): The image.
+
+    Returns:
+        (np.array): A view of the image that cannot be written to.
+    """
+
+    view = image.view()
+    view.setflags(write=False)
+    return view
+
+
+def get_preview_image(image: np.array, max_pixels: int) -> np.array:
+    """Get a reduced resolution view of an image, used to quickly generate a preview of its colour palette.
+
+    Every n-th pixel of every n-th row of the image is kept, with n the smallest stride for which the view has at most
+    `max_pixels` pixels. No pixels are copied.
+
+    Args:
+        image (np.array): The image.
+        max_pixels (int): The maximum number of pixels in the preview image.
+
+    Returns:
+        (np.array): The strided view of the image (or the image itself if it is small enough).
+
+    Raises:
+        ValueError: If `max_pixels` is less than 1.
+    """
+
+    if max_pixels < 1:
+        raise ValueError("The preview image must have at least 1 pixel!")
+
+    stride = int(np.ceil(np.sqrt(image.shape[0] * image.shape[1] / max_pixels)))
+    while stride > 1 and -(-image.shape[0] // stride) * -(-image.shape[1] // stride) > max_pixels:
+        stride += 1  # Rows and columns are rounded up
+
+    if stride <= 1:
+        return image
+    return image[::stride, ::stride]
+
+
+def get_colour_palette_difference(colour_palette: list[np.array], relative_frequencies: list[float],
+                                  reference_palette: list[np.array]) -> float:
+    """Get how much a colour palette differs from a reference colour palette (e.g., a preview of it).
+
+    Each colour in the colour palette is matched to the closest colour in the reference colour palette in the CIELAB
+    colour space. The difference is the mean colour difference (CIE 1976 delta E) of the matched colours, weighted by
+    the relative frequency of each colour in the colour palette.
+
+    Args:
+        colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) in the colour palette.
+        relative_frequencies (list[float]): The relative frequencies of the colours in the colour palette.
+        reference_palette (list[np.array]): The list of colours ([R,G,B] triplets) in the reference colour palette.
+
+    Returns:
+        (float): The weighted mean colour difference, or infinity if the reference colour palette is empty.
+    """
+
+    if len(colour_palette) == 0:
+        return 0.0
+    if len(reference_palette) == 0:
+        return float("inf")
+
+    lab = color.rgb2lab(np.asarray(colour_palette, dtype=np.uint8).reshape(-1, 1, 3))[:, 0]
+    reference_lab = color.rgb2lab(np.asarray(reference_palette, dtype=np.uint8).reshape(-1, 1, 3))[:, 0]
+    delta_e = np.sqrt(((lab[:, np.newaxis, :] - reference_lab[np.newaxis, :, :]) ** 2).sum(axis=-1)).min(axis=1)
+
+    weights = np.asarray(relative_frequencies, dtype=float)
+    return float(np.sum(delta_e * weights) / np.sum(weights))
+
+
 class PaletteAlgorithm(ABC):
     """Abstract class representing an algorithm used to obtain a colour palette from an image.
 
@@ -76,32 +213,34 @@ class PaletteAlgorithm(ABC):
         url (str): Link to a description of the algorithm
     """
 
+    PEAK_BYTES_PER_PIXEL = 64
+    """Default estimate of the peak memory (bytes) used per pixel of an image to generate its colour palette."""
+
     def __init__(self, name: str, url: str):
 
         self._name = name
         self._url = url
 
-        # Parameters used for progress callback
-        self._progress_callback: Optional[QtCore.SignalInstance] = None
-        self._tab: Optional[tabview.NewTab] = None
-        self._image_data: Optional[imagedata.ImageData] = None
+        # Parameters used for reporting progress
+        self._progress_reporter: Optional[ProgressReporter] = None
         self._percent: int = 0  # Initially 0% complete
 
-        # Execution status of algorithm
-        self._continue_thread: bool = True
+        # Execution status of algorithm (set to cancel), shared with the progress reporter if it has one
+        self._cancel_event = threading.Event()
 
     @property
     def continue_thread(self) -> bool:
         """Get the execution status of the algorithm.
 
         A value of *false* would indicate that the algorithm should return without generation a colour palette when it
-        next checks its execution status.
+        next checks its execution status. The execution status is cheap to check, so it can be checked between the
+        chunks of the vectorised stages of the algorithm.
 
         Returns:
             bool: The execution status of the algorithm
 
         """
-        return self._continue_thread
+        return not self._cancel_event.is_set()
 
     @continue_thread.setter
     def continue_thread(self, value: bool):
@@ -111,7 +250,20 @@ class PaletteAlgorithm(ABC):
             value (bool): The new execution status of the algorithm.
 
         """
-        self._continue_thread = value
+        if value:
+            self._cancel_event.clear()
+        else:
+            self._cancel_event.set()
+
+    @property
+    def progress_reporter(self) -> Optional[ProgressReporter]:
+        """Get the object used by the algorithm to report its progress (see :meth:`set_progress_reporter`).
+
+        Returns:
+            (ProgressReporter): The progress reporter, or None if progress is not reported.
+        """
+
+        return self._progress_reporter
 
     @property
     def name(self) -> str:
@@ -123,6 +275,19 @@ class PaletteAlgorithm(ABC):
         """
         return self._name
 
+    @property
+    def parameters(self) -> dict:
+        """Get the parameters of the algorithm that affect the generated colour palette.
+
+        Used to identify colour palettes that were generated with the same settings (e.g., when caching them).
+        Algorithms with parameters should override this property.
+
+        Returns:
+            (dict): The names and values of the parameters.
+        """
+
+        return {}
+
     @property
     def url(self) -> str:
         """Get the link to the description of the algorithm.
@@ -132,6 +297,22 @@ class PaletteAlgorithm(ABC):
         """
         return self._url
 
+    def estimate_peak_bytes(self, shape: tuple) -> int:
+        """Estimate the peak memory used to generate the colour palette of an image, excluding the image itself.
+
+        Used to decide how many colour palettes can be generated at the same time (see
+        :class:`colourpaletteextractor.model.batchscheduler.BatchScheduler`). Algorithms with a better estimate should
+        override this method.
+
+        Args:
+            shape (tuple): The shape of the image.
+
+        Returns:
+            (int): The estimated peak memory (bytes).
+        """
+
+        return PaletteAlgorithm.PEAK_BYTES_PER_PIXEL * shape[0] * shape[1]
+
     @abstractmethod
     def generate_colour_palette(self, image: np.array) -> tuple[np.array, list[np.array], list[float]]:
         """Generate the colour palette for the given image.
@@ -150,28 +331,57 @@ class PaletteAlgorithm(ABC):
              recoloured image
 
         Note:
-            It is assumed that the input image has been encoded in the sRGB colour space.
+            It is assumed that the input image has been encoded in the sRGB colour space. The input image must not be
+            modified, as it may be a read-only view of the original image (see :func:`get_read_only_view`).
 
         """
 
         pass
 
-    def set_progress_callback(self,
-                              progress_callback: QtCore.SignalInstance,
-                              tab: tabview.NewTab,
-                              image_data) -> None:
-        """Set the signal function called by the algorithm at regular intervals to update the GUI thread.
+    def generate_colour_palette_index_map(self, image: np.array) -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the palette index map for the given image.
+
+        The palette index map holds the index of the colour in the colour palette for each pixel of the recoloured
+        image (see :func:`get_recoloured_image`). By default, the index map is obtained from the recoloured image
+        produced by :meth:`generate_colour_palette`. Algorithms that can produce the index map directly should
+        override this method.
+
+        Args:
+            image (np.array): A 3D array representing an image.
+
+        Returns:
+            index_map (np.array): The index of the colour in the colour palette for each pixel in the image
+            colour_palette (list): The list of colours (sRGB 8-bit values) in the colour palette
+            relative_frequencies (list): The relative frequencies of each colour in the colour palette in the
+             recoloured image
+        """
+
+        recoloured_image, colour_palette, relative_frequencies = self.generate_colour_palette(image)
+        if recoloured_image is None:
+            return None, [], []
+
+        return get_index_map(recoloured_image, colour_palette), colour_palette, relative_frequencies
+
+    def set_progress_reporter(self, progress_reporter: Optional[ProgressReporter]) -> None:
+        """Set the object used by the algorithm at regular intervals to report its progress.
+
+        The progress reporter is also used to check if the algorithm should be cancelled. If it has a cancellation
+        token (see :attr:`ProgressReporter.cancel_event`), the token is shared with the algorithm, so that the
+        algorithm is cancelled as soon as the token is set. Otherwise, the progress reporter is checked each time
+        the algorithm reports its progress.
+
+        As the progress may be reported many times, a progress reporter that is expensive to update (e.g., one that
+        updates a GUI) should be wrapped by a
+        :class:`colourpaletteextractor.model.progressreporter.ThrottledProgressReporter`.
 
         Args:
-            progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI.
-            tab (NewTab): The tab associated with the image being analysed (see :meth:`.generate_colour_palette`.
-            image_data (ImageData): `ImageData` object that holds the image being analysed.
+            progress_reporter (ProgressReporter): The progress reporter. If None, progress is not reported.
 
         """
 
-        self._progress_callback = progress_callback
-        self._tab = tab
-        self._image_data = image_data
+        self._progress_reporter = progress_reporter
+        cancel_event = None if progress_reporter is None else progress_reporter.cancel_event
+        self._cancel_event = threading.Event() if cancel_event is None else cancel_event
 
     def _increment_progress(self, increment) -> None:
         """Increase the algorithm's progress by the provided value.
@@ -190,10 +400,16 @@ class PaletteAlgorithm(ABC):
 
         self._percent += increment
 
-        # Update GUI with new percentage completed
-        if self._progress_callback is not None:
-            self._progress_callback.emit(self._tab, self._percent)
-            self._continue_thread = self._image_data.continue_thread
+        # Report new percentage completed
+        if self._progress_reporter is not None:
+            self._report_progress()
+
+    def _report_progress(self) -> None:
+        """Report the algorithm's progress to the progress reporter and check if the algorithm should be cancelled."""
+
+        self._progress_reporter.report_progress(self._percent)
+        if self._progress_reporter.cancel_event is None:  # Otherwise, the cancellation token is already shared
+            self.continue_thread = self._progress_reporter.continue_thread
 
     def _get_increment_percent(self, final_percent: int, steps: int) -> float:
         """Calculates and returns the percentage increment to reach the`final_percent` in a certain number of `steps`.
@@ -218,7 +434,7 @@ class PaletteAlgorithm(ABC):
         return (final_percent - current_percent) / steps
 
     def _set_progress(self, new_progress: float) -> None:
-        """Set the algorithm progress to a new value and possibly notify the GUI of the change.
+        """Set the algorithm progress to a new value and report the change (if there is a progress reporter).
 
         Args:
             new_progress (float): New value of the progress bar.
@@ -232,6 +448,5 @@ class PaletteAlgorithm(ABC):
             raise ValueError("Algorithm's progress cannot be larger than 100%.")
 
         self._percent = new_progress
-        if self._progress_callback is not None:
-            self._progress_callback.emit(self._tab, self._percent)
-            self._continue_thread = self._image_data.continue_thread
+        if self._progress_reporter is not None:
+            self._report_progress()
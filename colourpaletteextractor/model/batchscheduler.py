@@ -0,0 +1,205 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+def get_default_memory_budget() -> int:
+    """Get the default memory budget of a batch: half of the computer's physical memory.
+
+    Returns:
+        (int): The memory budget (bytes), or :attr:`BatchScheduler.MEMORY_BUDGET` if the size of the physical memory
+            cannot be found.
+    """
+
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // 2
+    except (AttributeError, ValueError, OSError):  # E.g., not available on Windows
+        return BatchScheduler.MEMORY_BUDGET
+
+
+class BatchScheduler:
+    """Queue of the jobs of a batch, admitting them only while the sum of their estimated peak memory fits a budget.
+
+    Jobs are admitted in the order they were added, by calling :meth:`start_job` with the job. Each admitted job must
+    be reported as finished (see :meth:`finish`), so that the next jobs can be admitted. A job whose estimated peak
+    memory is larger than the whole budget is only admitted when no other job is running, so that every batch can be
+    completed.
+
+    Args:
+        start_job (Callable[[Hashable], None]): Called with each job when it is admitted.
+        memory_budget (int): The maximum sum (bytes) of the estimated peak memory of the running jobs.
+
+    Raises:
+        ValueError: If the memory budget is negative.
+    """
+
+    MEMORY_BUDGET = 4 * 1024 ** 3
+    """The default memory budget (bytes) if the size of the physical memory cannot be found."""
+
+    def __init__(self, start_job: Callable[[Hashable], None], memory_budget: int = MEMORY_BUDGET):
+
+        self._start_job = start_job
+        self._memory_budget = None
+        self.memory_budget = memory_budget
+
+        self._lock = threading.RLock()
+        self._queued_jobs: OrderedDict[Hashable, int] = OrderedDict()  # Estimated peak memory of each queued job
+        self._running_jobs: dict[Hashable, int] = {}  # Estimated peak memory of each running job
+
+    def __contains__(self, job: Hashable) -> bool:
+        """Check if a job is queued or running.
+
+        Args:
+            job (Hashable): The job.
+
+        Returns:
+            (bool): True if the job is queued or running. Otherwise False.
+        """
+
+        with self._lock:
+            return job in self._queued_jobs or job in self._running_jobs
+
+    def is_queued(self, job: Hashable) -> bool:
+        """Check if a job is waiting to be admitted.
+
+        Args:
+            job (Hashable): The job.
+
+        Returns:
+            (bool): True if the job is queued. Otherwise False.
+        """
+
+        with self._lock:
+            return job in self._queued_jobs
+
+    @property
+    def memory_budget(self) -> int:
+        """The maximum sum (bytes) of the estimated peak memory of the running jobs.
+
+        Returns:
+            (int): The memory budget.
+
+        Raises:
+            ValueError: If the memory budget is negative.
+        """
+
+        return self._memory_budget
+
+    @memory_budget.setter
+    def memory_budget(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("The memory budget of a batch cannot be negative!")
+        self._memory_budget = value
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of jobs waiting to be admitted.
+
+        Returns:
+            (int): The number of queued jobs.
+        """
+
+        return len(self._queued_jobs)
+
+    @property
+    def running_count(self) -> int:
+        """The number of admitted jobs that have not finished.
+
+        Returns:
+            (int): The number of running jobs.
+        """
+
+        return len(self._running_jobs)
+
+    @property
+    def running_bytes(self) -> int:
+        """The sum (bytes) of the estimated peak memory of the running jobs.
+
+        Returns:
+            (int): The estimated peak memory of the running jobs.
+        """
+
+        return sum(self._running_jobs.values())
+
+    def add(self, job: Hashable, peak_bytes: int) -> None:
+        """Add a job to the queue, admitting it straight away if it fits the memory budget.
+
+        Args:
+            job (Hashable): The job (e.g., the tab whose colour palette is to be generated).
+            peak_bytes (int): The estimated peak memory (bytes) of the job.
+
+        Raises:
+            ValueError: If the job is already queued or running.
+        """
+
+        with self._lock:
+            if job in self._queued_jobs or job in self._running_jobs:
+                raise ValueError("The job has already been added to the batch!")
+
+            self._queued_jobs[job] = peak_bytes
+
+        self._admit()
+
+    def finish(self, job: Hashable) -> None:
+        """Report that a running job has finished, admitting the queued jobs that now fit the memory budget.
+
+        Jobs that are not running are ignored.
+
+        Args:
+            job (Hashable): The job.
+        """
+
+        with self._lock:
+            self._running_jobs.pop(job, None)
+
+        self._admit()
+
+    def cancel(self) -> list[Hashable]:
+        """Remove all the queued jobs. The running jobs are not affected.
+
+        Returns:
+            (list[Hashable]): The jobs that were removed, in the order they would have been admitted.
+        """
+
+        with self._lock:
+            jobs = list(self._queued_jobs)
+            self._queued_jobs.clear()
+
+        return jobs
+
+    def _admit(self) -> None:
+        """Admit the jobs at the front of the queue while they fit the memory budget."""
+
+        while True:
+            with self._lock:
+                if len(self._queued_jobs) == 0:
+                    return
+
+                job, peak_bytes = next(iter(self._queued_jobs.items()))
+                if len(self._running_jobs) > 0 and self.running_bytes + peak_bytes > self._memory_budget:
+                    return  # Wait for running jobs to finish
+
+                del self._queued_jobs[job]
+                self._running_jobs[job] = peak_bytes
+
+            self._start_job(job)
@@ -0,0 +1,196 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+
+if TYPE_CHECKING:
+    from colourpaletteextractor.model.imagedata import ImageData
+
+
+class BinnedImageStore:
+    """Record of the images whose binned images are kept, releasing the least recently used ones beyond a budget.
+
+    A binned image (see :attr:`ImageData.binned_image`) holds the image in the CIELAB colour space, its C* values and
+    the cube of each pixel (around 36 bytes per pixel), so keeping one for every open image would undo the saving of
+    storing the recoloured images as palette index maps. Instead, the images are kept in the order they were last used
+    (see :meth:`keep` and :meth:`use`). Once the total size of their binned images is larger than the budget, the
+    least recently used binned images are removed from their :class:`ImageData` objects and their arrays given back to
+    the workspace (if any), so that they can be reused for the next image. The most recently used binned image (e.g.,
+    that of the image shown by the current tab) is always kept, whatever its size.
+
+    The binned image of an image whose colour palette is being generated (see :meth:`pin`) is never released, as it may
+    still be read by the algorithm. The store can be shared between threads.
+
+    Args:
+        workspace (PaletteWorkspace): (Optional) The workspace the arrays of the released binned images are given back
+            to.
+        max_bytes (int): The maximum total size (bytes) of the kept binned images. The default is :const:`MAX_BYTES`.
+
+    Raises:
+        ValueError: If the maximum size is negative.
+    """
+
+    MAX_BYTES = 512 * 1024 ** 2
+    """Default maximum total size of the kept binned images (512 MiB)."""
+
+    def __init__(self, workspace: PaletteWorkspace = None, max_bytes: int = MAX_BYTES):
+
+        self._workspace = workspace
+        self._lock = threading.RLock()
+        self._images: OrderedDict[int, ImageData] = OrderedDict()  # Keyed by their id, from least to most recently used
+        self._pin_counts: dict[int, int] = {}  # Number of colour palettes being generated for each pinned image
+
+        self._max_bytes = None
+        self.max_bytes = max_bytes
+
+    def __len__(self) -> int:
+        """Get the number of images whose binned images are kept.
+
+        Returns:
+            (int): The number of images.
+        """
+
+        with self._lock:
+            return len(self._images)
+
+    @property
+    def max_bytes(self) -> int:
+        """The maximum total size (bytes) of the kept binned images.
+
+        Returns:
+            (int): The maximum size.
+
+        Raises:
+            ValueError: If the maximum size is negative.
+        """
+
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("The maximum size of the binned images cannot be negative (value of " + str(value)
+                             + " provided)!")
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def nbytes(self) -> int:
+        """The total size (bytes) of the kept binned images.
+
+        Returns:
+            (int): The total size of the kept binned images.
+        """
+
+        with self._lock:
+            return sum(image_data.binned_image.nbytes for image_data in self._images.values()
+                       if image_data.binned_image is not None)
+
+    def keep(self, image_data: ImageData) -> None:
+        """Keep the binned image of an image as the most recently used (e.g., once its colour palette is generated).
+
+        Images without a binned image are not kept. The least recently used binned images are then released if the
+        budget is exceeded.
+
+        Args:
+            image_data (ImageData): The :class:`ImageData` object holding the binned image.
+        """
+
+        with self._lock:
+            if image_data.binned_image is None:
+                self._images.pop(id(image_data), None)
+                return
+            self._images[id(image_data)] = image_data
+            self._images.move_to_end(id(image_data))
+            self._evict()
+
+    def use(self, image_data: ImageData) -> None:
+        """Mark the binned image of an image as the most recently used (e.g., when its tab is shown).
+
+        Args:
+            image_data (ImageData): The :class:`ImageData` object.
+        """
+
+        with self._lock:
+            if id(image_data) in self._images:
+                self.keep(image_data)
+
+    def forget(self, image_data: ImageData) -> None:
+        """Stop keeping the binned image of an image (e.g., when the image is closed).
+
+        Its arrays are not given back to the workspace, as they may still be read by the algorithm.
+
+        Args:
+            image_data (ImageData): The :class:`ImageData` object.
+        """
+
+        with self._lock:
+            self._images.pop(id(image_data), None)
+
+    def pin(self, image_data: ImageData) -> None:
+        """Prevent the binned image of an image from being released while its colour palette is being generated.
+
+        Each call must be followed by a call to :meth:`unpin`.
+
+        Args:
+            image_data (ImageData): The :class:`ImageData` object.
+        """
+
+        with self._lock:
+            self._pin_counts[id(image_data)] = self._pin_counts.get(id(image_data), 0) + 1
+
+    def unpin(self, image_data: ImageData) -> None:
+        """Allow the binned image of an image to be released again, once its colour palette has been generated.
+
+        Args:
+            image_data (ImageData): The :class:`ImageData` object.
+        """
+
+        with self._lock:
+            pin_count = self._pin_counts.pop(id(image_data), 0) - 1
+            if pin_count > 0:
+                self._pin_counts[id(image_data)] = pin_count
+            self._evict()
+
+    def _evict(self) -> None:
+        """Release the least recently used binned images until the total size is within the maximum size.
+
+        The most recently used binned image and pinned binned images are not released. Must be called while holding
+        the lock.
+        """
+
+        nbytes = self.nbytes
+        for key in list(self._images)[:-1]:
+            if nbytes <= self._max_bytes:
+                break
+            if key in self._pin_counts:
+                continue
+
+            image_data = self._images.pop(key)
+            binned_image = image_data.binned_image
+            if binned_image is None:
+                continue
+
+            nbytes -= binned_image.nbytes
+            image_data.binned_image = None
+            if self._workspace is not None:
+                binned_image.give_back(self._workspace)
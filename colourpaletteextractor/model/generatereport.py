@@ -63,7 +63,7 @@ def generate_report(tab: NewTab, image_data: ImageData, settings: QSettings,
     image_data.continue_thread = True  # Set thread status to run (True)
 
     # Check if image_data is suitable (image_data needs to have a recoloured image and a colour palette)
-    if image_data.recoloured_image is None:
+    if not image_data.recoloured_image_available:
         raise ValueError("The provided ImageData object does not have a recoloured image!")
 
     if len(image_data.colour_palette) == 0:
@@ -18,13 +18,71 @@
 from __future__ import annotations
 
 import os.path
+import threading
+from typing import Optional, TYPE_CHECKING
 
 import numpy as np
-from PySide2.QtGui import QImage
 from skimage import io, color, img_as_ubyte
 
+if TYPE_CHECKING:  # Qt is only needed by the GUI, so is not imported when running headless
+    from PySide2.QtGui import QImage
+
+    from colourpaletteextractor.model.algorithms.nieves2020 import BinnedImage
+
 import colourpaletteextractor.model.algorithms.palettealgorithm as palettealgorithm
 
+DRAFT_SCALES: tuple[int, ...] = (2, 4, 8)
+"""The factors by which the width and height of a JPEG image can be reduced while it is being decoded."""
+
+
+def read_reduced_image(file_name_and_path: str, max_pixels: int) -> tuple[Optional[np.array], float]:
+    """Decode a reduced resolution version of an image, with at most `max_pixels` pixels.
+
+    JPEG images are decoded at 1/2, 1/4 or 1/8 of their width and height by libjpeg (using Pillow's draft mode), so
+    the time taken to decode the image falls by roughly the square of the scale. The smallest reduction that is small
+    enough is used. If even 1/8 is too large, every n-th pixel of every n-th row of the decoded image is then kept (see
+    :func:`palettealgorithm.get_preview_image`).
+
+    Other images (e.g., PNG images) cannot be decoded at a reduced resolution, so are not decoded.
+
+    Args:
+        file_name_and_path (str): Path to the image.
+        max_pixels (int): The maximum number of pixels in the reduced resolution image.
+
+    Returns:
+        (np.array): The reduced resolution image (RGB), or None if the image has at most `max_pixels` pixels or cannot
+            be decoded at a reduced resolution.
+        (float): The scale of the reduced resolution image relative to the original image (e.g., 0.25 for an image
+            decoded at 1/4 of its width and height). 1 if no image was decoded.
+
+    Raises:
+        ValueError: If `max_pixels` is less than 1.
+        OSError: If the image file cannot be read.
+    """
+
+    from PIL import Image  # Pillow is used by scikit-image to read images
+
+    if max_pixels < 1:
+        raise ValueError("The reduced resolution image must have at least 1 pixel!")
+
+    with Image.open(file_name_and_path) as image:  # Only the header is read until the image is loaded
+        width, height = image.size
+        if image.format != "JPEG" or width * height <= max_pixels:
+            return None, 1
+
+        # Smallest reduction for which the image has at most max_pixels pixels (or the largest reduction available)
+        draft_scale = DRAFT_SCALES[-1]
+        for scale in DRAFT_SCALES:
+            if -(-width // scale) * -(-height // scale) <= max_pixels:
+                draft_scale = scale
+                break
+
+        image.draft("RGB", (width // draft_scale, height // draft_scale))
+        reduced_image = np.asarray(image.convert("RGB"))
+
+    reduced_image = np.ascontiguousarray(palettealgorithm.get_preview_image(reduced_image, max_pixels))
+    return reduced_image, reduced_image.shape[1] / width
+
 
 class ImageData:
     """Object to hold the data associated with an image to be analysed.
@@ -33,8 +91,20 @@ class ImageData:
     recoloured image, the algorithm used to generate the colour palette and the execution status of the thread used
     to generate the colour palette.
 
+    The recoloured image can instead be stored as a palette index map (see :meth:`set_index_map`), in which case the
+    recoloured image is built each time it is requested and is not kept.
+
+    The image binned by the algorithm can also be kept (see :attr:`binned_image`), so that the colour palette can be
+    generated again with different relevancy parameters without repeating the binning of the image.
+
+    The image can also be decoded later (see :meth:`load`), so that the ImageData object can be created straight away
+    and the image decoded by a background thread. A reduced resolution version of the image can be decoded before
+    the image itself (see :meth:`load_preview`), which is used to preview the image and its colour palette.
+
     Args:
         file_name_and_path (str): Path to the image to be added.
+        load (bool): If True, the image is decoded straight away. If False, the image is only decoded when
+            :meth:`load` is called. The default is True.
 
 
     Raises:
@@ -42,23 +112,29 @@ class ImageData:
 
     """
 
-    def __init__(self, file_name_and_path: str):
+    def __init__(self, file_name_and_path: str, load: bool = True):
 
         self._recoloured_image = None
+        self._index_map = None
+        self._index_map_colour_palette = None
         self._colour_palette = []
         self._colour_palette_relative_frequency = []
+        self._colour_palette_cached = False
+        self._preview_difference = None
         self._algorithm_used = None
-        self._continue_thread = True
+        self._binned_image = None
+        self._cancel_event = threading.Event()  # Set to cancel the thread
+        self._image = None
+        self._preview_image = None
+        self._preview_scale = None
+        self._preview_max_pixels = None
+        self._load_lock = threading.Lock()  # Prevents the image from being decoded twice at the same time
 
         if file_name_and_path is None:
             raise ValueError("The path to an image cannot be None!")
 
         else:
             self._file_name_and_path = file_name_and_path
-            self._image = img_as_ubyte(io.imread(file_name_and_path))  # Import as ubyte to avoid memory issues
-
-            if self._image.shape == 4:  # Removing Alpha channel from image
-                self._image = color.rgba2rgb(self._image)
 
             # Get file name and extension
             _, self._extension = os.path.splitext(file_name_and_path)
@@ -66,6 +142,90 @@ class ImageData:
             while "." in self._name:
                 self._name = os.path.splitext(self._name)[0]
 
+            if load:
+                self.load()
+
+    def load(self) -> np.array:
+        """Decode the image from its file, if it has not already been decoded.
+
+        Can be called from a background thread, as the image is only made available once it has been fully decoded.
+
+        Returns:
+            (np.array): The original image as a Numpy array.
+
+        Raises:
+            OSError: If the image file cannot be read.
+            ValueError: If the image file cannot be decoded.
+        """
+
+        with self._load_lock:
+            if self._image is None:
+                self._image = self._decode_image()
+
+        return self._image
+
+    def load_preview(self, max_pixels: int) -> np.array:
+        """Get a reduced resolution version of the image, with at most `max_pixels` pixels.
+
+        If the image has not been decoded yet, large JPEG images are decoded at a reduced resolution (see
+        :func:`read_reduced_image`). Otherwise, the image is decoded (see :meth:`load`) and a strided view of it is used
+        (see :func:`palettealgorithm.get_preview_image`). The scale of the reduced resolution image is given by
+        :attr:`preview_scale`.
+
+        Args:
+            max_pixels (int): The maximum number of pixels in the reduced resolution image.
+
+        Returns:
+            (np.array): The reduced resolution image, or the image itself if it has at most `max_pixels` pixels.
+
+        Raises:
+            ValueError: If `max_pixels` is less than 1.
+            OSError: If the image file cannot be read.
+        """
+
+        with self._load_lock:
+            if self._preview_image is None or self._preview_max_pixels != max_pixels:
+                preview_image = None
+                preview_scale = 1
+                if self._image is None:
+                    preview_image, preview_scale = read_reduced_image(self._file_name_and_path, max_pixels)
+                    if preview_image is None:  # Small image or not a JPEG image, so decode the image in full
+                        self._image = self._decode_image()
+
+                if preview_image is None:
+                    preview_image = palettealgorithm.get_preview_image(self._image, max_pixels)
+                    preview_scale = preview_image.shape[1] / self._image.shape[1]
+
+                self._preview_image = preview_image
+                self._preview_scale = preview_scale
+                self._preview_max_pixels = max_pixels
+
+        return self._preview_image
+
+    def _decode_image(self) -> np.array:
+        """Decode the image from its file at full resolution.
+
+        Returns:
+            (np.array): The original image as a Numpy array.
+        """
+
+        image = img_as_ubyte(io.imread(self._file_name_and_path))  # Import as ubyte to avoid memory issues
+
+        if image.shape == 4:  # Removing Alpha channel from image
+            image = color.rgba2rgb(image)
+
+        return image
+
+    @property
+    def loaded(self) -> bool:
+        """Check if the image has been decoded from its file.
+
+        Returns:
+            (bool): True if the image has been decoded. Otherwise False.
+        """
+
+        return self._image is not None
+
     @staticmethod
     def get_image_as_q_image(image: np.array) -> QImage:
         """Convert a Numpy array representation of an image to a QImage.
@@ -80,6 +240,8 @@ class ImageData:
             ValueError: If the provided image is not a greyscale, rGB or RGBA image (1, 3, or 4 colour channels).
         """
 
+        from PySide2.QtGui import QImage
+
         if image.ndim == 3:
             height, width, channel = image.shape
             bytes_per_line = 3 * width
@@ -105,6 +267,41 @@ class ImageData:
                                                                reverse=reverse)]
         self._colour_palette_relative_frequency.sort(reverse=reverse)
 
+    def set_index_map(self, index_map: np.array, colour_palette: list[np.array]) -> None:
+        """Set the palette index map of the recoloured image.
+
+        Any existing recoloured image is removed. The colours are kept in the order of the index map, so that the
+        colour palette can still be sorted (see :meth:`sort_colour_palette`).
+
+        Args:
+            index_map (np.array): The index of the colour in the colour palette for each pixel in the image.
+            colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) indexed by the index map.
+        """
+
+        self._recoloured_image = None
+        self._index_map = index_map
+        self._index_map_colour_palette = list(colour_palette)
+
+    @property
+    def index_map(self) -> np.array:
+        """The palette index map of the recoloured image, represented as a 2-D Numpy array.
+
+        Returns:
+            (np.array): The palette index map, or None if the recoloured image is not stored as an index map.
+        """
+
+        return self._index_map
+
+    @property
+    def recoloured_image_available(self) -> bool:
+        """Check if the image has a recoloured image, without building it from its index map.
+
+        Returns:
+            (bool): True if the image has a recoloured image. Otherwise False.
+        """
+
+        return self._recoloured_image is not None or self._index_map is not None
+
     @property
     def continue_thread(self) -> bool:
         """Specify if the thread for generating the colour palette or the report should be cancelled.
@@ -113,11 +310,59 @@ class ImageData:
             (bool): True if the thread should be continued. Otherwise False.
         """
 
-        return self._continue_thread
+        return not self._cancel_event.is_set()
 
     @continue_thread.setter
     def continue_thread(self, value: bool):
-        self._continue_thread = value
+        if value:
+            self._cancel_event.clear()
+        else:
+            self._cancel_event.set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """The cancellation token of the thread for generating the colour palette or the report.
+
+        The event is set when :attr:`continue_thread` is set to False, so it can be shared with the algorithm to
+        cheaply check if it should be cancelled.
+
+        Returns:
+            (threading.Event): The cancellation token.
+        """
+
+        return self._cancel_event
+
+    @property
+    def colour_palette_cached(self) -> bool:
+        """Specify if the colour palette was loaded from the cache of generated colour palettes.
+
+        Returns:
+            (bool): True if the colour palette was loaded from the cache. Otherwise False.
+        """
+
+        return self._colour_palette_cached
+
+    @colour_palette_cached.setter
+    def colour_palette_cached(self, value: bool):
+        self._colour_palette_cached = value
+
+    @property
+    def preview_difference(self) -> float:
+        """How much the preview of the colour palette differed from the final colour palette.
+
+        Given as the mean colour difference (CIE 1976 delta E) between each colour in the colour palette and the
+        closest colour in the preview, weighted by relative frequency (see
+        :func:`palettealgorithm.get_colour_palette_difference`).
+
+        Returns:
+            (float): The difference, or None if the colour palette was not generated progressively.
+        """
+
+        return self._preview_difference
+
+    @preview_difference.setter
+    def preview_difference(self, value: float):
+        self._preview_difference = value
 
     @property
     def algorithm_used(self) -> type[palettealgorithm.PaletteAlgorithm]:
@@ -133,6 +378,20 @@ class ImageData:
     def algorithm_used(self, value: type[palettealgorithm.PaletteAlgorithm]):
         self._algorithm_used = value
 
+    @property
+    def binned_image(self) -> BinnedImage:
+        """The image binned by the algorithm used to generate the image's colour palette.
+
+        Returns:
+            (BinnedImage): The binned image, or None if the image has not been binned.
+        """
+
+        return self._binned_image
+
+    @binned_image.setter
+    def binned_image(self, value: BinnedImage):
+        self._binned_image = value
+
     @property
     def colour_palette_relative_frequency(self) -> list[float]:
         """The relative frequencies of each colour in the colour palette in the recoloured image.
@@ -174,24 +433,56 @@ class ImageData:
         """The original image, represented as a 2 or 3-D Numpy array.
 
         Returns:
-            (np.array): The original image as a Numpy array.
+            (np.array): The original image as a Numpy array, or None if the image has not been decoded yet (see
+                :meth:`load`).
         """
 
         return self._image
 
+    @property
+    def preview_image(self) -> np.array:
+        """The reduced resolution version of the image, represented as a 2 or 3-D Numpy array.
+
+        Returns:
+            (np.array): The reduced resolution image, or None if it has not been decoded yet (see
+                :meth:`load_preview`).
+        """
+
+        return self._preview_image
+
+    @property
+    def preview_scale(self) -> float:
+        """The scale of the reduced resolution version of the image relative to the image (see :attr:`preview_image`).
+
+        For example, 0.25 if the reduced resolution image is 1/4 of the width and height of the image.
+
+        Returns:
+            (float): The scale of the reduced resolution image, or None if it has not been decoded yet.
+        """
+
+        return self._preview_scale
+
     @property
     def recoloured_image(self):
         """The recoloured image, represented as a 3-D Numpy array.
 
+        If only the palette index map is stored, a new recoloured image is built from it. It is not kept, so that
+        only the index map (1-4 B/px instead of 3 B/px) is held for each image.
+
         Returns:
             (np.array): The recoloured image as a Numpy array.
         """
 
+        if self._recoloured_image is None and self._index_map is not None:
+            return palettealgorithm.get_recoloured_image(self._index_map, self._index_map_colour_palette)
+
         return self._recoloured_image
 
     @recoloured_image.setter
     def recoloured_image(self, value: np.array):
         self._recoloured_image = value
+        self._index_map = None  # Recoloured image replaces the index map
+        self._index_map_colour_palette = None
 
     @property
     def colour_palette(self) -> list[np.array]:
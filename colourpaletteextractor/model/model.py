@@ -15,23 +15,34 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+from __future__ import annotations
+
 import errno
 import os
 import sys
 import tempfile
-from typing import Optional
+from typing import Callable, Optional, TYPE_CHECKING
 
 import numpy as np
-from PySide2 import QtCore
-
-from PySide2.QtCore import QStandardPaths, QSettings, QSize, QPoint
 
-from colourpaletteextractor import _version
-from colourpaletteextractor.model import generatereport
+from colourpaletteextractor import _settings, _version
 from colourpaletteextractor.model.imagedata import ImageData
 from colourpaletteextractor.model.algorithms import nieves2020
-from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm
-from colourpaletteextractor.view.tabview import NewTab
+from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm, get_read_only_view, \
+    get_preview_image, get_colour_palette_difference
+from colourpaletteextractor.model.batchscheduler import get_default_memory_budget
+from colourpaletteextractor.model.binnedimagestore import BinnedImageStore
+from colourpaletteextractor.model.palettecache import PaletteCache
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+from colourpaletteextractor.model.processpool import PaletteProcessPool
+from colourpaletteextractor.model.progressreporter import ProgressReporter, MutedProgressReporter
+from colourpaletteextractor.model.tiledimage import TILE_PIXELS, open_tiled_image
+
+if TYPE_CHECKING:  # Qt is only needed by the GUI, so is imported when first used
+    from PySide2 import QtCore
+    from PySide2.QtCore import QSettings, QSize, QPoint
+
+    from colourpaletteextractor.view.tabview import NewTab
 
 
 def generate_colour_palette_from_image(path_to_file: str, algorithm: type[PaletteAlgorithm] = None) -> \
@@ -40,6 +51,8 @@ def generate_colour_palette_from_image(path_to_file: str, algorithm: type[Palett
 
     An example algorithm would be nieves2020.Nieves2020CentredCubes
 
+    The application's settings are not used, so Qt is not required.
+
     Args:
         path_to_file (str): Path to the image to be analysed.
         algorithm (type[PaletteAlgorithm]): The Python class of the the colour palette extraction algorithm.
@@ -50,21 +63,20 @@ def generate_colour_palette_from_image(path_to_file: str, algorithm: type[Palett
         (list[float]): The relative frequencies of the colours in the colour palette in the recoloured image.
     """
 
-    model = ColourPaletteExtractorModel()
-
     # Check if the provided file exists
     if os.path.isfile(path_to_file) is False:
         raise FileNotFoundError(
             errno.ENOENT, os.strerror(errno.ENOENT), path_to_file)
     else:
-        image_data_id, image_data = model.add_image(path_to_file)
+        image_data = ImageData(path_to_file)
 
     # Get the colour palette of the image
     if algorithm is None:
-        model.generate_palette(image_data_id, None, None,
-                               algorithm=ColourPaletteExtractorModel.DEFAULT_ALGORITHM)
-    else:
-        model.generate_palette(image_data_id, None, None, algorithm=algorithm)
+        algorithm = ColourPaletteExtractorModel.DEFAULT_ALGORITHM
+    elif not ColourPaletteExtractorModel._check_algorithm_valid(algorithm_class=algorithm):
+        raise ValueError(algorithm, "is not a valid Class type!")
+
+    generate_image_data_colour_palette(image_data, algorithm())
 
     new_recoloured_image = image_data.recoloured_image
     image_colour_palette = image_data.colour_palette
@@ -73,6 +85,271 @@ def generate_colour_palette_from_image(path_to_file: str, algorithm: type[Palett
     return new_recoloured_image, image_colour_palette, relative_frequency
 
 
+def generate_colour_palette_sweep_from_image(path_to_file: str, cube_sizes: list[int], thresholds: list[float],
+                                             algorithm: type[nieves2020.Nieves2020] = None) -> list[dict]:
+    """Generate the colour palette of the given image for every combination of cube size and threshold.
+
+    See :meth:`nieves2020.Nieves2020.generate_colour_palette_sweep` for more information. The application's settings
+    are not used, so Qt is not required.
+
+    Args:
+        path_to_file (str): Path to the image to be analysed.
+        cube_sizes (list[int]): The cube sizes (delta-E* length of cube side) to be used.
+        thresholds (list[float]): The primary thresholds to be used.
+        algorithm (type[nieves2020.Nieves2020]): (Optional) The Python class of a variant of the Nieves 2020 algorithm.
+            By default, :const:`ColourPaletteExtractorModel.DEFAULT_ALGORITHM` is used.
+
+    Returns:
+        (list[dict]): One row for each colour of each colour palette, with the cube size, threshold, rank of the
+            colour, its red, green and blue values and its relative frequency.
+    """
+
+    # Check if the provided file exists
+    if os.path.isfile(path_to_file) is False:
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), path_to_file)
+
+    if algorithm is None:
+        algorithm = ColourPaletteExtractorModel.DEFAULT_ALGORITHM
+    if not issubclass(algorithm, nieves2020.Nieves2020):
+        raise ValueError(algorithm, "is not a variant of the Nieves 2020 algorithm!")
+
+    image_data = ImageData(path_to_file)
+    return algorithm().generate_colour_palette_sweep(image_data.image, cube_sizes, thresholds)
+
+
+def generate_colour_palette_from_tiled_image(path_to_file: str, index_map_file: str = None,
+                                             algorithm: type[nieves2020.Nieves2020] = None,
+                                             tile_pixels: int = TILE_PIXELS) -> \
+        tuple[np.ndarray, list[np.ndarray], list[float]]:
+    """Generate the colour palette of an image that is too large to be held in memory, reading it in tiles.
+
+    See :meth:`nieves2020.Nieves2020.generate_colour_palette_index_map_tiled` and
+    :func:`tiledimage.open_tiled_image` for more information. The application's settings are not used, so Qt is not
+    required.
+
+    Args:
+        path_to_file (str): Path to the image to be analysed (e.g., a .npy file or a tiled TIFF image).
+        index_map_file (str): (Optional) Path to the .npy file the palette index map is written to. By default, only
+            the colour palette is generated.
+        algorithm (type[nieves2020.Nieves2020]): (Optional) The Python class of a variant of the Nieves 2020 algorithm.
+            By default, :const:`ColourPaletteExtractorModel.DEFAULT_ALGORITHM` is used.
+        tile_pixels (int): The maximum number of pixels in each tile (for images that are not TIFF images).
+
+    Returns:
+        (np.ndarray): The palette index map (memory-mapped from `index_map_file`), or None if no file was given.
+        (list[np.ndarray]): The list of colours ([R,G,B] triplets) in the colour palette.
+        (list[float]): The relative frequencies of the colours in the colour palette in the recoloured image.
+    """
+
+    # Check if the provided file exists
+    if os.path.isfile(path_to_file) is False:
+        raise FileNotFoundError(
+            errno.ENOENT, os.strerror(errno.ENOENT), path_to_file)
+
+    if algorithm is None:
+        algorithm = ColourPaletteExtractorModel.DEFAULT_ALGORITHM
+    if not issubclass(algorithm, nieves2020.Nieves2020):
+        raise ValueError(algorithm, "is not a variant of the Nieves 2020 algorithm!")
+
+    tiled_image = open_tiled_image(path_to_file, tile_pixels)
+    return algorithm().generate_colour_palette_index_map_tiled(tiled_image, index_map_file)
+
+
+PREVIEW_MAX_PIXELS: int = 250_000
+"""The default maximum number of pixels of the reduced resolution image used to preview a colour palette."""
+
+
+def generate_image_data_colour_palette(image_data: ImageData, algorithm: PaletteAlgorithm,
+                                       is_current: Callable[[], bool] = None, cache: PaletteCache = None,
+                                       preview: Callable[[list[np.array], list[float]], None] = None,
+                                       preview_max_pixels: int = PREVIEW_MAX_PIXELS,
+                                       process_pool: PaletteProcessPool = None) -> None:
+    """Generate the colour palette of the image in an :class:`ImageData` object and assign it to the object.
+
+    The colour palette is sorted by the relative frequency of each colour (largest first). If the image has already
+    been binned by the same algorithm with the same binning parameters (see :attr:`ImageData.binned_image`), only the
+    relevancy of each cube is decided again.
+
+    If a `preview` callback is provided and the image has more than `preview_max_pixels` pixels, the colour palette is
+    generated progressively: a provisional colour palette is first generated from a reduced resolution version of the
+    image (see :meth:`ImageData.load_preview`) and passed to the callback, before the colour palette is generated from
+    the full resolution image. How much the preview differed from the final colour palette is then assigned to the
+    :class:`ImageData` object (see :attr:`ImageData.preview_difference`).
+
+    If a `process_pool` is provided, the colour palette is generated in one of its worker processes instead of the
+    calling thread. The image binned by the worker process is not kept, and no preview is generated.
+
+    Args:
+        image_data (ImageData): The :class:`ImageData` object holding the image.
+        algorithm (PaletteAlgorithm): The algorithm instance used to generate the colour palette.
+        is_current (Callable[[], bool]): (Optional) Called after the colour palette has been generated. If it returns
+            False, the colour palette is not assigned to the :class:`ImageData` object (e.g., the image has since been
+            closed).
+        cache (PaletteCache): (Optional) If provided, the colour palette is loaded from the cache if it has already
+            been generated for the same image and algorithm settings. Otherwise, it is generated and saved to it.
+        preview (Callable[[list[np.array], list[float]], None]): (Optional) Called with the provisional colour
+            palette (sorted by relative frequency) and its relative frequencies when generating the colour palette
+            progressively.
+        preview_max_pixels (int): The maximum number of pixels of the reduced resolution image used for the preview.
+        process_pool (PaletteProcessPool): (Optional) The pool of worker processes used to generate the colour
+            palette.
+    """
+
+    # Set algorithm type used for the given image
+    image_data.algorithm_used = type(algorithm)
+
+    # Load colour palette from the cache...
+    preview_colour_palette = []
+    cache_key = None
+    cached_result = None
+    if cache is not None:
+        cache_key = cache.get_key(image_data.image, algorithm)
+        cached_result = cache.load(cache_key)
+
+    if cached_result is not None:
+        index_map, image_colour_palette, new_relative_frequencies = cached_result
+        if _settings.__VERBOSE__:
+            print("Colour palette loaded from cache...")
+
+    # ...or generate it from the image binned during a previous generation (only the relevancy parameters differ)...
+    elif isinstance(algorithm, nieves2020.Nieves2020) and algorithm.can_reuse_binned_image(image_data.binned_image):
+        index_map, image_colour_palette, new_relative_frequencies = \
+            algorithm.generate_colour_palette_index_map_from_binned_image(image_data.binned_image)
+
+    # ...or generate it from the image (after a preview of it from a reduced resolution view of the image)
+    else:
+        image = get_read_only_view(image_data.image)  # Algorithms never modify the image
+        if process_pool is not None:
+            index_map, image_colour_palette, new_relative_frequencies = \
+                process_pool.generate_colour_palette_index_map(image, algorithm)
+
+        else:
+            if preview is not None:
+                preview_image = get_read_only_view(image_data.load_preview(preview_max_pixels))
+                preview_colour_palette, preview_relative_frequencies = generate_colour_palette_preview(
+                    image, algorithm, preview_max_pixels, preview_image=preview_image)
+                if len(preview_colour_palette) > 0:
+                    preview(preview_colour_palette, preview_relative_frequencies)
+
+            index_map, image_colour_palette, new_relative_frequencies = \
+                algorithm.generate_colour_palette_index_map(image)
+
+    # Measure how much the preview differed from the final colour palette
+    preview_difference = None
+    if len(preview_colour_palette) > 0 and index_map is not None:
+        preview_difference = get_colour_palette_difference(image_colour_palette, new_relative_frequencies,
+                                                           preview_colour_palette)
+        if _settings.__VERBOSE__:
+            print("Colour palette preview differed from the final colour palette by a mean delta E of "
+                  + str(round(preview_difference, 2)) + "...")
+
+    if cached_result is None and cache is not None and index_map is not None:
+        cache.save(cache_key, index_map, image_colour_palette, new_relative_frequencies)
+
+    if is_current is not None and not is_current():
+        return
+
+    image_data.colour_palette_cached = cached_result is not None
+    image_data.preview_difference = preview_difference
+
+    # Keep the binned image so that the colour palette can be generated again with different relevancy parameters
+    if isinstance(algorithm, nieves2020.Nieves2020) and algorithm.binned_image is not None:
+        image_data.binned_image = algorithm.binned_image
+
+    # Assign properties to image_data (recoloured image is built from the index map when needed)
+    if index_map is None:
+        image_data.recoloured_image = None
+    else:
+        image_data.set_index_map(index_map, image_colour_palette)
+    image_data.colour_palette = image_colour_palette
+    image_data.colour_palette_relative_frequency = new_relative_frequencies
+
+    # Sort colour palette by relative frequency
+    image_data.sort_colour_palette(reverse=True)
+
+
+def generate_colour_palette_preview(image: np.array, algorithm: PaletteAlgorithm,
+                                    max_pixels: int = PREVIEW_MAX_PIXELS,
+                                    preview_image: np.array = None) -> tuple[list[np.array], list[float]]:
+    """Generate a provisional colour palette of an image from a reduced resolution version of the image.
+
+    The algorithm's progress is not reported while generating the preview, but the algorithm is still cancelled by
+    its progress reporter (see :class:`MutedProgressReporter`). Any image binned for the preview is released, so the
+    algorithm is left ready to generate the colour palette of the full resolution image.
+
+    Args:
+        image (np.array): The image.
+        algorithm (PaletteAlgorithm): The algorithm instance used to generate the colour palette.
+        max_pixels (int): The maximum number of pixels of the reduced resolution image.
+        preview_image (np.array): (Optional) The reduced resolution image (e.g., decoded by
+            :meth:`ImageData.load_preview`). If None, a reduced resolution view of the image is used (see
+            :func:`get_preview_image`).
+
+    Returns:
+        (list[np.array]): The colours ([R,G,B] triplets) in the provisional colour palette, sorted by their relative
+            frequency (largest first). Empty if the image is not larger than `max_pixels` or the algorithm was
+            cancelled.
+        (list[float]): The relative frequencies of the colours in the provisional colour palette.
+    """
+
+    if preview_image is None:
+        preview_image = get_preview_image(image, max_pixels)
+    if preview_image.shape[:2] == image.shape[:2]:
+        return [], []  # Image is already small enough
+
+    progress_reporter = algorithm.progress_reporter
+    algorithm.set_progress_reporter(None if progress_reporter is None else MutedProgressReporter(progress_reporter))
+    try:
+        _, colour_palette, relative_frequencies = algorithm.generate_colour_palette_index_map(preview_image)
+    finally:
+        if isinstance(algorithm, nieves2020.Nieves2020):
+            algorithm.release_binned_image()
+        algorithm.set_progress_reporter(progress_reporter)
+
+    # Sort colour palette by relative frequency
+    order = sorted(range(len(colour_palette)), key=lambda i: relative_frequencies[i], reverse=True)
+    return [colour_palette[i] for i in order], [relative_frequencies[i] for i in order]
+
+
+def get_default_cache_directory() -> str:
+    """Get the default directory for the cache of generated colour palettes.
+
+    Returns:
+        (str): The path to the 'Palettes' folder in the application's cache location.
+    """
+
+    from PySide2.QtCore import QStandardPaths
+
+    cache_directory = os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+                                   _version.__application_name__,
+                                   "Palettes")
+
+    if sys.platform == "win32":
+        cache_directory = cache_directory.replace("\\", "/")  # Consistent looking path
+
+    return cache_directory
+
+
+def get_default_user_directory() -> str:
+    """Get the default user output directory for colour palette reports.
+
+    Returns:
+        (str): The path to the 'Output' folder of the application in the user's documents folder.
+    """
+
+    from PySide2.QtCore import QStandardPaths
+
+    user_directory = os.path.join(QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation),
+                                  _version.__application_name__,
+                                  "Output")
+
+    if sys.platform == "win32":
+        user_directory = user_directory.replace("\\", "/")  # Consistent looking path
+
+    return user_directory
+
+
 def get_settings() -> QSettings:
     """Get the settings file for the ColourPaletteExtraction application.
 
@@ -80,6 +357,8 @@ def get_settings() -> QSettings:
         (QSettings): The settings for the ColourPaletteExtraction application.
     """
 
+    from PySide2.QtCore import QSettings
+
     settings = QSettings(QSettings.IniFormat,
                          QSettings.UserScope,
                          _version.__organisation__,
@@ -98,17 +377,27 @@ class ColourPaletteExtractorModel:
     DEFAULT_ALGORITHM: type[PaletteAlgorithm] = nieves2020.Nieves2020CentredCubes
     """The default colour palette extraction algorithm Python Class."""
 
-    DEFAULT_USER_DIRECTORY: str = os.path.join(QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation),
-                                               _version.__application_name__,
-                                               "Output")
-    """The default user output directory for colour palette reports."""
-
-    if sys.platform == "win32":
-        DEFAULT_USER_DIRECTORY = DEFAULT_USER_DIRECTORY.replace("\\", "/")  # Consistent looking path
-
     DEFAULT_USE_USER_DIRECTORY: bool = False
     """Specify by default whether a user's output directory should be used for saving the colour palette report to."""
 
+    DEFAULT_CACHE_MAX_BYTES: int = PaletteCache.MAX_BYTES
+    """The default maximum size (bytes) of the cache of generated colour palettes."""
+
+    DEFAULT_BINNED_IMAGES_MAX_BYTES: int = BinnedImageStore.MAX_BYTES
+    """The default maximum size (bytes) of the binned images kept to generate colour palettes again."""
+
+    DEFAULT_ALGORITHM_PARAMETERS: dict = {"threshold": nieves2020.Nieves2020.THRESHOLD,
+                                          "secondary_threshold": nieves2020.Nieves2020.SECONDARY_THRESHOLD,
+                                          "c_star_percentile": nieves2020.Nieves2020.C_STAR_PERCENTILE,
+                                          "min_l_star": nieves2020.Nieves2020.MIN_L_STAR}
+    """The default relevancy parameters of the colour palette extraction algorithm."""
+
+    ALGORITHM_PARAMETER_SETTINGS: dict = {"threshold": "algorithm/threshold",
+                                          "secondary_threshold": "algorithm/secondary threshold",
+                                          "c_star_percentile": "algorithm/c star percentile",
+                                          "min_l_star": "algorithm/minimum l star"}
+    """The keys in the settings file for each of the relevancy parameters of the algorithm."""
+
     DEFAULT_HEIGHT: int = 894  # Based on size of 'how-to' image
     """Default height of the ColourPaletteExtraction application.
     
@@ -124,6 +413,10 @@ class ColourPaletteExtractorModel:
     SUPPORTED_IMAGE_TYPES: set[str] = {"png", "jpg", "jpeg"}
     """The set of supported image extensions."""
 
+    DEFAULT_PROGRESSIVE_PREVIEW: bool = True
+    """Specify by default whether a preview of the colour palette of a large image should be shown while its colour
+    palette is being generated."""
+
     def __init__(self) -> None:
 
         self._image_data_id_counter = 0
@@ -136,6 +429,32 @@ class ColourPaletteExtractorModel:
         # Read-in settings file
         self._read_settings()
 
+        # Cache of generated colour palettes
+        self._palette_cache = PaletteCache(directory=get_default_cache_directory(),
+                                           max_bytes=int(self._settings.value(
+                                               "cache/maximum size",
+                                               ColourPaletteExtractorModel.DEFAULT_CACHE_MAX_BYTES)))
+
+        # Maximum estimated peak memory of the colour palettes generated at the same time in a batch
+        self._batch_memory_budget = int(self._settings.value("batch/memory budget", get_default_memory_budget()))
+
+        # Arrays shared between the algorithm instances (e.g., when generating the colour palettes of all images)
+        self._palette_workspace = PaletteWorkspace()
+
+        # Binned images kept to generate colour palettes again with new relevancy parameters (least recently used ones
+        # are given back to the workspace)
+        self._binned_images = BinnedImageStore(workspace=self._palette_workspace,
+                                               max_bytes=int(self._settings.value(
+                                                   "binned images/maximum size",
+                                                   ColourPaletteExtractorModel.DEFAULT_BINNED_IMAGES_MAX_BYTES)))
+
+        # Worker processes used to generate the colour palettes of large images in a batch
+        self._palette_process_pool = PaletteProcessPool()
+
+        # Generate the colour palettes of large images progressively
+        self._progressive_preview = ColourPaletteExtractorModel.DEFAULT_PROGRESSIVE_PREVIEW
+        self._preview_max_pixels = PREVIEW_MAX_PIXELS
+
     @staticmethod
     def _check_algorithm_valid(algorithm_class: type[PaletteAlgorithm]) -> bool:
         """Check if the provided algorithm class is a valid subclass of :class:`PaletteAlgorithm`.
@@ -209,6 +528,128 @@ class ColourPaletteExtractorModel:
     def active_thread_counter(self, value: int) -> None:
         self._active_thread_counter = value
 
+    @property
+    def palette_cache(self) -> PaletteCache:
+        """The cache of generated colour palettes.
+
+        Returns:
+            (PaletteCache): The cache of generated colour palettes.
+        """
+
+        return self._palette_cache
+
+    @property
+    def palette_workspace(self) -> PaletteWorkspace:
+        """The workspace that the algorithms borrow their per-pixel arrays from.
+
+        The arrays that are only needed while a colour palette is being generated are given back to the workspace,
+        so that they can be reused for the next image (see :attr:`nieves2020.Nieves2020.workspace`). The binned
+        images kept by the :class:`ImageData` objects are only given back once they are no longer among the most
+        recently used (see :attr:`binned_images`).
+
+        Returns:
+            (PaletteWorkspace): The workspace.
+        """
+
+        return self._palette_workspace
+
+    @property
+    def binned_images(self) -> BinnedImageStore:
+        """The record of the images whose binned images are kept, within a budget set in the settings file.
+
+        Returns:
+            (BinnedImageStore): The record of the kept binned images.
+        """
+
+        return self._binned_images
+
+    @property
+    def batch_memory_budget(self) -> int:
+        """The maximum sum (bytes) of the estimated peak memory of the colour palettes generated at the same time.
+
+        Used when generating the colour palettes of all images (see
+        :class:`colourpaletteextractor.model.batchscheduler.BatchScheduler`). Set in the ColourPaletteExtractor.ini
+        settings file, by default half of the computer's physical memory. The memory that can stay in use once the
+        colour palettes have been generated (the kept binned images, see :attr:`binned_images`) is not available to
+        the batch.
+
+        Returns:
+            (int): The memory budget (bytes).
+        """
+
+        return max(0, self._batch_memory_budget - self._binned_images.max_bytes)
+
+    def estimate_palette_peak_bytes(self, image_data_id: str) -> int:
+        """Estimate the peak memory used to generate the colour palette of the image with the given ID.
+
+        Args:
+            image_data_id (str): The dictionary key/ID ('Tab_xx') for the :class:`ImageData` object in the
+                :attr:`image_data_id_dictionary`.
+
+        If the image's binned image has been kept and can be reused by the selected algorithm (e.g., only the
+        relevancy parameters have changed), only the memory used to generate the colour palette from it is estimated.
+
+        Returns:
+            (int): The estimated peak memory (bytes) of the selected algorithm (see
+                :meth:`PaletteAlgorithm.estimate_peak_bytes` and
+                :meth:`Nieves2020.estimate_peak_bytes_from_binned_image`).
+        """
+
+        image_data = self.get_image_data(image_data_id)
+        algorithm = self._get_algorithm()
+        binned_image = image_data.binned_image
+        if isinstance(algorithm, nieves2020.Nieves2020) and algorithm.can_reuse_binned_image(binned_image):
+            return algorithm.estimate_peak_bytes_from_binned_image(binned_image)
+        return algorithm.estimate_peak_bytes(image_data.image.shape)
+
+    @property
+    def palette_process_pool(self) -> PaletteProcessPool:
+        """The pool of worker processes used to generate the colour palettes of large images in a batch.
+
+        Its worker processes are only started when first used (see :meth:`generate_palette`).
+
+        Returns:
+            (PaletteProcessPool): The pool of worker processes.
+        """
+
+        return self._palette_process_pool
+
+    @property
+    def progressive_preview(self) -> bool:
+        """Specify if the colour palette of a large image is previewed while it is being generated.
+
+        The preview is generated from a reduced resolution view of the image with at most :attr:`preview_max_pixels`
+        pixels (see :func:`generate_image_data_colour_palette`).
+
+        Returns:
+            (bool): True if the colour palette is generated progressively. Otherwise False.
+        """
+
+        return self._progressive_preview
+
+    @progressive_preview.setter
+    def progressive_preview(self, value: bool) -> None:
+        self._progressive_preview = value
+
+    @property
+    def preview_max_pixels(self) -> int:
+        """The maximum number of pixels of the reduced resolution image used to preview a colour palette.
+
+        Returns:
+            (int): The maximum number of pixels.
+
+        Raises:
+            ValueError: If the maximum number of pixels is less than 1.
+        """
+
+        return self._preview_max_pixels
+
+    @preview_max_pixels.setter
+    def preview_max_pixels(self, value: int) -> None:
+        if value < 1:
+            raise ValueError("The preview image must have at least 1 pixel!")
+        self._preview_max_pixels = value
+
     @property
     def image_data_id_dictionary(self) -> dict:
         """The dictionary storing the :class:`ImageData` objects for the images currently open.
@@ -240,6 +681,8 @@ class ColourPaletteExtractorModel:
 
         print("Writing default settings to config file...")
 
+        from PySide2.QtCore import QSize
+
         # Set default main window preferences
         self._settings.beginGroup("main window")
         self._settings.setValue("size", QSize(ColourPaletteExtractorModel.DEFAULT_WIDTH,
@@ -249,15 +692,27 @@ class ColourPaletteExtractorModel:
         # Set default output directory preferences
         self._settings.beginGroup("output directory")
         self._settings.setValue('temporary directory', self._temp_dir.name)
-        self._settings.setValue('user directory', ColourPaletteExtractorModel.DEFAULT_USER_DIRECTORY)
+        self._settings.setValue('user directory', get_default_user_directory())
         self._settings.setValue('use user directory', int(ColourPaletteExtractorModel.DEFAULT_USE_USER_DIRECTORY))
         self._settings.endGroup()
 
+        # Set default cache preferences
+        self._settings.beginGroup("cache")
+        self._settings.setValue('maximum size', ColourPaletteExtractorModel.DEFAULT_CACHE_MAX_BYTES)
+        self._settings.endGroup()
+
+        # Set default binned images preferences
+        self._settings.beginGroup("binned images")
+        self._settings.setValue('maximum size', ColourPaletteExtractorModel.DEFAULT_BINNED_IMAGES_MAX_BYTES)
+        self._settings.endGroup()
+
         # Set default algorithm preferences
         self._settings.beginGroup("algorithm")
         self._settings.setValue('default algorithm', ColourPaletteExtractorModel.DEFAULT_ALGORITHM)
         self._settings.setValue('selected algorithm', ColourPaletteExtractorModel.DEFAULT_ALGORITHM)
         self._settings.endGroup()
+        for name, value in ColourPaletteExtractorModel.DEFAULT_ALGORITHM_PARAMETERS.items():
+            self._settings.setValue(ColourPaletteExtractorModel.ALGORITHM_PARAMETER_SETTINGS[name], value)
 
         # Update settings file
         self._settings.sync()
@@ -267,6 +722,11 @@ class ColourPaletteExtractorModel:
 
         self._temp_dir.cleanup()  # Removing temporary directory
 
+    def close_process_pool(self) -> None:
+        """Stop the worker processes used to generate colour palettes (see :attr:`palette_process_pool`)."""
+
+        self._palette_process_pool.shutdown()
+
     def set_algorithm(self, algorithm_class: type[PaletteAlgorithm] = DEFAULT_ALGORITHM) -> None:
         """Set the algorithm used to generate the colour palette of an image.
 
@@ -284,11 +744,54 @@ class ColourPaletteExtractorModel:
             self._settings.setValue("algorithm/selected algorithm", algorithm_class)
             self._settings.sync()
 
-    def add_image(self, file_name_and_path: str) -> tuple[str, ImageData]:
+    def get_algorithm_parameters(self) -> dict:
+        """Get the relevancy parameters of the algorithm from the ColourPaletteExtractor.ini settings file.
+
+        Parameters missing from the settings file take their default value (see
+        :const:`DEFAULT_ALGORITHM_PARAMETERS`).
+
+        Returns:
+            (dict): The names and values of the relevancy parameters.
+        """
+
+        return {name: float(self._settings.value(key, ColourPaletteExtractorModel.DEFAULT_ALGORITHM_PARAMETERS[name]))
+                for name, key in ColourPaletteExtractorModel.ALGORITHM_PARAMETER_SETTINGS.items()}
+
+    def set_algorithm_parameters(self, parameters: dict) -> None:
+        """Set the relevancy parameters of the algorithm used to generate the colour palette of an image.
+
+        Colour palettes generated afterwards for images whose binned images are still kept (see
+        :attr:`binned_images`) only need the relevancy of each cube to be decided again.
+
+        Args:
+            parameters (dict): The names and values of the relevancy parameters to be updated (any of the keys in
+                :const:`ALGORITHM_PARAMETER_SETTINGS`).
+
+        Raises:
+            ValueError: If a parameter name is not recognised or its value is not valid for the algorithm.
+        """
+
+        # Check values are valid before updating the settings file
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        for name, value in parameters.items():
+            if name not in ColourPaletteExtractorModel.ALGORITHM_PARAMETER_SETTINGS:
+                raise ValueError(name, "is not a valid algorithm parameter!")
+            setattr(algorithm, name, value)
+
+        print("Updating algorithm parameters to " + str(parameters) + "...")
+
+        # Update settings file
+        for name, value in parameters.items():
+            self._settings.setValue(ColourPaletteExtractorModel.ALGORITHM_PARAMETER_SETTINGS[name], value)
+        self._settings.sync()
+
+    def add_image(self, file_name_and_path: str, load: bool = True) -> tuple[str, ImageData]:
         """Given the path to an image, create a new :class:`ImageData` object and return it and its ID key.
 
         Args:
             file_name_and_path (str): Path to the image.
+            load (bool): If True, the image is decoded straight away. If False, the image must later be decoded using
+                :meth:`ImageData.load` (e.g., by a background thread). The default is True.
 
         Returns:
             (str): The dictionary key ('Tab_xx') for the new :class:`ImageData` object in the
@@ -302,7 +805,7 @@ class ColourPaletteExtractorModel:
         """
 
         # Create new ImageData object to hold image (and later the colour palette)
-        new_image_data = ImageData(file_name_and_path)
+        new_image_data = ImageData(file_name_and_path, load=load)
 
         # Add to image dictionary
         new_image_data_id = ("Tab_" + str(self._image_data_id_counter))
@@ -324,7 +827,8 @@ class ColourPaletteExtractorModel:
                 :attr:`image_data_id_dictionary` that should be removed.
         """
 
-        self._image_data_id_dictionary.pop(image_data_id)
+        image_data = self._image_data_id_dictionary.pop(image_data_id)
+        self._binned_images.forget(image_data)
 
     def get_image_data(self, image_data_id: str) -> ImageData:
         """Returns the :class:`ImageData` object with the given ID/key in the :attr:`image_data_id_dictionary`.
@@ -346,6 +850,8 @@ class ColourPaletteExtractorModel:
             tab (NewTab): The :class:`NewTab` linked to the image that is to have its colour palette report generated.
             progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI.
         """
+        from colourpaletteextractor.model import generatereport
+
         # Get image data
         image_id = tab.image_id
         image_data = self.get_image_data(image_id)
@@ -355,9 +861,10 @@ class ColourPaletteExtractorModel:
         generatereport.generate_report(tab=tab, image_data=image_data,
                                        settings=settings, progress_callback=progress_callback)
 
-    def generate_palette(self, image_data_id: str, tab: NewTab = None,
-                         progress_callback: QtCore.SignalInstance = None,
-                         algorithm: type[PaletteAlgorithm] = None) -> None:
+    def generate_palette(self, image_data_id: str, progress_reporter: ProgressReporter = None,
+                         algorithm: type[PaletteAlgorithm] = None,
+                         preview: Callable[[list[np.array], list[float]], None] = None,
+                         use_process_pool: bool = False) -> None:
         """Generate the colour palette for the image in the :class:`ImageData` object with the given image_data_id ID.
 
         The recoloured image, colour palette and relative frequencies of each colour are added to the
@@ -367,9 +874,16 @@ class ColourPaletteExtractorModel:
             image_data_id (str): The dictionary key/ID ('Tab_xx') for the :class:`ImageData` object in the
                 :attr:`image_data_id_dictionary` for which the colour palette of its associated image
                 is to be generated for.
-            tab (NewTab): The :class:`NewTab` linked to the image that is to have its colour palette generated.
-            progress_callback (QtCore.SignalInstance): Signal that when emitted, is used to update the GUI.
+            progress_reporter (ProgressReporter): (Optional) Used by the algorithm to report its progress and to check
+                if it should be cancelled.
             algorithm (type[PaletteAlgorithm]): The algorithm class to be used to generate the colur palette.
+            preview (Callable[[list[np.array], list[float]], None]): (Optional) Called with a provisional colour palette
+                and its relative frequencies if the colour palette is generated progressively (see
+                :attr:`progressive_preview`).
+            use_process_pool (bool): If True and the image has at least :attr:`PaletteProcessPool.MIN_PIXELS` pixels,
+                the colour palette is generated by one of the worker processes of the :attr:`palette_process_pool`
+                (e.g., when generating the colour palettes of all images). Otherwise, it is generated in the calling
+                thread.
         """
 
         image_data = self.get_image_data(image_data_id)
@@ -377,27 +891,28 @@ class ColourPaletteExtractorModel:
 
         # Get algorithm and process image with it
         algorithm = self._get_algorithm(algorithm=algorithm)
-        if progress_callback is not None and tab is not None:
-            algorithm.set_progress_callback(progress_callback, tab, image_data)
-
-        # Set algorithm type used for the given image
-        image_data.algorithm_used = type(algorithm)
-
-        # Generate colour palette
-        image = image_data.image.copy()
-        new_recoloured_image, image_colour_palette, new_relative_frequencies = \
-            algorithm.generate_colour_palette(image)
-
-        # Check if image_data_id still exists
+        algorithm.set_progress_reporter(progress_reporter)
+
+        # Small images are quicker to generate in the calling thread
+        num_pixels = image_data.image.shape[0] * image_data.image.shape[1]
+        process_pool = self._palette_process_pool \
+            if use_process_pool and num_pixels >= PaletteProcessPool.MIN_PIXELS else None
+
+        # Generate the colour palette (or load it from the cache), assigning it only if image_data_id still exists
+        self._binned_images.pin(image_data)  # Its binned image may be read by the algorithm
+        try:
+            generate_image_data_colour_palette(image_data, algorithm,
+                                               lambda: image_data_id in self._image_data_id_dictionary,
+                                               self._palette_cache,
+                                               preview=preview if self._progressive_preview else None,
+                                               preview_max_pixels=self._preview_max_pixels,
+                                               process_pool=process_pool)
+        finally:
+            self._binned_images.unpin(image_data)
+
+        # Keep the new binned image (releasing the least recently used binned images beyond the budget)
         if image_data_id in self._image_data_id_dictionary:
-
-            # Assign properties to image_data
-            self._image_data_id_dictionary[image_data_id].recoloured_image = new_recoloured_image
-            self._image_data_id_dictionary[image_data_id].colour_palette = image_colour_palette
-            self._image_data_id_dictionary[image_data_id].colour_palette_relative_frequency = new_relative_frequencies
-
-            # Sort colour palette by relative frequency
-            self._image_data_id_dictionary[image_data_id].sort_colour_palette(reverse=True)
+            self._binned_images.keep(image_data)
 
     def _read_settings(self) -> None:
         """Read in the application settings from the ColourPaletteExtractor.ini settings file."""
@@ -418,7 +933,8 @@ class ColourPaletteExtractorModel:
     def _get_algorithm(self, algorithm: type[PaletteAlgorithm] = None) -> PaletteAlgorithm:
         """Get an instance of the algorithm class to be used to generate the colour palette of an image.
 
-        If no algorithm is provided, the selected algorithm in the ColourPaletteExtractor.ini settings file.
+        If no algorithm is provided, the selected algorithm in the ColourPaletteExtractor.ini settings file. The
+        relevancy parameters in the settings file are applied to variants of the Nieves 2020 algorithm.
 
         Args:
             algorithm (type[PaletteAlgorithm]): (Optional). If provided, it is checked to make sure that it is a
@@ -430,11 +946,19 @@ class ColourPaletteExtractorModel:
 
         if algorithm is None:
             # Create a new instance of the selected algorithm in the settings
-            return self._settings.value("algorithm/selected algorithm")()
+            algorithm_instance = self._settings.value("algorithm/selected algorithm")()
 
         else:
             # Use provided algorithm class
             if self._check_algorithm_valid(algorithm_class=algorithm):
-                return algorithm()
+                algorithm_instance = algorithm()
             else:
                 raise ValueError(algorithm, "is not a valid Class type!")
+
+        # Apply the relevancy parameters in the settings and share the workspace between the algorithm instances
+        if isinstance(algorithm_instance, nieves2020.Nieves2020):
+            for name, value in self.get_algorithm_parameters().items():
+                setattr(algorithm_instance, name, value)
+            algorithm_instance.workspace = self._palette_workspace
+
+        return algorithm_instance
@@ -0,0 +1,248 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from typing import Optional
+
+import numpy as np
+
+from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm
+
+
+class PaletteCache:
+    """Persistent cache of generated colour palettes, stored in a directory on disk.
+
+    Each entry is keyed by a hash of the image's pixels, the algorithm class and the algorithm's parameters (see
+    :attr:`PaletteAlgorithm.parameters`), so a colour palette is reused whenever the same image is analysed again
+    with the same settings. Each entry stores the colour palette, the relative frequencies of the colours and the
+    compressed palette index map of the recoloured image.
+
+    The total size of the entries is capped. When it is exceeded, the least recently used entries are removed.
+
+    Args:
+        directory (str): The directory to store the cache entries in. It is created if it does not exist.
+        max_bytes (int): The maximum total size (bytes) of the cache entries. The default is :const:`MAX_BYTES`.
+
+    Raises:
+        ValueError: If the maximum size is negative.
+    """
+
+    MAX_BYTES = 512 * 1024 ** 2
+    """Default maximum total size of the cache entries (512 MiB)."""
+
+    VERSION = 1
+    """Version of the cache entries. Changing it invalidates all of the existing entries."""
+
+    EXTENSION = ".npz"
+    """File extension of the cache entries."""
+
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES):
+
+        if max_bytes < 0:
+            raise ValueError("The maximum size of the cache cannot be negative (value of " + str(max_bytes)
+                             + " provided)!")
+
+        self._directory = directory
+        self._max_bytes = max_bytes
+
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        """The directory that the cache entries are stored in.
+
+        Returns:
+            (str): The path to the cache directory.
+        """
+
+        return self._directory
+
+    @property
+    def max_bytes(self) -> int:
+        """The maximum total size (bytes) of the cache entries.
+
+        Returns:
+            (int): The maximum size of the cache.
+        """
+
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("The maximum size of the cache cannot be negative (value of " + str(value)
+                             + " provided)!")
+        self._max_bytes = value
+        self._evict()
+
+    @staticmethod
+    def get_key(image: np.array, algorithm: PaletteAlgorithm) -> str:
+        """Get the cache key for the colour palette of an image generated by the given algorithm.
+
+        Args:
+            image (np.array): The image.
+            algorithm (PaletteAlgorithm): The algorithm instance used to generate the colour palette.
+
+        Returns:
+            (str): The hexadecimal SHA-256 hash of the image and the algorithm (class and parameters).
+        """
+
+        algorithm_class = type(algorithm)
+        description = {"version": PaletteCache.VERSION,
+                       "algorithm": algorithm_class.__module__ + "." + algorithm_class.__qualname__,
+                       "parameters": algorithm.parameters,
+                       "shape": image.shape,
+                       "dtype": image.dtype.str}
+
+        key = hashlib.sha256(json.dumps(description, sort_keys=True).encode())
+        key.update(np.ascontiguousarray(image).data)
+        return key.hexdigest()
+
+    def load(self, key: str) -> Optional[tuple[np.array, list[np.array], list[float]]]:
+        """Load the colour palette with the given key from the cache.
+
+        The entry is marked as the most recently used. Entries that cannot be read are removed.
+
+        Args:
+            key (str): The cache key (see :meth:`get_key`).
+
+        Returns:
+            (Optional[tuple[np.array, list[np.array], list[float]]]): The palette index map, the colour palette and
+                the relative frequencies of the colours. None if the key is not in the cache.
+        """
+
+        path = self._get_path(key)
+
+        try:
+            with np.load(path) as entry:
+                index_map = entry["index_map"]
+                colour_palette = list(entry["colour_palette"])
+                relative_frequencies = entry["relative_frequencies"].tolist()
+            os.utime(path)  # Most recently used
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):  # Remove damaged entry
+            self._remove(path)
+            return None
+
+        return index_map, colour_palette, relative_frequencies
+
+    def save(self, key: str, index_map: np.array, colour_palette: list[np.array],
+             relative_frequencies: list[float]) -> None:
+        """Save a colour palette to the cache, removing the least recently used entries if the cache is too large.
+
+        The entry is written to a temporary file first, so that an incomplete entry is never read.
+
+        Args:
+            key (str): The cache key (see :meth:`get_key`).
+            index_map (np.array): The index of the colour in the colour palette for each pixel in the image.
+            colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) indexed by the index map.
+            relative_frequencies (list[float]): The relative frequencies of the colours.
+        """
+
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix=".tmp", dir=self._directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                np.savez_compressed(file,
+                                    index_map=index_map,
+                                    colour_palette=np.asarray(colour_palette, dtype=np.uint8).reshape(-1, 3),
+                                    relative_frequencies=np.asarray(relative_frequencies, dtype=np.float64))
+            os.replace(temporary_path, self._get_path(key))
+        except BaseException:
+            self._remove(temporary_path)
+            raise
+
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+
+        for path, _, _ in self._get_entries():
+            self._remove(path)
+
+    def get_size(self) -> int:
+        """Get the total size (bytes) of the cache entries.
+
+        Returns:
+            (int): The total size of the cache entries.
+        """
+
+        return sum(size for _, size, _ in self._get_entries())
+
+    def _get_path(self, key: str) -> str:
+        """Get the path to the cache entry with the given key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            (str): The path to the cache entry.
+        """
+
+        return os.path.join(self._directory, key + PaletteCache.EXTENSION)
+
+    def _get_entries(self) -> list[tuple[str, int, float]]:
+        """Get the path, size (bytes) and last time of use of each cache entry.
+
+        Returns:
+            (list[tuple[str, int, float]]): The path, size and last time of use of each entry.
+        """
+
+        entries = []
+        with os.scandir(self._directory) as directory_entries:
+            for directory_entry in directory_entries:
+                if not directory_entry.name.endswith(PaletteCache.EXTENSION) or not directory_entry.is_file():
+                    continue
+                try:
+                    status = directory_entry.stat()
+                except FileNotFoundError:  # Removed by another process
+                    continue
+                entries.append((directory_entry.path, status.st_size, status.st_mtime))
+
+        return entries
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the total size of the cache is within its maximum size."""
+
+        entries = self._get_entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for path, entry_size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if size <= self._max_bytes:
+                break
+            self._remove(path)
+            size -= entry_size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Remove a file, ignoring it if it has already been removed.
+
+        Args:
+            path (str): Path to the file.
+        """
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,157 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PaletteWorkspace:
+    """Pool of preallocated arrays that can be reused by the algorithms when generating the colour palettes of images.
+
+    Images in a collection often share the same size, so the large per-pixel arrays used to generate their colour
+    palettes (e.g., the image in the CIELAB colour space) have the same shape and type for each image. Instead of
+    allocating them again for every image, an algorithm can borrow an array from the workspace (see :meth:`borrow`)
+    and give it back when it is no longer needed (see :meth:`give_back`), so that it can be used for the next image.
+
+    Arrays are only kept while they are not borrowed. The total size of the kept arrays is capped. When it is
+    exceeded, the least recently given back arrays are removed. The workspace can be shared between threads.
+
+    Args:
+        max_bytes (int): The maximum total size (bytes) of the kept arrays. The default is :const:`MAX_BYTES`.
+
+    Raises:
+        ValueError: If the maximum size is negative.
+    """
+
+    MAX_BYTES = 512 * 1024 ** 2
+    """Default maximum total size of the kept arrays (512 MiB)."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+
+        if max_bytes < 0:
+            raise ValueError("The maximum size of the workspace cannot be negative (value of " + str(max_bytes)
+                             + " provided)!")
+
+        self._max_bytes = max_bytes
+        self._arrays = OrderedDict()  # Kept arrays (keyed by their id), from least to most recently given back
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of kept arrays.
+
+        Returns:
+            (int): The number of arrays that can currently be borrowed from the workspace.
+        """
+
+        with self._lock:
+            return len(self._arrays)
+
+    @property
+    def max_bytes(self) -> int:
+        """The maximum total size (bytes) of the kept arrays.
+
+        Returns:
+            (int): The maximum size of the workspace.
+        """
+
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: int) -> None:
+        if value < 0:
+            raise ValueError("The maximum size of the workspace cannot be negative (value of " + str(value)
+                             + " provided)!")
+        with self._lock:
+            self._max_bytes = value
+            self._evict()
+
+    @property
+    def nbytes(self) -> int:
+        """The total size (bytes) of the kept arrays.
+
+        Returns:
+            (int): The total size of the kept arrays.
+        """
+
+        return self._nbytes
+
+    def borrow(self, shape: tuple[int, ...], dtype: np.dtype) -> np.array:
+        """Borrow an array of the given shape and type from the workspace.
+
+        The most recently given back array with the same shape and type is used. If there is none, a new array is
+        allocated. The values of the array are not initialised.
+
+        Args:
+            shape (tuple[int, ...]): The shape of the array.
+            dtype (np.dtype): The type of the array.
+
+        Returns:
+            (np.array): The borrowed array.
+        """
+
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+
+        with self._lock:
+            for key in reversed(self._arrays):
+                array = self._arrays[key]
+                if array.shape == shape and array.dtype == dtype:
+                    del self._arrays[key]
+                    self._nbytes -= array.nbytes
+                    return array
+
+        return np.empty(shape, dtype=dtype)
+
+    def give_back(self, array: np.array) -> None:
+        """Give an array back to the workspace, so that it can be borrowed again.
+
+        The array must no longer be used once it has been given back. Arrays that do not own their data (views) and
+        arrays larger than the maximum size of the workspace are not kept.
+
+        Args:
+            array (np.array): The array (e.g., borrowed using :meth:`borrow`).
+        """
+
+        if array is None or array.base is not None or not array.flags.writeable or array.nbytes > self._max_bytes:
+            return
+
+        with self._lock:
+            if id(array) in self._arrays:  # Already given back
+                return
+            self._arrays[id(array)] = array
+            self._nbytes += array.nbytes
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove every kept array from the workspace."""
+
+        with self._lock:
+            self._arrays.clear()
+            self._nbytes = 0
+
+    def _evict(self) -> None:
+        """Remove the least recently given back arrays until the total size is within the maximum size.
+
+        Must be called while holding the lock.
+        """
+
+        while self._nbytes > self._max_bytes:
+            _, array = self._arrays.popitem(last=False)
+            self._nbytes -= array.nbytes
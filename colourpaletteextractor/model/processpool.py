@@ -0,0 +1,307 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.algorithms.palettealgorithm import PaletteAlgorithm
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+from colourpaletteextractor.model.progressreporter import ProgressReporter, ThrottledProgressReporter
+
+HEADER_BYTES = 64
+"""The number of bytes before the image in a block of shared memory (holding the job's cancellation flag)."""
+
+CANCEL_POLL_INTERVAL = 0.05
+"""The interval (s) at which a waiting job checks if it should be cancelled."""
+
+_progress_queue: Optional[multiprocessing.Queue] = None  # Queue used by the current (worker) process to report progress
+_algorithms: dict[type[PaletteAlgorithm], PaletteAlgorithm] = {}  # Algorithm instances of the current (worker) process
+
+
+class SharedImage:
+    """An image copied into a block of shared memory, so that a worker process can read it without it being pickled.
+
+    The first :data:`HEADER_BYTES` bytes of the block hold the cancellation flag of the job using the image (see
+    :meth:`cancel`). The block is removed by :meth:`close`.
+
+    Args:
+        image (np.array): The image.
+    """
+
+    def __init__(self, image: np.array):
+
+        self._shape = image.shape
+        self._dtype = image.dtype
+        self._shared_memory = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + max(image.nbytes, 1))
+        self._shared_memory.buf[:HEADER_BYTES] = bytes(HEADER_BYTES)
+        np.ndarray(image.shape, image.dtype, buffer=self._shared_memory.buf, offset=HEADER_BYTES)[...] = image
+
+    @property
+    def descriptor(self) -> tuple[str, tuple, str]:
+        """The name of the block of shared memory and the shape and type of the image (see :func:`attach_image`).
+
+        Returns:
+            (tuple[str, tuple, str]): The name of the block, the shape of the image and its Numpy type string.
+        """
+
+        return self._shared_memory.name, self._shape, self._dtype.str
+
+    def cancel(self) -> None:
+        """Set the cancellation flag of the job using the image."""
+
+        self._shared_memory.buf[0] = 1
+
+    def close(self) -> None:
+        """Close and remove the block of shared memory."""
+
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+
+def attach_image(descriptor: tuple[str, tuple, str]) -> tuple[shared_memory.SharedMemory, np.array, np.array]:
+    """Attach to an image held in shared memory by another process (see :class:`SharedImage`).
+
+    The returned arrays must be deleted before the block of shared memory is closed.
+
+    Args:
+        descriptor (tuple[str, tuple, str]): The descriptor of the shared image (see :attr:`SharedImage.descriptor`).
+
+    Returns:
+        (shared_memory.SharedMemory): The block of shared memory.
+        (np.array): A read-only view of the image.
+        (np.array): A view of the job's cancellation flag (non-zero if the job should be cancelled).
+    """
+
+    name, shape, dtype = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    image = np.ndarray(shape, np.dtype(dtype), buffer=block.buf, offset=HEADER_BYTES)
+    image.setflags(write=False)
+    return block, image, np.ndarray((1,), np.uint8, buffer=block.buf)
+
+
+class QueueProgressReporter(ProgressReporter):
+    """Progress reporter used by a worker process to send the progress of a job back to the main process.
+
+    Args:
+        job_id (int): The ID of the job.
+        progress_queue (multiprocessing.Queue): The queue that the job ID and progress are put onto.
+        cancel_flag (np.array): The job's cancellation flag (see :func:`attach_image`).
+    """
+
+    def __init__(self, job_id: int, progress_queue: multiprocessing.Queue, cancel_flag: np.array):
+        self._job_id = job_id
+        self._progress_queue = progress_queue
+        self._cancel_flag = cancel_flag
+
+    def report_progress(self, percent: float) -> None:
+        self._progress_queue.put((self._job_id, percent))
+
+    @property
+    def continue_thread(self) -> bool:
+        return self._cancel_flag[0] == 0
+
+
+def _initialise_process(progress_queue: multiprocessing.Queue) -> None:
+    """Set the queue used by the current (worker) process to report the progress of its jobs.
+
+    Args:
+        progress_queue (multiprocessing.Queue): The queue.
+    """
+
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _generate_colour_palette_index_map(job_id: int, descriptor: tuple[str, tuple, str],
+                                       algorithm_class: type[PaletteAlgorithm], parameters: dict) \
+        -> tuple[np.array, list[np.array], list[float]]:
+    """Generate the colour palette and palette index map of a shared image in the current (worker) process.
+
+    Each process keeps one instance of each algorithm class, so the arrays used for each image are reused for the
+    next image handled by the process (see :class:`PaletteWorkspace`).
+
+    Args:
+        job_id (int): The ID of the job.
+        descriptor (tuple[str, tuple, str]): The descriptor of the shared image (see :attr:`SharedImage.descriptor`).
+        algorithm_class (type[PaletteAlgorithm]): The class of the colour palette extraction algorithm.
+        parameters (dict): The parameters of the algorithm (see :attr:`PaletteAlgorithm.parameters`).
+
+    Returns:
+        (np.array): The index of the colour in the colour palette for each pixel in the image.
+        (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+        (list[float]): The relative frequencies of the colours in the recoloured image.
+    """
+
+    algorithm = _algorithms.get(algorithm_class)
+    if algorithm is None:
+        algorithm = _algorithms[algorithm_class] = algorithm_class()
+        if isinstance(algorithm, nieves2020.Nieves2020):
+            algorithm.workspace = PaletteWorkspace()
+
+    for name, value in parameters.items():
+        setattr(algorithm, name, value)
+
+    block, image, cancel_flag = attach_image(descriptor)
+    try:
+        algorithm.set_progress_reporter(
+            ThrottledProgressReporter(QueueProgressReporter(job_id, _progress_queue, cancel_flag)))
+        return algorithm.generate_colour_palette_index_map(image)
+    finally:
+        algorithm.set_progress_reporter(None)
+        if isinstance(algorithm, nieves2020.Nieves2020):
+            algorithm.release_binned_image()  # Reuse its arrays for the next image
+        del image, cancel_flag  # Views must be released before closing the block
+        block.close()
+
+
+class PaletteProcessPool:
+    """Persistent pool of worker processes used to generate colour palettes outside of the calling process.
+
+    As the algorithms hold Python's global interpreter lock for much of their run, generating several colour palettes
+    in threads of the same process runs them one at a time (and slows down a GUI running in that process). Instead,
+    each image is copied into shared memory (see :class:`SharedImage`) and its colour palette is generated by one of
+    the worker processes, while the calling thread waits for the result.
+
+    The progress of each job is sent back over a queue. It is passed on to the progress reporter of the job's
+    algorithm by :meth:`pump_progress`, which should be called regularly by the thread that the progress reporters
+    are to be used in (e.g., by a timer in the GUI's thread).
+
+    The worker processes are started when the first job is submitted and are kept until :meth:`shutdown` is called.
+
+    Args:
+        max_workers (int): (Optional) The maximum number of worker processes. By default, the number of CPUs.
+    """
+
+    MIN_PIXELS = 1_000_000
+    """The default minimum number of pixels of an image for its colour palette to be generated in the process pool.
+
+    Smaller images are quicker to generate in a thread than to copy into shared memory.
+    """
+
+    def __init__(self, max_workers: int = None):
+
+        self._max_workers = max_workers
+        self._context = multiprocessing.get_context("spawn")  # Forking a process running Qt is not safe
+        self._progress_queue = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._job_ids = itertools.count()
+        self._progress_reporters: dict[int, ProgressReporter] = {}  # Progress reporters of the running jobs
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the pool of worker processes, creating it if needed.
+
+        Returns:
+            (ProcessPoolExecutor): The pool of worker processes.
+        """
+
+        with self._lock:
+            if self._executor is None:
+                self._progress_queue = self._context.Queue()
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers, mp_context=self._context,
+                                                     initializer=_initialise_process,
+                                                     initargs=(self._progress_queue,))
+            return self._executor
+
+    def generate_colour_palette_index_map(self, image: np.array, algorithm: PaletteAlgorithm) \
+            -> tuple[np.array, list[np.array], list[float]]:
+        """Generate the colour palette and the palette index map of an image in one of the worker processes.
+
+        The worker process uses its own instance of the algorithm's class with the same parameters (see
+        :attr:`PaletteAlgorithm.parameters`). The calling thread is blocked until the colour palette has been
+        generated, and the job is cancelled if the algorithm's execution status is set to False (see
+        :attr:`PaletteAlgorithm.continue_thread`).
+
+        Args:
+            image (np.array): The image.
+            algorithm (PaletteAlgorithm): The algorithm instance, whose progress reporter (if any) is used for the job.
+
+        Returns:
+            (np.array): The index of the colour in the colour palette for each pixel in the image.
+            (list[np.array]): The list of colours ([R,G,B] triplets) in the image's colour palette.
+            (list[float]): The relative frequencies of the colours in the recoloured image.
+        """
+
+        job_id = next(self._job_ids)
+        shared_image = SharedImage(image)
+        if algorithm.progress_reporter is not None:
+            self._progress_reporters[job_id] = algorithm.progress_reporter
+
+        try:
+            if not algorithm.continue_thread:
+                shared_image.cancel()
+            future = self._get_executor().submit(_generate_colour_palette_index_map, job_id,
+                                                 shared_image.descriptor, type(algorithm), algorithm.parameters)
+            while not wait([future], timeout=CANCEL_POLL_INTERVAL).done:
+                if not algorithm.continue_thread:
+                    shared_image.cancel()
+            return future.result()
+
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None  # Start a new pool for the next job
+            raise
+
+        finally:
+            self._progress_reporters.pop(job_id, None)
+            shared_image.close()
+
+    def pump_progress(self) -> int:
+        """Pass on the progress sent by the worker processes to the progress reporters of their jobs.
+
+        Only the most recent progress of each job is passed on.
+
+        Returns:
+            (int): The number of jobs whose progress was passed on.
+        """
+
+        if self._progress_queue is None:
+            return 0
+
+        latest_progress = {}
+        while True:
+            try:
+                job_id, percent = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            latest_progress[job_id] = percent
+
+        for job_id, percent in latest_progress.items():
+            progress_reporter = self._progress_reporters.get(job_id)
+            if progress_reporter is not None:
+                progress_reporter.report_progress(percent)
+
+        return len(latest_progress)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling any jobs that have not started."""
+
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
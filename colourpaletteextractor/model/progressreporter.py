@@ -0,0 +1,173 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ProgressReporter(ABC):
+    """Abstract class used by an algorithm to report its progress and to check if it should continue running.
+
+    This keeps the algorithms and the model independent of Qt; the GUI provides its own implementation (see
+    :class:`colourpaletteextractor.controller.worker.SignalProgressReporter`).
+    """
+
+    @abstractmethod
+    def report_progress(self, percent: float) -> None:
+        """Report the progress of the algorithm.
+
+        Args:
+            percent (float): The percentage of the algorithm that has been completed.
+        """
+
+        pass
+
+    @property
+    @abstractmethod
+    def continue_thread(self) -> bool:
+        """Specify if the algorithm should continue running.
+
+        Returns:
+            (bool): True if the algorithm should continue. False if it should be cancelled.
+        """
+
+        pass
+
+    @property
+    def cancel_event(self) -> Optional[threading.Event]:
+        """The cancellation token shared with the algorithm, if the progress reporter has one.
+
+        If the event is set, the algorithm should be cancelled. As checking the event is cheap, the algorithm can
+        check it between the chunks of its vectorised stages rather than only when reporting its progress.
+
+        Returns:
+            (threading.Event): The cancellation token, or None if cancellation is only checked using
+                :attr:`continue_thread`.
+        """
+
+        return None
+
+
+class ThrottledProgressReporter(ProgressReporter):
+    """Progress reporter that passes on the progress reported to another progress reporter at a maximum rate.
+
+    Progress reported less than ``1 / max_rate`` seconds after the last progress passed on is held back, with only
+    the most recent value being kept. The held back value is passed on with the next report made after the interval
+    has elapsed, or by :meth:`flush`. The first report, reports of 100% and reports that go backwards (e.g., when the
+    algorithm is run again) are always passed on immediately.
+
+    Args:
+        progress_reporter (ProgressReporter): The progress reporter to pass on the progress to.
+        max_rate (float): The maximum number of reports passed on per second.
+
+    Raises:
+        ValueError: If `max_rate` is not greater than 0.
+    """
+
+    MAX_RATE = 20
+    """Default maximum number of reports passed on per second."""
+
+    def __init__(self, progress_reporter: ProgressReporter, max_rate: float = MAX_RATE):
+
+        if max_rate <= 0:
+            raise ValueError("The maximum rate of progress reports must be greater than 0.")
+
+        self._progress_reporter = progress_reporter
+        self._min_interval = 1 / max_rate
+        self._last_time: Optional[float] = None  # Time of the last report passed on
+        self._last_percent: Optional[float] = None  # Last percentage passed on
+        self._pending_percent: Optional[float] = None  # Most recent percentage held back
+
+    @property
+    def progress_reporter(self) -> ProgressReporter:
+        """The progress reporter that the progress is passed on to.
+
+        Returns:
+            (ProgressReporter): The wrapped progress reporter.
+        """
+
+        return self._progress_reporter
+
+    @property
+    def pending_percent(self) -> Optional[float]:
+        """The most recent percentage that has been held back.
+
+        Returns:
+            (float): The percentage, or None if no percentage is being held back.
+        """
+
+        return self._pending_percent
+
+    def report_progress(self, percent: float) -> None:
+        now = time.monotonic()
+        if self._last_time is None or percent >= 100 or percent < self._last_percent \
+                or now - self._last_time >= self._min_interval:
+            self._pass_on(percent, now)
+        else:
+            self._pending_percent = percent  # Coalesce with any earlier held back report
+
+    def flush(self) -> None:
+        """Pass on the most recent percentage that has been held back (if any)."""
+
+        if self._pending_percent is not None:
+            self._pass_on(self._pending_percent, time.monotonic())
+
+    def _pass_on(self, percent: float, now: float) -> None:
+        self._pending_percent = None
+        self._last_time = now
+        self._last_percent = percent
+        self._progress_reporter.report_progress(percent)
+
+    @property
+    def continue_thread(self) -> bool:
+        cancel_event = self.cancel_event
+        if cancel_event is not None:
+            return not cancel_event.is_set()
+        return self._progress_reporter.continue_thread
+
+    @property
+    def cancel_event(self) -> Optional[threading.Event]:
+        return self._progress_reporter.cancel_event
+
+
+class MutedProgressReporter(ProgressReporter):
+    """Progress reporter that discards the progress reported, but checks if it should continue using another reporter.
+
+    Used to run an algorithm that shares the cancellation of another run without reporting its progress (e.g., when
+    generating a preview of a colour palette).
+
+    Args:
+        progress_reporter (ProgressReporter): The progress reporter used to check if the algorithm should continue.
+    """
+
+    def __init__(self, progress_reporter: ProgressReporter):
+        self._progress_reporter = progress_reporter
+
+    def report_progress(self, percent: float) -> None:
+        pass
+
+    @property
+    def continue_thread(self) -> bool:
+        return self._progress_reporter.continue_thread
+
+    @property
+    def cancel_event(self) -> Optional[threading.Event]:
+        return self._progress_reporter.cancel_event
@@ -0,0 +1,238 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from __future__ import annotations
+
+import os
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+import numpy as np
+from skimage import img_as_ubyte
+
+from colourpaletteextractor.model.algorithms import palettealgorithm
+
+TILE_PIXELS = 2 ** 22
+"""The default maximum number of pixels in each tile of an image read in tiles (4 megapixels)."""
+
+
+class TiledImage(ABC):
+    """An image that is read one tile at a time, so that the whole image never needs to be held in memory.
+
+    Each tile is given as an 8-bit RGB image. Greyscale tiles are viewed as RGB tiles and any alpha channel is removed.
+    See :func:`open_tiled_image` to open an image file in tiles.
+    """
+
+    @property
+    @abstractmethod
+    def shape(self) -> tuple[int, int]:
+        """The height and width of the image (pixels).
+
+        Returns:
+            (tuple[int, int]): The shape of the image.
+        """
+
+        pass
+
+    @property
+    @abstractmethod
+    def tile_count(self) -> int:
+        """The number of tiles the image is read in.
+
+        Returns:
+            (int): The number of tiles.
+        """
+
+        pass
+
+    def tiles(self) -> Iterator[tuple[int, int, np.array]]:
+        """Read the tiles of the image in turn.
+
+        Yields:
+            (tuple[int, int, np.array]): The row and column of the top-left pixel of the tile and the tile itself (8-bit
+                RGB).
+        """
+
+        for row, column, tile in self._read_tiles():
+            tile = img_as_ubyte(tile)
+            if tile.ndim == 2:  # View greyscale tile as an RGB tile
+                tile = np.broadcast_to(tile[:, :, np.newaxis], tile.shape + (3,))
+            yield row, column, tile[:, :, :3]
+
+    @abstractmethod
+    def _read_tiles(self) -> Iterator[tuple[int, int, np.array]]:
+        """Read the tiles of the image in turn, as they are stored.
+
+        Yields:
+            (tuple[int, int, np.array]): The row and column of the top-left pixel of the tile and the tile itself.
+        """
+
+        pass
+
+
+class ArrayTiledImage(TiledImage):
+    """An image held in an array (e.g., memory-mapped from a .npy file), read in bands of whole rows.
+
+    Args:
+        image (np.array): The image ([x, y] or [x, y, n] array).
+        tile_pixels (int): The maximum number of pixels in each band (at least one row is always read at a time).
+
+    Raises:
+        ValueError: If `tile_pixels` is less than 1.
+    """
+
+    def __init__(self, image: np.array, tile_pixels: int = TILE_PIXELS):
+
+        if tile_pixels < 1:
+            raise ValueError("Each tile must have at least 1 pixel!")
+
+        self._image = image
+        self._rows_per_tile = max(1, tile_pixels // max(image.shape[1], 1))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The height and width of the image (pixels).
+
+        Returns:
+            (tuple[int, int]): The shape of the image.
+        """
+
+        return self._image.shape[0], self._image.shape[1]
+
+    @property
+    def tile_count(self) -> int:
+        """The number of bands of rows the image is read in.
+
+        Returns:
+            (int): The number of bands.
+        """
+
+        return -(-self._image.shape[0] // self._rows_per_tile)
+
+    def _read_tiles(self) -> Iterator[tuple[int, int, np.array]]:
+        for row in range(0, self._image.shape[0], self._rows_per_tile):
+            yield row, 0, np.asarray(self._image[row:row + self._rows_per_tile])
+
+
+class TiffTiledImage(TiledImage):
+    """A TIFF image read one tile (or strip) at a time, as they are stored in the file.
+
+    Only the first page of the file is read. The size of each tile is set by the file.
+
+    Args:
+        file_name_and_path (str): Path to the TIFF image.
+
+    Raises:
+        ValueError: If the colour channels of the image are stored in separate planes.
+    """
+
+    def __init__(self, file_name_and_path: str):
+
+        import tifffile  # Used by scikit-image to read TIFF images
+
+        self._file_name_and_path = file_name_and_path
+        with tifffile.TiffFile(file_name_and_path) as tiff:
+            page = tiff.pages[0]
+            if page.planarconfig == tifffile.PLANARCONFIG.SEPARATE and page.samplesperpixel > 1:
+                raise ValueError("TIFF images with colour channels stored in separate planes cannot be read in tiles!")
+            self._shape = (page.imagelength, page.imagewidth)
+            self._tile_count = len(page.dataoffsets)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """The height and width of the image (pixels).
+
+        Returns:
+            (tuple[int, int]): The shape of the image.
+        """
+
+        return self._shape
+
+    @property
+    def tile_count(self) -> int:
+        """The number of tiles (or strips) the image is stored in.
+
+        Returns:
+            (int): The number of tiles.
+        """
+
+        return self._tile_count
+
+    def _read_tiles(self) -> Iterator[tuple[int, int, np.array]]:
+        import tifffile
+
+        height, width = self._shape
+        with tifffile.TiffFile(self._file_name_and_path) as tiff:
+            for segment, (_, _, row, column, _), _ in tiff.pages[0].segments(maxworkers=1):
+                if segment is None:
+                    continue  # Empty tile (not stored in the file)
+
+                # Tiles at the edges of the image are padded to the full tile size
+                tile = segment[0, :height - row, :width - column]
+                yield row, column, tile[:, :, 0] if tile.shape[-1] == 1 else tile
+
+
+def open_tiled_image(file_name_and_path: str, tile_pixels: int = TILE_PIXELS) -> TiledImage:
+    """Open an image to be read in tiles.
+
+    .npy files are memory-mapped and TIFF images are read as they are stored (in tiles or strips), so neither is ever
+    held in memory. Neither Pillow nor scikit-image can decode other images (e.g., PNG and JPEG images) a strip at a
+    time, so they are decoded in full (as 8-bit images) before being read in tiles.
+
+    Args:
+        file_name_and_path (str): Path to the image.
+        tile_pixels (int): The maximum number of pixels in each tile (for images that are not TIFF images).
+
+    Returns:
+        (TiledImage): The image.
+    """
+
+    extension = os.path.splitext(file_name_and_path)[1].lower()
+    if extension == ".npy":
+        return ArrayTiledImage(np.load(file_name_and_path, mmap_mode="r"), tile_pixels)
+    elif extension in (".tif", ".tiff"):
+        return TiffTiledImage(file_name_and_path)
+    else:
+        from colourpaletteextractor.model.imagedata import ImageData
+
+        return ArrayTiledImage(ImageData(file_name_and_path).image, tile_pixels)
+
+
+def save_recoloured_image(index_map: np.array, colour_palette: list[np.array], file_name_and_path: str,
+                          tile_pixels: int = TILE_PIXELS) -> np.array:
+    """Write the recoloured image built from a palette index map to a .npy file, one band of rows at a time.
+
+    Args:
+        index_map (np.array): The index of the colour in the colour palette for each pixel in the image (e.g.,
+            memory-mapped from a .npy file).
+        colour_palette (list[np.array]): The list of colours ([R,G,B] triplets) in the colour palette.
+        file_name_and_path (str): Path to the .npy file.
+        tile_pixels (int): The maximum number of pixels recoloured at a time.
+
+    Returns:
+        (np.array): The recoloured image, memory-mapped from the .npy file.
+    """
+
+    recoloured_image = np.lib.format.open_memmap(file_name_and_path, mode="w+", dtype=np.uint8,
+                                                 shape=index_map.shape + (3,))
+    rows_per_band = max(1, tile_pixels // max(index_map.shape[1], 1))
+    for row in range(0, index_map.shape[0], rows_per_band):
+        recoloured_image[row:row + rows_per_band] = palettealgorithm.get_recoloured_image(
+            np.asarray(index_map[row:row + rows_per_band]), colour_palette)
+    recoloured_image.flush()
+
+    return recoloured_image
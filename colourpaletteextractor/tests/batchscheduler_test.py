@@ -0,0 +1,97 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from colourpaletteextractor.model.batchscheduler import BatchScheduler, get_default_memory_budget
+
+
+def test_jobs_admitted_while_they_fit_memory_budget():
+    started_jobs = []
+    scheduler = BatchScheduler(start_job=started_jobs.append, memory_budget=100)
+
+    for job, peak_bytes in [("a", 40), ("b", 50), ("c", 20), ("d", 10)]:
+        scheduler.add(job, peak_bytes)
+
+    # Jobs are admitted in order, so "d" waits behind "c" even though it would fit
+    assert started_jobs == ["a", "b"]
+    assert scheduler.running_count == 2
+    assert scheduler.running_bytes == 90
+    assert scheduler.queue_depth == 2
+
+    scheduler.finish("a")
+    assert started_jobs == ["a", "b", "c", "d"]
+    assert scheduler.running_bytes == 80
+    assert scheduler.queue_depth == 0
+
+    scheduler.finish("unknown")  # Ignored
+    assert scheduler.running_count == 3
+
+
+def test_job_larger_than_budget_runs_alone():
+    started_jobs = []
+    scheduler = BatchScheduler(start_job=started_jobs.append, memory_budget=100)
+
+    scheduler.add("small", 10)
+    scheduler.add("large", 500)
+    assert started_jobs == ["small"]
+
+    scheduler.finish("small")
+    assert started_jobs == ["small", "large"]
+
+    scheduler.add("next", 10)
+    assert started_jobs == ["small", "large"]
+
+    scheduler.finish("large")
+    assert started_jobs == ["small", "large", "next"]
+
+
+def test_cancel_removes_queued_jobs():
+    started_jobs = []
+    scheduler = BatchScheduler(start_job=started_jobs.append, memory_budget=100)
+    for job in ["a", "b", "c"]:
+        scheduler.add(job, 60)
+
+    assert scheduler.cancel() == ["b", "c"]
+    assert scheduler.queue_depth == 0
+
+    scheduler.finish("a")
+    assert started_jobs == ["a"]
+
+
+def test_queued_and_running_jobs_are_found():
+    scheduler = BatchScheduler(start_job=lambda job: None, memory_budget=100)
+    for job in ["a", "b"]:
+        scheduler.add(job, 60)
+
+    assert "a" in scheduler and not scheduler.is_queued("a")  # Running
+    assert "b" in scheduler and scheduler.is_queued("b")
+    assert "c" not in scheduler and not scheduler.is_queued("c")
+
+    scheduler.finish("a")
+    assert "a" not in scheduler and not scheduler.is_queued("b")
+
+
+def test_invalid_jobs_and_budget():
+    scheduler = BatchScheduler(start_job=lambda job: None)
+    scheduler.add("a", 10)
+    with pytest.raises(ValueError):
+        scheduler.add("a", 10)
+
+    with pytest.raises(ValueError):
+        scheduler.memory_budget = -1
+
+    assert get_default_memory_budget() > 0
@@ -0,0 +1,84 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.binnedimagestore import BinnedImageStore
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.model import generate_image_data_colour_palette
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+
+
+def get_binned_image_data() -> ImageData:
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    generate_image_data_colour_palette(image_data, nieves2020.Nieves2020CentredCubes())
+    return image_data
+
+
+def test_least_recently_used_binned_images_are_released():
+    images = [get_binned_image_data() for _ in range(3)]
+    binned_image_bytes = images[0].binned_image.nbytes
+    workspace = PaletteWorkspace()
+    store = BinnedImageStore(workspace, max_bytes=2 * binned_image_bytes)
+
+    for image_data in images:
+        store.keep(image_data)
+    store.use(images[1])
+
+    # The first image was the least recently used, so its arrays are given back to the workspace
+    assert len(store) == 2
+    assert store.nbytes == 2 * binned_image_bytes
+    assert images[0].binned_image is None
+    assert images[1].binned_image is not None and images[2].binned_image is not None
+    assert len(workspace) == 3  # CIELAB image, C* values and cube of each pixel
+
+    # Reducing the budget releases all but the most recently used binned image
+    store.max_bytes = 0
+    assert len(store) == 1
+    assert images[1].binned_image is not None
+
+
+def test_pinned_binned_images_are_not_released():
+    images = [get_binned_image_data() for _ in range(2)]
+    store = BinnedImageStore(max_bytes=0)
+
+    store.pin(images[0])
+    store.keep(images[0])
+    store.keep(images[1])
+    assert images[0].binned_image is not None  # Its colour palette is still being generated
+
+    store.unpin(images[0])
+    assert images[0].binned_image is None
+    assert images[1].binned_image is not None
+
+
+def test_forgotten_binned_images_are_not_given_back():
+    image_data = get_binned_image_data()
+    workspace = PaletteWorkspace()
+    store = BinnedImageStore(workspace)
+
+    store.keep(image_data)
+    store.forget(image_data)
+
+    assert len(store) == 0
+    assert len(workspace) == 0
+    assert image_data.binned_image is not None
+
+
+def test_negative_size_raises_error():
+    with pytest.raises(ValueError):
+        BinnedImageStore(max_bytes=-1)
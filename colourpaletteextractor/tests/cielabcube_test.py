@@ -0,0 +1,85 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import cielabcube
+
+
+def _get_table():
+    # Three pixels in cube [0, 0, 0] (row 0) and one pixel in cube [1, -1, 2] (row 1)
+    lab = np.array([[1., 2., 3.], [3., 2., 1.], [2., 2., 2.], [20., -20., 40.]])
+    c_stars = np.hypot(lab[:, 1], lab[:, 2])
+    pixel_rows = np.array([0, 0, 0, 1])
+
+    return cielabcube.CielabCubeTable(coordinates=[[0, 0, 0], [1, -1, 2]],
+                                      pixel_counts=[3, 1],
+                                      lab_sums=[[6., 6., 6.], [20., -20., 40.]],
+                                      pixel_rows=pixel_rows,
+                                      lab=lab,
+                                      c_stars=c_stars)
+
+
+def test_cube_table_mean_colours():
+    table = _get_table()
+    table.calculate_mean_colours()
+
+    assert len(table) == 2
+    assert (table.mean_colours[0] == [2, 2, 2]).all()
+    assert (table.mean_colours[1] == [20, -20, 40]).all()
+
+
+def test_cube_is_view_onto_table_row():
+    table = _get_table()
+    cube = table[1]
+
+    assert list(cube.coordinates) == [1, -1, 2]
+    assert cube.pixel_count == 1
+    assert cube.relevant is False
+
+    # Changes made through the cube are stored in the table
+    cube.relevant = True
+    cube.increment_pixel_count_after_reassignment()
+    cube.calculate_mean_colour()
+
+    assert table.relevant[1]
+    assert not table.relevant[0]
+    assert table.pixel_counts_after_reassignment[1] == 1
+    assert (table.mean_colours[1] == [20, -20, 40]).all()
+
+
+def test_cube_pixels_are_taken_from_table():
+    table = _get_table()
+    cube = table[0]
+
+    assert cube.pixels.shape == (3, 3)
+    assert list(cube.l_stars) == [1, 3, 2]
+    assert cube.get_l_star_percentile_value(50) == 2
+    assert len(cube.c_stars) == 3
+
+
+def test_relative_frequencies_of_cubes():
+    table = _get_table()
+    table.pixel_counts_after_reassignment = [3, 1]
+
+    assert cielabcube.get_relative_frequencies(table.get_cubes(), total_pixels=4) == [0.75, 0.25]
+
+
+def test_cube_table_rows_must_match():
+    with pytest.raises(ValueError):
+        cielabcube.CielabCubeTable(coordinates=[[0, 0, 0]], pixel_counts=[1, 2], lab_sums=[[0., 0., 0.]])
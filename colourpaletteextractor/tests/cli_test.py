@@ -0,0 +1,94 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import json
+import subprocess
+import sys
+
+from colourpaletteextractor import cli
+
+
+def test_find_images_in_directory():
+    paths = cli.find_images(["./colourpaletteextractor/tests/testImages"])
+
+    assert len(paths) == 12
+    assert all(path.endswith(".png") for path in paths)
+
+
+def test_find_images_removes_duplicates():
+    path = "./colourpaletteextractor/tests/testImages/multi-colour-1.png"
+    paths = cli.find_images([path, "./colourpaletteextractor/tests/testImages/multi-*.png"])
+
+    assert paths == [path]
+
+
+def test_jsonl_output(tmp_path):
+    output = tmp_path / "palettes.jsonl"
+    path = "./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png"
+
+    assert cli.main([path, "--jobs", "1", "--output", str(output)]) == 0
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(results) == 1
+    assert results[0]["file"] == path
+    assert results[0]["algorithm"] == cli.DEFAULT_ALGORITHM.__name__
+    assert results[0]["colour_palette"] == [[0, 67, 139], [209, 198, 161]]
+    assert results[0]["relative_frequencies"] == [0.88, 0.12]
+
+
+def test_csv_output_with_worker_processes(tmp_path):
+    output = tmp_path / "palettes.csv"
+    paths = ["./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png",
+             "./colourpaletteextractor/tests/testImages/1-grey-99-white.png"]
+
+    assert cli.main(paths + ["--jobs", "2", "--format", "csv", "--output", str(output)]) == 0
+
+    rows = output.read_text().splitlines()
+    assert rows[0] == ",".join(cli.CSV_HEADER)
+    assert rows[1].startswith(paths[0] + ",Nieves2020CentredCubes,1,0,67,139,#00438b,0.88")
+    assert len(rows) == 4
+
+
+def test_cli_does_not_import_qt():
+    code = ("import sys; from colourpaletteextractor import cli; "
+            "cli.main(['./colourpaletteextractor/tests/testImages/1-grey-99-white.png', '-j', '1', '-o', '"
+            + ("NUL" if sys.platform == "win32" else "/dev/null") + "']); "
+            "sys.exit(any(module.startswith('PySide2') for module in sys.modules))")
+
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_single_precision_output(tmp_path):
+    output = tmp_path / "palettes.jsonl"
+    path = "./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png"
+
+    assert cli.main([path, "--jobs", "1", "--single-precision", "--output", str(output)]) == 0
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert results[0]["colour_palette"] == [[0, 67, 139], [209, 198, 161]]
+    assert results[0]["relative_frequencies"] == [0.88, 0.12]
+
+
+def test_tiled_output(tmp_path):
+    output = tmp_path / "palettes.jsonl"
+    path = "./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png"
+
+    assert cli.main([path, "--jobs", "1", "--tiled", "--output", str(output)]) == 0
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert results[0]["colour_palette"] == [[0, 67, 139], [209, 198, 161]]
+    assert results[0]["relative_frequencies"] == [0.88, 0.12]
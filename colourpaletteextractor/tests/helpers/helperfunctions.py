@@ -15,8 +15,15 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import subprocess
+import sys
+import threading
+
 from skimage import io
 
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.progressreporter import ProgressReporter
+
 
 def get_image(path_to_image: str):
     """Returns the image found at the given path.
@@ -30,3 +37,58 @@ def get_image(path_to_image: str):
     """
 
     return io.imread(path_to_image)
+
+
+def check_imports_without_qt(code: str) -> bool:
+    """Run the code in a new interpreter, returning True if PySide2 was not imported.
+
+    Args:
+        code (str): The Python code to be run (e.g., an import statement).
+
+    Returns:
+        (bool): True if PySide2 was not imported. Otherwise False.
+    """
+
+    code += "; import sys; sys.exit(any(module.startswith('PySide2') for module in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def time_import(module: str) -> tuple[float, set[str]]:
+    """Import the module in a new interpreter, returning the time taken (s) and the top-level packages imported.
+
+    Args:
+        module (str): The name of the module to be imported.
+
+    Returns:
+        (float): The time (s) taken to import the module.
+        (set[str]): The names of the top-level packages imported by the interpreter.
+    """
+
+    code = ("import sys, time; start = time.perf_counter(); import " + module + "; "
+            "print(time.perf_counter() - start); print(' '.join({name.split('.')[0] for name in sys.modules}))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    seconds, packages = output.splitlines()[-2:]
+    return float(seconds), set(packages.split())
+
+
+class RecordingProgressReporter(ProgressReporter):
+    """Progress reporter that records the progress reported, and is cancelled with the given image (if any).
+
+    Args:
+        image_data (ImageData): (Optional) The :class:`ImageData` object whose thread status is followed.
+    """
+
+    def __init__(self, image_data: ImageData = None):
+        self.reported_progress = []
+        self._image_data = image_data
+
+    def report_progress(self, percent: float) -> None:
+        self.reported_progress.append(percent)
+
+    @property
+    def continue_thread(self) -> bool:
+        return self._image_data is None or self._image_data.continue_thread
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        return None if self._image_data is None else self._image_data.cancel_event
@@ -0,0 +1,147 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import palettealgorithm
+from colourpaletteextractor.model.imagedata import ImageData, DRAFT_SCALES, read_reduced_image
+
+
+def get_image_data() -> ImageData:
+    return ImageData("./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png")
+
+
+def test_recoloured_image_built_from_index_map():
+    image_data = get_image_data()
+    colour_palette = [np.array([10, 20, 30], dtype=np.uint8), np.array([200, 100, 0], dtype=np.uint8)]
+    index_map = np.zeros(image_data.image.shape[:2], dtype=np.uint8)
+    index_map[0, 0] = 1
+
+    image_data.set_index_map(index_map, colour_palette)
+    image_data.colour_palette = colour_palette
+    image_data.colour_palette_relative_frequency = [0.9, 0.1]
+    image_data.sort_colour_palette(reverse=False)  # Does not change the index map's colours
+
+    assert image_data.recoloured_image_available
+    assert image_data.recoloured_image.shape == index_map.shape + (3,)
+    assert list(image_data.recoloured_image[0, 0]) == [200, 100, 0]
+    assert list(image_data.recoloured_image[0, 1]) == [10, 20, 30]
+
+
+def test_recoloured_image_built_from_index_map_not_kept():
+    image_data = get_image_data()
+    image_data.set_index_map(np.zeros(image_data.image.shape[:2], dtype=np.uint8), [np.zeros(3, dtype=np.uint8)])
+
+    recoloured_image = image_data.recoloured_image
+
+    assert image_data.recoloured_image is not recoloured_image
+    assert (image_data.recoloured_image == recoloured_image).all()
+    assert image_data.index_map is not None
+
+
+def test_setting_recoloured_image_removes_index_map():
+    image_data = get_image_data()
+    image_data.set_index_map(np.zeros(image_data.image.shape[:2], dtype=np.uint8), [np.zeros(3, dtype=np.uint8)])
+
+    image_data.recoloured_image = None
+
+    assert image_data.index_map is None
+    assert image_data.recoloured_image is None
+    assert not image_data.recoloured_image_available
+
+
+def test_index_map_of_recoloured_image():
+    colour_palette = [np.array([5, 5, 5]), np.array([0, 0, 0]), np.array([255, 0, 9])]
+    index_map = np.array([[0, 1, 2], [2, 2, 1]], dtype=np.uint8)
+    recoloured_image = palettealgorithm.get_recoloured_image(index_map, colour_palette)
+
+    assert (palettealgorithm.get_index_map(recoloured_image, colour_palette) == index_map).all()
+
+
+def test_image_decoded_when_loaded():
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png", load=False)
+
+    assert not image_data.loaded
+    assert image_data.image is None
+    assert image_data.name == "2-beige-10-sand-88-blue"
+
+    image = image_data.load()
+
+    assert image_data.loaded
+    assert image is image_data.image
+    assert (image == get_image_data().image).all()
+    assert image_data.load() is image  # Not decoded again
+
+
+def test_image_that_cannot_be_decoded(tmp_path):
+    file_name_and_path = tmp_path / "not-an-image.png"
+    file_name_and_path.write_bytes(b"not an image")
+
+    image_data = ImageData(str(file_name_and_path), load=False)  # Errors are only raised when decoding the image
+
+    with pytest.raises((OSError, ValueError)):
+        image_data.load()
+    assert not image_data.loaded
+
+
+def test_jpeg_image_decoded_at_reduced_resolution():
+    file_name_and_path = "./colourpaletteextractor/data/sampleImages/my_parents.jpg"
+    height, width = ImageData(file_name_and_path).image.shape[:2]
+
+    for scale in DRAFT_SCALES:
+        max_pixels = -(-width // scale) * -(-height // scale)
+        reduced_image, reduced_scale = read_reduced_image(file_name_and_path, max_pixels)
+
+        assert reduced_image.shape == (-(-height // scale), -(-width // scale), 3)
+        assert reduced_scale == pytest.approx(1 / scale, rel=0.01)
+
+    # Reduced further than 1/8 by only keeping every n-th pixel
+    reduced_image, reduced_scale = read_reduced_image(file_name_and_path, 1000)
+    assert reduced_image.shape[0] * reduced_image.shape[1] <= 1000
+    assert reduced_image.flags["C_CONTIGUOUS"]
+    assert reduced_scale < 1 / DRAFT_SCALES[-1]
+
+
+def test_image_not_decoded_at_reduced_resolution():
+    png_file = "./colourpaletteextractor/data/sampleImages/jon_schueler_sun_1959.png"
+    assert read_reduced_image(png_file, 1000) == (None, 1)  # Not a JPEG image
+
+    jpeg_file = "./colourpaletteextractor/data/sampleImages/my_parents.jpg"
+    assert read_reduced_image(jpeg_file, 10 ** 8) == (None, 1)  # Already small enough
+
+
+def test_preview_decoded_before_image():
+    image_data = ImageData("./colourpaletteextractor/data/sampleImages/my_parents.jpg", load=False)
+
+    preview_image = image_data.load_preview(50_000)
+
+    assert not image_data.loaded  # Only the reduced resolution image was decoded
+    assert preview_image is image_data.preview_image
+    assert preview_image.shape[0] * preview_image.shape[1] <= 50_000
+    assert image_data.preview_scale == preview_image.shape[1] / image_data.load().shape[1]
+    assert image_data.load_preview(50_000) is preview_image  # Not decoded again
+
+
+def test_preview_of_image_that_cannot_be_decoded_at_reduced_resolution():
+    image_data = ImageData("./colourpaletteextractor/data/sampleImages/jon_schueler_sun_1959.png", load=False)
+
+    preview_image = image_data.load_preview(10_000)
+
+    assert image_data.loaded  # Image was decoded in full instead
+    assert np.shares_memory(preview_image, image_data.image)
+    assert image_data.preview_scale == preview_image.shape[1] / image_data.image.shape[1]
@@ -0,0 +1,190 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020, palettealgorithm
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.model import generate_colour_palette_sweep_from_image, \
+    generate_image_data_colour_palette
+from colourpaletteextractor.model.progressreporter import ProgressReporter
+from colourpaletteextractor.tests.helpers import helperfunctions
+
+
+def test_algorithms_do_not_import_qt():
+    assert helperfunctions.check_imports_without_qt("import colourpaletteextractor.model.algorithms.nieves2020")
+
+
+def test_algorithms_import_quickly():
+    seconds, packages = helperfunctions.time_import("colourpaletteextractor.model.algorithms.nieves2020")
+
+    assert packages.isdisjoint({"PySide2", "scipy", "matplotlib", "pandas"})
+    assert seconds < 2  # Generous bound, importing usually takes well under 300 ms
+
+
+def test_generate_colour_palette_from_image_does_not_import_qt():
+    assert helperfunctions.check_imports_without_qt(
+        "from colourpaletteextractor.model.model import generate_colour_palette_from_image; "
+        "generate_colour_palette_from_image('./colourpaletteextractor/tests/testImages/99-black-1-pink.png')")
+
+
+class CancellingProgressReporter(ProgressReporter):
+
+    def __init__(self, cancel_at: float):
+        self.reported_progress = []
+        self._cancel_at = cancel_at
+
+    def report_progress(self, percent: float) -> None:
+        self.reported_progress.append(percent)
+
+    @property
+    def continue_thread(self) -> bool:
+        return len(self.reported_progress) == 0 or self.reported_progress[-1] < self._cancel_at
+
+
+def test_progress_reporter_cancels_algorithm():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    progress_reporter = CancellingProgressReporter(cancel_at=25)
+    algorithm.set_progress_reporter(progress_reporter)
+    index_map, colour_palette, relative_frequencies = algorithm.generate_colour_palette_index_map(image)
+
+    assert index_map is None
+    assert colour_palette == []
+    assert progress_reporter.reported_progress[0] == 0
+    assert progress_reporter.reported_progress[-1] == 25
+
+
+def test_image_data_colour_palette_generated_again_from_binned_image():
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    generate_image_data_colour_palette(image_data, algorithm)
+    binned_image = image_data.binned_image
+    assert binned_image is not None
+
+    # Only the relevancy parameters have changed, so the image is not binned again
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.threshold = 0.05
+    generate_image_data_colour_palette(image_data, algorithm)
+    assert image_data.binned_image is binned_image
+
+    expected_recoloured_image, expected_colour_palette, _ = algorithm.generate_colour_palette(image_data.image)
+    assert (image_data.recoloured_image == expected_recoloured_image).all()
+    assert len(image_data.colour_palette) == len(expected_colour_palette)
+
+    # A different algorithm bins the image again
+    generate_image_data_colour_palette(image_data, nieves2020.Nieves2020OffsetCubes())
+    assert image_data.binned_image is not binned_image
+
+
+def test_preview_image_has_at_most_max_pixels():
+    image = np.zeros((101, 53, 3), dtype=np.uint8)
+
+    assert palettealgorithm.get_preview_image(image, image.shape[0] * image.shape[1]) is image
+    for max_pixels in [1, 10, 100, 1000, 5000]:
+        preview_image = palettealgorithm.get_preview_image(image, max_pixels)
+        assert preview_image.shape[0] * preview_image.shape[1] <= max_pixels
+        assert np.shares_memory(preview_image, image)  # No pixels are copied
+
+    with pytest.raises(ValueError):
+        palettealgorithm.get_preview_image(image, 0)
+
+
+def test_colour_palette_difference():
+    colour_palette = [np.array([0, 0, 0]), np.array([255, 255, 255])]
+
+    assert palettealgorithm.get_colour_palette_difference(colour_palette, [0.5, 0.5], colour_palette) == 0
+    assert palettealgorithm.get_colour_palette_difference(colour_palette, [0.5, 0.5], []) == float("inf")
+
+    # Only the white is matched to black (delta E of 100), weighted by its relative frequency
+    difference = palettealgorithm.get_colour_palette_difference(colour_palette, [0.75, 0.25], colour_palette[:1])
+    assert difference == pytest.approx(25, abs=1e-3)
+
+
+def test_image_data_colour_palette_generated_progressively():
+    image_data = ImageData("./colourpaletteextractor/data/sampleImages/my_parents_small.jpg")
+    num_pixels = image_data.image.shape[0] * image_data.image.shape[1]
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    progress_reporter = CancellingProgressReporter(cancel_at=101)
+    algorithm.set_progress_reporter(progress_reporter)
+    previews = []
+    generate_image_data_colour_palette(image_data, algorithm,
+                                       preview=lambda colour_palette, relative_frequencies: previews.append(
+                                           (colour_palette, relative_frequencies)),
+                                       preview_max_pixels=num_pixels // 16)
+
+    # The preview is sorted by relative frequency and its progress is not reported
+    assert len(previews) == 1
+    preview_colour_palette, preview_relative_frequencies = previews[0]
+    assert len(preview_colour_palette) > 0
+    assert preview_relative_frequencies == sorted(preview_relative_frequencies, reverse=True)
+    assert progress_reporter.reported_progress.count(0) == 1
+    assert progress_reporter.reported_progress[-1] == 100
+    assert algorithm.progress_reporter is progress_reporter
+
+    # The final colour palette is unaffected by the preview
+    _, expected_colour_palette, _ = nieves2020.Nieves2020CentredCubes().generate_colour_palette_index_map(
+        image_data.image)
+    assert sorted(map(tuple, image_data.colour_palette)) == sorted(map(tuple, expected_colour_palette))
+    assert image_data.binned_image.shape == image_data.image.shape[:2]
+    assert palettealgorithm.get_colour_palette_difference(
+        image_data.colour_palette, image_data.colour_palette_relative_frequency, preview_colour_palette) \
+        == pytest.approx(image_data.preview_difference)
+
+
+def test_colour_palette_previewed_from_reduced_resolution_jpeg_image():
+    image_data = ImageData("./colourpaletteextractor/data/sampleImages/my_parents.jpg", load=False)
+    image_data.load_preview(50_000)  # Decoded at a reduced resolution (e.g., while the image is being opened)
+    preview_image = image_data.preview_image
+    image_data.load()
+
+    previews = []
+    generate_image_data_colour_palette(image_data, nieves2020.Nieves2020CentredCubes(),
+                                       preview=lambda colour_palette, relative_frequencies: previews.append(
+                                           colour_palette),
+                                       preview_max_pixels=50_000)
+
+    assert image_data.preview_image is preview_image  # Not decoded again
+    assert image_data.preview_scale < 1
+    assert len(previews) == 1 and len(previews[0]) > 0
+    assert image_data.preview_difference is not None
+
+
+def test_small_image_is_not_previewed():
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    previews = []
+    generate_image_data_colour_palette(image_data, nieves2020.Nieves2020CentredCubes(),
+                                       preview=lambda colour_palette, relative_frequencies: previews.append(
+                                           colour_palette))
+
+    assert previews == []
+    assert image_data.preview_difference is None
+    assert len(image_data.colour_palette) > 0
+
+
+def test_colour_palette_sweep_from_image():
+    rows = generate_colour_palette_sweep_from_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png",
+                                                    cube_sizes=[15, 20], thresholds=[0.03])
+
+    assert {(row["cube_size"], row["threshold"]) for row in rows} == {(15, 0.03), (20, 0.03)}
+    for cube_size in [15, 20]:
+        assert sum(row["relative_frequency"] for row in rows if row["cube_size"] == cube_size) == \
+               pytest.approx(1)
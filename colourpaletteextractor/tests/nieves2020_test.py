@@ -15,7 +15,15 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-from colourpaletteextractor.model.algorithms import nieves2020
+import glob
+import tracemalloc
+
+import numpy as np
+import pytest
+from skimage import color, img_as_uint
+
+from colourpaletteextractor.model.algorithms import nieves2020, palettealgorithm
+from colourpaletteextractor.model.imagedata import ImageData
 from colourpaletteextractor.tests.helpers import helperfunctions
 
 
@@ -27,9 +35,7 @@ def test_nieves2020_offset_cubes_constructor():
     assert algorithm.url == "https://doi.org/10.1364/AO.378659"
 
     # Check default parameters
-    assert algorithm._progress_callback is None
-    assert algorithm._tab is None
-    assert algorithm._image_data is None
+    assert algorithm._progress_reporter is None
     assert algorithm._percent == 0
 
     # Execution status of algorithm
@@ -43,9 +49,7 @@ def test_nieves2020_centred_cubes_constructor():
     assert algorithm.url == "https://doi.org/10.1364/AO.378659"
 
     # Check default parameters
-    assert algorithm._progress_callback is None
-    assert algorithm._tab is None
-    assert algorithm._image_data is None
+    assert algorithm._progress_reporter is None
     assert algorithm._percent == 0
 
     # Execution status of algorithm
@@ -371,3 +375,469 @@ def test_closest_relevant_colour_used_to_recolour_pixel():
     assert (recoloured_image[0][2][:] == [209, 198, 161]).all
     assert (recoloured_image[0][3][:] == [209, 198, 161]).all
     assert (recoloured_image[0][4][:] == [0, 67, 139]).all
+
+
+def test_closest_colour_tie_chooses_first_colour():
+    pixels = np.array([[50., 0., 0.], [50., 10., 0.]])
+    colours = np.array([[50., 5., 0.], [50., -5., 0.], [50., 10., 0.]])
+    # First pixel is equidistant from the first two colours
+
+    closest = nieves2020.get_closest_colour_indices(pixels, colours)
+
+    assert list(closest) == [0, 2]
+
+
+def test_recolouring_does_not_depend_on_chunk_size():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/2-beige-10-sand-88-blue.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    recoloured_image_1, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette(image)
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.recolour_chunk_bytes = 1  # One pixel per chunk
+    recoloured_image_2, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette(image)
+
+    assert (recoloured_image_1 == recoloured_image_2).all()
+    assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+    assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_weighted_percentile_matches_percentile_of_repeated_values():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=50)
+    weights = rng.integers(0, 10, size=50)
+    weights[0] = 1  # At least one value
+    repeated_values = np.repeat(values, weights)
+
+    for percentile in [0, 1, 12.5, 33, 50, 66.6, 99, 100]:
+        assert nieves2020.get_weighted_percentile(values, percentile, weights) \
+               == np.percentile(repeated_values, percentile)
+
+
+def test_weighted_percentile_of_many_tied_values():
+    rng = np.random.default_rng(1)
+    values = np.round(rng.gamma(2, 10, size=20000), 1)  # Many repeated values
+    values[:5000] = 0  # e.g., greyscale pixels
+    weights = rng.integers(1, 1000, size=values.size)
+    repeated_values = np.repeat(values, weights)
+
+    for percentile in [0, 10, 25, 50, 75, 90, 100]:
+        assert nieves2020.get_weighted_percentile(values, percentile, weights) \
+               == np.percentile(repeated_values, percentile)
+        assert nieves2020.get_weighted_percentile(repeated_values, percentile) \
+               == np.percentile(repeated_values, percentile)
+
+
+def test_secondary_counts_match_separate_counts():
+    rng = np.random.default_rng(2)
+    indices = rng.integers(0, 30, size=1000)
+    c_stars = rng.uniform(0, 100, size=1000)
+    l_stars = rng.uniform(0, 100, size=1000)
+    weights = rng.integers(1, 50, size=1000)
+
+    for entry_weights in [None, weights]:
+        c_star_counts, l_star_counts = nieves2020.get_secondary_counts(indices, 30, c_stars, 40, l_stars, 80,
+                                                                       entry_weights)
+        assert (c_star_counts == nieves2020.get_counts(indices, 30, entry_weights, c_stars > 40)).all()
+        assert (l_star_counts == nieves2020.get_counts(indices, 30, entry_weights, l_stars > 80)).all()
+
+
+def test_unique_colours_of_image():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/half-black-grey-60x60.png")
+
+    colours, inverse, counts = nieves2020.get_unique_colours(image)
+
+    assert colours.shape == (2, 4)
+    assert (colours[inverse].reshape(image.shape) == image).all()
+    assert list(counts) == [1800, 1800]
+
+
+def test_unique_colours_mode_matches_per_pixel_mode():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020OffsetCubes()
+    recoloured_image_1, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette(image)
+
+    algorithm = nieves2020.Nieves2020OffsetCubes()
+    algorithm.unique_colours = True
+    recoloured_image_2, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette(image)
+
+    assert (recoloured_image_1 == recoloured_image_2).all()
+    assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+    assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_lookup_table_conversion_matches_skimage():
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, size=[1024, 1024, 3], dtype=np.uint8)
+    image[0, :256] = np.arange(256, dtype=np.uint8)[:, np.newaxis]  # All grey levels
+
+    lab_1 = nieves2020.convert_rgb_2_lab(image, use_lookup_table=False)
+    lab_2 = nieves2020.convert_rgb_2_lab(image)
+    assert np.abs(lab_1 - lab_2).max() < 1e-10
+
+
+def test_lookup_table_conversion_of_rgba_image():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    lab_1 = nieves2020.convert_rgb_2_lab(image, use_lookup_table=False)
+    lab_2 = nieves2020.convert_rgb_2_lab(image)
+    assert lab_2.shape == image.shape[:2] + (3,)
+    assert np.abs(lab_1 - lab_2).max() < 1e-10
+
+
+def test_index_map_matches_recoloured_image():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    recoloured_image, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette(image)
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    index_map, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette_index_map(image)
+
+    assert index_map.dtype == np.uint8
+    assert index_map.shape == image.shape[:2]
+    assert (np.array(colour_palette_2)[index_map] == recoloured_image).all()
+    assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+    assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_unique_colours_do_not_depend_on_workers():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    colours_1, inverse_1, counts_1 = nieves2020.get_unique_colours(image)
+    colours_2, inverse_2, counts_2 = nieves2020.get_unique_colours(image, workers=3)
+
+    assert (colours_1 == colours_2).all()
+    assert (inverse_1 == inverse_2).all()
+    assert (counts_1 == counts_2).all()
+
+
+def test_colour_palette_does_not_depend_on_workers():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    for unique_colours in [False, True]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.unique_colours = unique_colours
+        recoloured_image_1, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette(image)
+
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.unique_colours = unique_colours
+        algorithm.workers = 4
+        algorithm.recolour_chunk_bytes = 1024  # Many chunks to share between the workers
+        recoloured_image_2, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette(image)
+
+        assert (recoloured_image_1 == recoloured_image_2).all()
+        assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+        assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_counts_do_not_depend_on_workers(monkeypatch):
+    monkeypatch.setattr(nieves2020, "COUNT_CHUNK_SIZE", 97)  # Many chunks to share between the workers
+    rng = np.random.default_rng(3)
+    indices = rng.integers(0, 30, size=1000).astype(np.int32)
+    c_stars = rng.uniform(0, 100, size=1000)
+    l_stars = rng.uniform(0, 100, size=1000)
+    weights = rng.integers(1, 50, size=1000)
+
+    assert (nieves2020.get_counts(indices, 30, weights) == nieves2020.get_counts(indices, 30, weights, workers=4)).all()
+    for counts_1, counts_2 in zip(nieves2020.get_secondary_counts(indices, 30, c_stars, 40, l_stars, 80, weights),
+                                  nieves2020.get_secondary_counts(indices, 30, c_stars, 40, l_stars, 80, weights,
+                                                                  workers=4)):
+        assert (counts_1 == counts_2).all()
+
+
+def test_cube_sums_do_not_depend_on_workers(monkeypatch):
+    monkeypatch.setattr(nieves2020, "COUNT_CHUNK_SIZE", 1000)  # Many chunks to share between the workers
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    lab_sums = []
+    for workers in [1, 4]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.workers = workers
+        binned_image = algorithm.bin_image(image)
+        lab_sums.append(binned_image.cubes.lab_sums)
+
+    assert np.array_equal(lab_sums[0], lab_sums[1])  # Bit-identical, as the chunks are added in the same order
+
+
+def test_binned_image_matches_full_generation_for_new_relevancy_parameters():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    for unique_colours in [False, True]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.unique_colours = unique_colours
+        algorithm.generate_colour_palette_index_map(image)
+        binned_image = algorithm.binned_image
+
+        for threshold, c_star_percentile, min_l_star in [(0.01, 50, 80), (0.05, 75, 60), (0.03, 50, 80)]:
+            algorithm.threshold = threshold
+            algorithm.c_star_percentile = c_star_percentile
+            algorithm.min_l_star = min_l_star
+            index_map_1, colour_palette_1, relative_frequencies_1 = \
+                algorithm.generate_colour_palette_index_map_from_binned_image(binned_image)
+
+            full_algorithm = nieves2020.Nieves2020CentredCubes()
+            full_algorithm.unique_colours = unique_colours
+            full_algorithm.threshold = threshold
+            full_algorithm.c_star_percentile = c_star_percentile
+            full_algorithm.min_l_star = min_l_star
+            index_map_2, colour_palette_2, relative_frequencies_2 = \
+                full_algorithm.generate_colour_palette_index_map(image)
+
+            assert (index_map_1 == index_map_2).all()
+            assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+            assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_binned_image_cannot_be_reused_with_different_binning_parameters():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.generate_colour_palette_index_map(image)
+    binned_image = algorithm.binned_image
+
+    algorithm.threshold = 0.05
+    assert algorithm.can_reuse_binned_image(binned_image)
+
+    algorithm.unique_colours = True
+    assert not algorithm.can_reuse_binned_image(binned_image)
+
+    offset_algorithm = nieves2020.Nieves2020OffsetCubes()
+    assert not offset_algorithm.can_reuse_binned_image(binned_image)
+    with pytest.raises(ValueError):
+        offset_algorithm.generate_colour_palette_index_map_from_binned_image(binned_image)
+
+
+def test_relevancy_parameters_must_be_valid():
+    algorithm = nieves2020.Nieves2020CentredCubes()
+
+    for name, value in [("threshold", 1.5), ("secondary_threshold", -0.1), ("c_star_percentile", 101),
+                        ("min_l_star", -1)]:
+        with pytest.raises(ValueError):
+            setattr(algorithm, name, value)
+
+
+def test_colour_palette_sweep_matches_each_colour_palette():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    cube_sizes = [10, 20]
+    thresholds = [0.01, 0.03]
+    rows = nieves2020.Nieves2020OffsetCubes().generate_colour_palette_sweep(image, cube_sizes, thresholds)
+
+    for cube_size in cube_sizes:
+        for threshold in thresholds:
+            algorithm = nieves2020.Nieves2020OffsetCubes()
+            algorithm.cube_size = cube_size
+            algorithm.threshold = threshold
+            _, colour_palette, relative_frequencies = algorithm.generate_colour_palette(image)
+            palette = sorted(zip(relative_frequencies, colour_palette), key=lambda pair: pair[0], reverse=True)
+
+            sweep_rows = [row for row in rows if row["cube_size"] == cube_size and row["threshold"] == threshold]
+            assert [row["rank"] for row in sweep_rows] == list(range(1, len(palette) + 1))
+            assert [[row["red"], row["green"], row["blue"]] for row in sweep_rows] == \
+                   [list(colour) for _, colour in palette]
+            assert [row["relative_frequency"] for row in sweep_rows] == [frequency for frequency, _ in palette]
+
+
+def test_colour_palette_sweep_continues_after_threshold_with_no_relevant_cubes():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/all-black-60x60.png")
+
+    # A threshold of 1 is above the share of the only (black) cube, which has no secondary pixels either
+    rows = nieves2020.Nieves2020OffsetCubes().generate_colour_palette_sweep(image, [10, 20], [1, 0.5])
+
+    assert [(row["cube_size"], row["threshold"], row["rank"]) for row in rows] == \
+           [(10, 1, 0), (10, 0.5, 1), (20, 1, 0), (20, 0.5, 1)]
+    assert [row["red"] for row in rows] == [None, 0, None, 0]
+    assert [row["relative_frequency"] for row in rows] == [0, 1, 0, 1]
+
+
+def test_colour_palette_sweep_does_not_hide_other_errors(monkeypatch):
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/all-black-60x60.png")
+
+    def lose_pixels(*args, **kwargs):
+        raise ValueError("Not all of the pixels have been accounted for!")
+
+    algorithm = nieves2020.Nieves2020OffsetCubes()
+    monkeypatch.setattr(algorithm, "_set_cubes_relevance_status", lose_pixels)
+    with pytest.raises(ValueError, match="Not all of the pixels"):
+        algorithm.generate_colour_palette_sweep(image, [10, 20], [1, 0.5])
+
+
+def test_sparse_cube_grid_matches_dense_cube_grid():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    for cube_size in [3, 20]:
+        algorithm = nieves2020.Nieves2020OffsetCubes()
+        algorithm.cube_size = cube_size
+        index_map_1, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette_index_map(image)
+        cubes_1 = algorithm.binned_image.cubes
+
+        algorithm = nieves2020.Nieves2020OffsetCubes()
+        algorithm.cube_size = cube_size
+        algorithm.dense_cube_grid_max_cells = 0  # Always use the sparse grid
+        index_map_2, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette_index_map(image)
+        cubes_2 = algorithm.binned_image.cubes
+
+        assert (cubes_1.coordinates == cubes_2.coordinates).all()
+        assert (cubes_1.pixel_counts == cubes_2.pixel_counts).all()
+        assert (index_map_1 == index_map_2).all()
+        assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+        assert relative_frequencies_1 == relative_frequencies_2
+
+
+def test_cube_keys_match_cube_coordinates():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    lab = nieves2020.convert_rgb_2_lab(image).reshape(-1, 3)
+
+    for algorithm in [nieves2020.Nieves2020OffsetCubes(), nieves2020.Nieves2020CentredCubes()]:
+        cube_keys, grid_bounds = algorithm._divide_cielab_space(lab, 10)
+        coordinates = algorithm._get_cube_coordinates(lab, np.empty(lab.shape)).astype(int)
+        grid_shape = grid_bounds[:, 1] - grid_bounds[:, 0] + 1
+
+        assert cube_keys.dtype == np.int16
+        assert (cube_keys == np.ravel_multi_index(coordinates.T, grid_shape, mode="wrap")).all()
+
+    assert nieves2020.get_key_dtype(2 ** 15) == np.int16
+    assert nieves2020.get_key_dtype(2 ** 15 + 1) == np.int32
+    assert nieves2020.get_key_dtype(2 ** 31 + 1) == np.int64
+
+
+def test_single_precision_lab_conversion():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    lab_1 = nieves2020.convert_rgb_2_lab(image)
+    lab_2 = nieves2020.convert_rgb_2_lab(image, dtype=np.float32)
+    lab_3 = nieves2020.convert_rgb_2_lab(image, use_lookup_table=False, dtype=np.float32)
+
+    assert lab_1.dtype == np.float64
+    assert lab_2.dtype == np.float32
+    assert lab_3.dtype == np.float32
+    assert np.allclose(lab_1, lab_2, atol=1e-4)
+    assert np.allclose(lab_1, lab_3, atol=1e-4)
+    assert nieves2020.get_c_stars(lab_2).dtype == np.float32
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("./colourpaletteextractor/data/sampleImages/*")))
+def test_single_precision_matches_double_precision_on_sample_images(path):
+    image = ImageData(path).image
+
+    for algorithm_class in [nieves2020.Nieves2020OffsetCubes, nieves2020.Nieves2020CentredCubes]:
+        algorithm = algorithm_class()
+        index_map_1, colour_palette_1, relative_frequencies_1 = algorithm.generate_colour_palette_index_map(image)
+        cubes_1 = algorithm.binned_image.cubes
+
+        algorithm = algorithm_class()
+        algorithm.single_precision = True
+        index_map_2, colour_palette_2, relative_frequencies_2 = algorithm.generate_colour_palette_index_map(image)
+        cubes_2 = algorithm.binned_image.cubes
+
+        assert algorithm.binned_image.lab.dtype == np.float32
+        assert algorithm.binned_image.c_stars.dtype == np.float32
+
+        # Documented maximum deviation from double precision (see Nieves2020.single_precision)
+        assert (cubes_1.coordinates == cubes_2.coordinates).all()
+        assert np.abs(cubes_1.mean_colours - cubes_2.mean_colours).max() < 1e-4
+        assert [list(colour) for colour in colour_palette_1] == [list(colour) for colour in colour_palette_2]
+        assert np.abs(np.array(relative_frequencies_1) - np.array(relative_frequencies_2)).max() <= 1e-6
+        assert (index_map_1 != index_map_2).mean() <= 1e-6
+
+
+def test_chunked_lab_conversion_matches_skimage():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png").copy()
+    image[::2, ::3, 3] = 128  # Partially transparent pixels
+
+    expected_lab = color.rgb2lab(color.rgba2rgb(image), illuminant="D65")
+    assert np.allclose(nieves2020.convert_rgb_2_lab(image), expected_lab, rtol=0, atol=1e-10)
+
+    image = img_as_uint(image[..., :3])  # 16-bit image
+    expected_lab = color.rgb2lab(image, illuminant="D65")
+    assert np.allclose(nieves2020.convert_rgb_2_lab(image), expected_lab, rtol=0, atol=1e-10)
+
+
+def test_algorithm_does_not_write_to_image():
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    greyscale_image = ImageData("./colourpaletteextractor/data/sampleImages/jon_schueler_sun_1959_greyscale.png").image
+
+    for original_image in [image, image[..., :3], greyscale_image]:
+        read_only_image = palettealgorithm.get_read_only_view(original_image)
+        for unique_colours in [False, True]:
+            algorithm = nieves2020.Nieves2020CentredCubes()
+            algorithm.unique_colours = unique_colours
+            recoloured_image, colour_palette, _ = algorithm.generate_colour_palette(read_only_image)
+
+            assert recoloured_image.shape[:2] == original_image.shape[:2]
+            assert len(colour_palette) > 0
+
+    # Greyscale images are viewed as RGB images without copying them
+    rgb_view = nieves2020.get_rgb_view(greyscale_image)
+    assert np.shares_memory(rgb_view, greyscale_image)
+    assert np.array_equal(rgb_view, color.gray2rgb(greyscale_image))
+
+
+def test_peak_memory_is_within_multiple_of_image_size():
+    image = ImageData("./colourpaletteextractor/data/sampleImages/my_parents.jpg").image
+    rgb_image = palettealgorithm.get_read_only_view(np.tile(image, (2, 1, 1)))
+    greyscale_image = palettealgorithm.get_read_only_view(image[..., 0])
+
+    # The CIELAB image and its C* values are the largest arrays (32 bytes per pixel, 16 using single precision)
+    for test_image, single_precision, max_multiple in [(rgb_image, False, 16),
+                                                       (rgb_image, True, 10),
+                                                       (greyscale_image, False, 48)]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.single_precision = single_precision
+        algorithm.recolour_chunk_bytes = 8 * 1024 ** 2
+
+        tracemalloc.start()
+        try:
+            algorithm.generate_colour_palette_index_map(test_image)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < max_multiple * test_image.nbytes
+
+
+def test_estimated_peak_memory_is_not_exceeded():
+    image = ImageData("./colourpaletteextractor/data/sampleImages/my_parents.jpg").image
+
+    for single_precision in [False, True]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.single_precision = single_precision
+
+        tracemalloc.start()
+        try:
+            algorithm.generate_colour_palette_index_map(image)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < algorithm.estimate_peak_bytes(image.shape)
+
+    single_precision_algorithm = nieves2020.Nieves2020CentredCubes()
+    single_precision_algorithm.single_precision = True
+    assert single_precision_algorithm.estimate_peak_bytes(image.shape) \
+           < nieves2020.Nieves2020CentredCubes().estimate_peak_bytes(image.shape)
+
+
+
+def test_estimated_peak_memory_from_binned_image_is_not_exceeded():
+    image = ImageData("./colourpaletteextractor/data/sampleImages/my_parents.jpg").image
+
+    for unique_colours in [False, True]:
+        algorithm = nieves2020.Nieves2020CentredCubes()
+        algorithm.unique_colours = unique_colours
+        algorithm.cube_size = 5  # Many cubes
+        algorithm.generate_colour_palette_index_map(image)
+        binned_image = algorithm.binned_image
+        algorithm.threshold = 0.01
+
+        tracemalloc.start()
+        try:
+            algorithm.generate_colour_palette_index_map_from_binned_image(binned_image)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < algorithm.estimate_peak_bytes_from_binned_image(binned_image) \
+               < algorithm.estimate_peak_bytes(image.shape)
@@ -0,0 +1,110 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.model import generate_image_data_colour_palette
+from colourpaletteextractor.model.palettecache import PaletteCache
+
+IMAGE = "./colourpaletteextractor/tests/testImages/multi-colour-1.png"
+
+
+def test_key_depends_on_image_and_algorithm():
+    image = np.zeros([4, 4, 3], dtype=np.uint8)
+    other_image = image.copy()
+    other_image[0, 0, 0] = 1
+    algorithm = nieves2020.Nieves2020CentredCubes()
+
+    key = PaletteCache.get_key(image, algorithm)
+    assert key == PaletteCache.get_key(image.copy(), nieves2020.Nieves2020CentredCubes())
+    assert key != PaletteCache.get_key(other_image, algorithm)
+    assert key != PaletteCache.get_key(image.reshape(2, 8, 3), algorithm)
+    assert key != PaletteCache.get_key(image, nieves2020.Nieves2020OffsetCubes())
+
+    algorithm._cube_size = 10
+    assert key != PaletteCache.get_key(image, algorithm)
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.workers = 2  # Does not change the colour palette
+    assert key == PaletteCache.get_key(image, algorithm)
+
+
+def test_save_and_load(tmp_path):
+    cache = PaletteCache(str(tmp_path))
+    index_map = np.array([[0, 1], [1, 1]], dtype=np.uint8)
+    colour_palette = [np.array([1, 2, 3], dtype=np.uint8), np.array([4, 5, 6], dtype=np.uint8)]
+
+    assert cache.load("key") is None
+    cache.save("key", index_map, colour_palette, [0.25, 0.75])
+    loaded_index_map, loaded_colour_palette, loaded_relative_frequencies = cache.load("key")
+
+    assert loaded_index_map.dtype == np.uint8
+    assert (loaded_index_map == index_map).all()
+    assert [list(colour) for colour in loaded_colour_palette] == [[1, 2, 3], [4, 5, 6]]
+    assert loaded_relative_frequencies == [0.25, 0.75]
+
+
+def test_damaged_entry_is_removed(tmp_path):
+    cache = PaletteCache(str(tmp_path))
+    with open(os.path.join(str(tmp_path), "key" + PaletteCache.EXTENSION), "wb") as file:
+        file.write(b"not a cache entry")
+
+    assert cache.load("key") is None
+    assert cache.get_size() == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PaletteCache(str(tmp_path))
+    rng = np.random.default_rng(0)
+    for key in ["a", "b", "c"]:
+        cache.save(key, rng.integers(0, 256, size=[64, 64], dtype=np.uint8), [np.zeros(3, dtype=np.uint8)], [1.0])
+        time.sleep(0.01)  # Distinct times of use
+    entry_size = cache.get_size() // 3
+
+    assert cache.load("a") is not None  # "b" is now the least recently used
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+
+    assert cache.load("b") is None
+    assert cache.load("a") is not None
+    assert cache.load("c") is not None
+
+
+def test_negative_size_raises_error(tmp_path):
+    with pytest.raises(ValueError):
+        PaletteCache(str(tmp_path), max_bytes=-1)
+
+
+def test_cached_colour_palette_matches_generated_colour_palette(tmp_path):
+    cache = PaletteCache(str(tmp_path))
+
+    image_data_1 = ImageData(IMAGE)
+    generate_image_data_colour_palette(image_data_1, nieves2020.Nieves2020CentredCubes(), cache=cache)
+    image_data_2 = ImageData(IMAGE)
+    generate_image_data_colour_palette(image_data_2, nieves2020.Nieves2020CentredCubes(), cache=cache)
+
+    assert not image_data_1.colour_palette_cached
+    assert image_data_2.colour_palette_cached
+    assert (image_data_1.recoloured_image == image_data_2.recoloured_image).all()
+    assert [list(colour) for colour in image_data_1.colour_palette] \
+           == [list(colour) for colour in image_data_2.colour_palette]
+    assert image_data_1.colour_palette_relative_frequency == image_data_2.colour_palette_relative_frequency
@@ -0,0 +1,158 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.paletteworkspace import PaletteWorkspace
+
+
+def test_given_back_array_is_borrowed_again():
+    workspace = PaletteWorkspace()
+    array = workspace.borrow((4, 3), np.float64)
+    assert array.shape == (4, 3)
+    assert len(workspace) == 0
+
+    workspace.give_back(array)
+    assert len(workspace) == 1
+    assert workspace.nbytes == array.nbytes
+
+    assert workspace.borrow((4, 3), np.float32) is not array  # Different type
+    assert workspace.borrow((3, 4), np.float64) is not array  # Different shape
+    assert workspace.borrow((4, 3), np.float64) is array
+    assert len(workspace) == 0
+    assert workspace.nbytes == 0
+
+
+def test_views_are_not_kept():
+    workspace = PaletteWorkspace()
+    array = np.empty((4, 3))
+
+    workspace.give_back(array[1:])
+    workspace.give_back(array.reshape(-1))
+    assert len(workspace) == 0
+
+    workspace.give_back(array)
+    workspace.give_back(array)  # Only kept once
+    assert len(workspace) == 1
+
+
+def test_least_recently_given_back_arrays_are_evicted():
+    workspace = PaletteWorkspace(max_bytes=2 * 800)
+    arrays = [np.empty(100) for _ in range(3)]  # 800 bytes each
+    for array in arrays:
+        workspace.give_back(array)
+
+    assert len(workspace) == 2
+    assert workspace.nbytes == 1600
+    assert workspace.borrow((100,), np.float64) is arrays[2]
+    assert workspace.borrow((100,), np.float64) is arrays[1]
+
+    workspace.give_back(np.empty(1000))  # Larger than the workspace
+    assert len(workspace) == 0
+
+    workspace.give_back(arrays[0])
+    workspace.max_bytes = 0
+    assert len(workspace) == 0
+
+
+def test_negative_size_raises_error():
+    with pytest.raises(ValueError):
+        PaletteWorkspace(max_bytes=-1)
+
+    workspace = PaletteWorkspace()
+    with pytest.raises(ValueError):
+        workspace.max_bytes = -1
+
+
+def test_workspace_is_shared_between_threads():
+    workspace = PaletteWorkspace()
+
+    def borrow_and_give_back(_) -> int:
+        array = workspace.borrow((1000,), np.int32)
+        array[:] = id(array) % 1000
+        assert (array == id(array) % 1000).all()  # Not borrowed by another thread at the same time
+        workspace.give_back(array)
+        return id(array)
+
+    with ThreadPoolExecutor(4) as executor:
+        array_ids = set(executor.map(borrow_and_give_back, range(200)))
+
+    assert len(array_ids) <= 4
+    assert len(workspace) == len(array_ids)
+
+
+def test_arrays_are_reused_for_images_of_the_same_size():
+    image = ImageData("./colourpaletteextractor/data/sampleImages/jon_schueler_sun_1959.jpg").image
+    other_image = ImageData("./colourpaletteextractor/data/sampleImages/jon_schueler_sun_1959.png").image
+    workspace = PaletteWorkspace()
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.workspace = workspace
+    results = []
+    binned_images = []
+    for test_image in [image, other_image, image]:
+        results.append(algorithm.generate_colour_palette_index_map(test_image))
+        binned_images.append(algorithm.binned_image)
+        algorithm.release_binned_image()
+
+    # The arrays of each binned image are given back and reused for the next image
+    assert binned_images[0].released
+    assert not algorithm.can_reuse_binned_image(binned_images[0])
+    # CIELAB image, C* values, cube key and cube of each pixel and palette index of each pixel
+    assert len(workspace) == 5
+
+    # The colour palettes are the same as those generated without a workspace
+    for test_image, (index_map, colour_palette, relative_frequencies) in zip([image, other_image, image], results):
+        expected_index_map, expected_colour_palette, expected_relative_frequencies = \
+            nieves2020.Nieves2020CentredCubes().generate_colour_palette_index_map(test_image)
+
+        assert (index_map == expected_index_map).all()
+        assert [list(colour) for colour in colour_palette] == [list(colour) for colour in expected_colour_palette]
+        assert relative_frequencies == expected_relative_frequencies
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("cancel_stage", ["_increment_progress", "_set_progress"])
+def test_palette_indices_given_back_when_cancelled(workers, cancel_stage):
+    image = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png").image
+    workspace = PaletteWorkspace()
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.workspace = workspace
+    algorithm.workers = workers
+    algorithm.recolour_chunk_bytes = 1024  # Many chunks to recolour
+    binned_image = algorithm.bin_image(image)
+    arrays_given_back = len(workspace)
+    algorithm.threshold = 0.05  # Pixels in the remaining cubes are recoloured with their closest relevant colour
+
+    # Cancel while recolouring the image (after each chunk) or once it has been recoloured (at 95%)
+    update_progress = getattr(algorithm, cancel_stage)
+
+    def cancel(*args) -> None:
+        update_progress(*args)
+        if cancel_stage == "_increment_progress" or args[0] == 95:
+            algorithm.continue_thread = False
+
+    setattr(algorithm, cancel_stage, cancel)
+    assert algorithm.generate_colour_palette_index_map_from_binned_image(binned_image) == (None, [], [])
+
+    # The palette indices are given back, so the next colour palette reuses them
+    assert len(workspace) == arrays_given_back + 1
@@ -0,0 +1,99 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.model import generate_image_data_colour_palette
+from colourpaletteextractor.model.processpool import PaletteProcessPool, SharedImage, attach_image
+from colourpaletteextractor.tests.helpers import helperfunctions
+
+
+@pytest.fixture(scope="module")
+def process_pool():
+    process_pool = PaletteProcessPool(max_workers=1)
+    yield process_pool
+    process_pool.shutdown()
+
+
+def test_shared_image():
+    image = np.arange(60, dtype=np.uint8).reshape((4, 5, 3))
+    shared_image = SharedImage(image)
+
+    block, shared_view, cancel_flag = attach_image(shared_image.descriptor)
+    assert (shared_view == image).all()
+    assert not shared_view.flags.writeable
+    assert cancel_flag[0] == 0
+
+    shared_image.cancel()
+    assert cancel_flag[0] == 1
+
+    del shared_view, cancel_flag
+    block.close()
+    shared_image.close()
+
+
+def test_process_pool_matches_calling_thread(process_pool):
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020OffsetCubes()
+    algorithm.threshold = 0.05
+    progress_reporter = helperfunctions.RecordingProgressReporter()
+    algorithm.set_progress_reporter(progress_reporter)
+    index_map, colour_palette, relative_frequencies = process_pool.generate_colour_palette_index_map(image, algorithm)
+
+    expected_algorithm = nieves2020.Nieves2020OffsetCubes()
+    expected_algorithm.threshold = 0.05
+    expected_index_map, expected_colour_palette, expected_relative_frequencies = \
+        expected_algorithm.generate_colour_palette_index_map(image)
+
+    assert (index_map == expected_index_map).all()
+    assert [list(colour) for colour in colour_palette] == [list(colour) for colour in expected_colour_palette]
+    assert relative_frequencies == expected_relative_frequencies
+
+    # Progress is only passed on to the algorithm's progress reporter by the pump, and only for running jobs
+    assert progress_reporter.reported_progress == []
+    process_pool.pump_progress()
+    assert progress_reporter.reported_progress == []
+
+
+def test_process_pool_job_cancelled(process_pool):
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.continue_thread = False
+    index_map, colour_palette, _ = process_pool.generate_colour_palette_index_map(image, algorithm)
+
+    assert index_map is None
+    assert colour_palette == []
+
+
+def test_image_data_colour_palette_generated_by_process_pool(process_pool):
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    generate_image_data_colour_palette(image_data, nieves2020.Nieves2020CentredCubes(), process_pool=process_pool)
+
+    expected_image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    generate_image_data_colour_palette(expected_image_data, nieves2020.Nieves2020CentredCubes())
+
+    assert (image_data.recoloured_image == expected_image_data.recoloured_image).all()
+    assert image_data.colour_palette_relative_frequency == expected_image_data.colour_palette_relative_frequency
+    assert image_data.binned_image is None  # Kept by the worker process
+
+
+def test_process_pool_does_not_import_qt():
+    assert helperfunctions.check_imports_without_qt("import colourpaletteextractor.model.processpool")
@@ -0,0 +1,108 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from colourpaletteextractor.model.algorithms import nieves2020
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.progressreporter import ThrottledProgressReporter
+from colourpaletteextractor.tests.helpers import helperfunctions
+
+
+def test_throttled_progress_reporter_coalesces_reports():
+    recorder = helperfunctions.RecordingProgressReporter()
+    progress_reporter = ThrottledProgressReporter(recorder, max_rate=1e-3)  # One report every 1000 s
+
+    for percent in range(0, 100):
+        progress_reporter.report_progress(percent)
+    assert recorder.reported_progress == [0]  # First report is passed on
+    assert progress_reporter.pending_percent == 99  # Only the most recent report is kept
+
+    progress_reporter.flush()
+    assert recorder.reported_progress == [0, 99]
+    assert progress_reporter.pending_percent is None
+
+    progress_reporter.report_progress(99.5)
+    progress_reporter.report_progress(100)  # Completion is always passed on
+    progress_reporter.report_progress(0)  # As is progress going backwards
+    assert recorder.reported_progress == [0, 99, 100, 0]
+
+
+def test_throttled_progress_reporter_passes_on_reports_after_interval():
+    recorder = helperfunctions.RecordingProgressReporter()
+    progress_reporter = ThrottledProgressReporter(recorder, max_rate=1e9)  # No reports held back
+
+    for percent in range(0, 10):
+        progress_reporter.report_progress(percent)
+    assert recorder.reported_progress == list(range(0, 10))
+
+
+def test_throttled_progress_reporter_invalid_rate():
+    with pytest.raises(ValueError):
+        ThrottledProgressReporter(helperfunctions.RecordingProgressReporter(), max_rate=0)
+
+
+def test_image_data_cancel_event():
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    assert image_data.continue_thread
+    assert not image_data.cancel_event.is_set()
+
+    image_data.continue_thread = False
+    assert image_data.cancel_event.is_set()
+
+    image_data.continue_thread = True
+    assert not image_data.cancel_event.is_set()
+
+
+def test_algorithm_shares_cancel_event():
+    image_data = ImageData("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    progress_reporter = ThrottledProgressReporter(helperfunctions.RecordingProgressReporter(image_data))
+    assert progress_reporter.cancel_event is image_data.cancel_event
+
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.set_progress_reporter(progress_reporter)
+    assert algorithm.continue_thread
+
+    image_data.continue_thread = False  # E.g., cancelled by the GUI while the algorithm is running
+    assert not algorithm.continue_thread
+    assert not progress_reporter.continue_thread
+
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    index_map, colour_palette, _ = algorithm.generate_colour_palette_index_map(image)
+    assert index_map is None
+    assert colour_palette == []
+
+    algorithm.set_progress_reporter(None)  # The algorithm no longer uses the image's cancellation token
+    assert algorithm.continue_thread
+
+
+def test_cancelled_between_chunks(monkeypatch):
+    monkeypatch.setattr(nieves2020, "CUBE_KEY_CHUNK_PIXELS", 16)
+    image = helperfunctions.get_image("./colourpaletteextractor/tests/testImages/multi-colour-1.png")
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    calls = []
+
+    def get_cube_coordinates(lab, out):
+        calls.append(lab.shape[0])
+        if len(calls) == 2:
+            algorithm.continue_thread = False  # Cancel after the first chunk of pixels
+        return nieves2020.Nieves2020CentredCubes._get_cube_coordinates(algorithm, lab, out)
+
+    algorithm._get_cube_coordinates = get_cube_coordinates
+    index_map, colour_palette, _ = algorithm.generate_colour_palette_index_map(image)
+    assert index_map is None
+    assert colour_palette == []
+    assert calls == [2, 16]  # Extremes of the image, then only the first chunk
@@ -0,0 +1,133 @@
+# ColourPaletteExtractor is a simple tool to generate the colour palette of an image.
+# Copyright (C) 2021  Tim Churchfield
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import numpy as np
+import pytest
+import tifffile
+
+from colourpaletteextractor.model import model
+from colourpaletteextractor.model.algorithms import nieves2020, palettealgorithm
+from colourpaletteextractor.model.imagedata import ImageData
+from colourpaletteextractor.model.tiledimage import ArrayTiledImage, open_tiled_image, save_recoloured_image
+
+TEST_IMAGE = "./colourpaletteextractor/tests/testImages/multi-colour-1.png"
+
+
+def _generate_in_memory(image):
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    algorithm.unique_colours = True
+    return algorithm.generate_colour_palette_index_map(image)
+
+
+def _generate_tiled(tiled_image, index_map_file=None):
+    algorithm = nieves2020.Nieves2020CentredCubes()
+    return algorithm.generate_colour_palette_index_map_tiled(tiled_image, index_map_file)
+
+
+def _assert_same_result(result, expected_result):
+    index_map, colour_palette, relative_frequencies = result
+    expected_index_map, expected_colour_palette, expected_relative_frequencies = expected_result
+
+    assert np.array_equal(index_map, expected_index_map)
+    assert np.array_equal(np.array(colour_palette), np.array(expected_colour_palette))
+    assert np.allclose(relative_frequencies, expected_relative_frequencies)
+
+
+def test_array_read_in_bands_of_rows():
+    image = np.zeros((10, 7, 3), dtype=np.uint8)
+    tiled_image = ArrayTiledImage(image, tile_pixels=21)
+
+    tiles = list(tiled_image.tiles())
+
+    assert tiled_image.shape == (10, 7)
+    assert tiled_image.tile_count == 4
+    assert [(row, column) for row, column, _ in tiles] == [(0, 0), (3, 0), (6, 0), (9, 0)]
+    assert [tile.shape for _, _, tile in tiles] == [(3, 7, 3)] * 3 + [(1, 7, 3)]
+
+
+def test_greyscale_tiles_read_as_rgb():
+    image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+
+    _, _, tile = next(ArrayTiledImage(image).tiles())
+
+    assert tile.shape == (3, 4, 3)
+    assert np.array_equal(tile[:, :, 2], image)
+
+
+def test_invalid_tile_size():
+    with pytest.raises(ValueError):
+        ArrayTiledImage(np.zeros((2, 2, 3), dtype=np.uint8), tile_pixels=0)
+
+
+def test_tiled_result_same_as_in_memory_result(tmp_path):
+    image = ImageData(TEST_IMAGE).image
+    np.save(tmp_path / "image.npy", image)
+
+    result = _generate_tiled(open_tiled_image(str(tmp_path / "image.npy"), tile_pixels=1000),
+                             str(tmp_path / "index_map.npy"))
+
+    _assert_same_result(result, _generate_in_memory(image))
+
+
+@pytest.mark.parametrize("layout", [{"tile": (32, 32)}, {"rowsperstrip": 5}])
+def test_tiff_image_read_in_tiles(tmp_path, layout):
+    image = ImageData(TEST_IMAGE).image
+    tifffile.imwrite(tmp_path / "image.tif", image, compression="zlib", **layout)
+
+    result = _generate_tiled(open_tiled_image(str(tmp_path / "image.tif")), str(tmp_path / "index_map.npy"))
+
+    _assert_same_result(result, _generate_in_memory(image))
+
+
+def test_colour_palette_generated_without_index_map(tmp_path):
+    image = ImageData(TEST_IMAGE).image
+
+    index_map, colour_palette, relative_frequencies = _generate_tiled(ArrayTiledImage(image))
+    _, expected_colour_palette, expected_relative_frequencies = _generate_in_memory(image)
+
+    assert index_map is None
+    assert np.array_equal(np.array(colour_palette), np.array(expected_colour_palette))
+    assert np.allclose(relative_frequencies, expected_relative_frequencies)
+
+
+def test_recoloured_image_saved_in_bands(tmp_path):
+    image = ImageData(TEST_IMAGE).image
+    index_map, colour_palette, _ = _generate_in_memory(image)
+
+    recoloured_image = save_recoloured_image(index_map, colour_palette, str(tmp_path / "recoloured.npy"),
+                                             tile_pixels=100)
+
+    assert np.array_equal(np.load(tmp_path / "recoloured.npy"),
+                          palettealgorithm.get_recoloured_image(index_map, colour_palette))
+    assert np.array_equal(recoloured_image, np.load(tmp_path / "recoloured.npy"))
+
+
+def test_generate_colour_palette_from_tiled_image(tmp_path):
+    image = ImageData(TEST_IMAGE).image
+    np.save(tmp_path / "image.npy", image)
+
+    result = model.generate_colour_palette_from_tiled_image(str(tmp_path / "image.npy"),
+                                                            str(tmp_path / "index_map.npy"),
+                                                            algorithm=nieves2020.Nieves2020CentredCubes)
+
+    _assert_same_result(result, _generate_in_memory(image))
+    assert np.array_equal(np.load(tmp_path / "index_map.npy"), result[0])
+
+
+def test_tiled_image_not_found():
+    with pytest.raises(FileNotFoundError):
+        model.generate_colour_palette_from_tiled_image("./no-such-image.npy")
@@ -184,13 +184,16 @@ class MainView(QMainWindow):
 
         return self.tabs.currentIndex()
 
-    def create_new_tab(self, image_id, image_data) -> None:
+    def create_new_tab(self, image_id, image_data) -> tabview.NewTab:
         """Create a new image tab for the main window.
 
         Args:
             image_id (str): ID of the image to be used for the new tab (e.g., 'Tab_1')
             image_data (model.imagedata.ImageData): Object containing tab and image properties and state
 
+        Returns:
+            (tabview.NewTab): The new tab.
+
         """
         label = image_data.name
 
@@ -199,6 +202,8 @@ class MainView(QMainWindow):
         new_tab_index = self.tabs.addTab(new_tab, label)
         self.tabs.setCurrentIndex(new_tab_index)
 
+        return new_tab
+
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         """Intercept GUI close event to check if the user wishes to close the GUI.
 
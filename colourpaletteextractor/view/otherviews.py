@@ -23,12 +23,12 @@ from PySide2.QtCore import Qt, QEvent
 from PySide2.QtGui import QIcon, QPixmap, QPainter, QMovie
 from PySide2.QtWidgets import QWidget, QProgressBar, \
     QStatusBar, QMessageBox, QLabel, QTabWidget, QDialog, QVBoxLayout, QRadioButton, QGridLayout, \
-    QStyleOption, QPushButton, QLineEdit, QSizePolicy, QFileDialog, QHBoxLayout
+    QStyleOption, QPushButton, QLineEdit, QSizePolicy, QFileDialog, QHBoxLayout, QDoubleSpinBox
 
 from colourpaletteextractor import _version
 from colourpaletteextractor._version import get_header, get_licence
 from colourpaletteextractor.model.algorithms import palettealgorithm
-from colourpaletteextractor.model.model import get_settings
+from colourpaletteextractor.model.model import get_settings, ColourPaletteExtractorModel
 
 
 class StatusBar(QStatusBar):
@@ -106,6 +106,12 @@ class StatusBar(QStatusBar):
         elif state == 3:
             # Show progress bar and associated tip while the report is being generated
             self._set_intra_report_message()
+        elif state == 4:
+            # Show toggle status if colour palette has been loaded from the cache
+            self._set_post_palette_message(cached=True)
+        elif state == 5:
+            # Show loading status while the image is being decoded
+            self._set_loading_message()
         else:
             raise ValueError(state, "is not a valid status bar state!")
 
@@ -135,6 +141,11 @@ class StatusBar(QStatusBar):
         self.addPermanentWidget(QLabel("v" + _version.__version__))
         self.addPermanentWidget(spacer3)
 
+    def _set_loading_message(self) -> None:
+        """Set the primary status label to the message while the image is being decoded."""
+
+        self._status_label.setText("Loading image")
+
     def _set_pre_palette_message(self) -> None:
         """Set the primary status label to the pre-palette generation message.
 
@@ -156,9 +167,12 @@ class StatusBar(QStatusBar):
 
         self._status_label.setText("Generating colour palette")
 
-    def _set_post_palette_message(self) -> None:
+    def _set_post_palette_message(self, cached: bool = False) -> None:
         """Set the primary status label to the post-palette generation message.
 
+        Args:
+            cached (bool): If True, the message also states that the colour palette was loaded from the cache.
+
         Raises:
             RuntimeError: If the platform is not currently supported.
         """
@@ -170,7 +184,11 @@ class StatusBar(QStatusBar):
         else:
             raise RuntimeError(sys.platform, "is not a supported platform!")
 
-        self._status_label.setText("Toggle between the original and recoloured image using " + command)
+        message = "Toggle between the original and recoloured image using " + command
+        if cached:
+            message = "Colour palette loaded from cache. " + message
+
+        self._status_label.setText(message)
 
     def _set_intra_report_message(self) -> None:
         """Set the primary status label to the message while generating the colour palette report."""
@@ -274,8 +292,8 @@ class AboutBox(QMessageBox):
 class PreferencesWidget(QDialog):
     """The dialog box for setting a user's preferences.
 
-    Currently, the user can change the algorithm used to generate the colour palette, as well as the
-    output directory for any reports that are generated.
+    Currently, the user can change the algorithm used to generate the colour palette and its relevancy parameters, as
+    well as the output directory for any reports that are generated.
 
     Args:
         parent: The parent object of the PreferencesWidget. The default is None.
@@ -296,6 +314,13 @@ class PreferencesWidget(QDialog):
 
     """
 
+    ALGORITHM_PARAMETERS = [("threshold", "Primary threshold (pixels in a cube):", 100, 3, " %"),
+                            ("secondary_threshold", "Secondary threshold (pixels in a cube):", 100, 3, " %"),
+                            ("c_star_percentile", "Secondary C* percentile of the image:", 1, 1, ""),
+                            ("min_l_star", "Secondary minimum L*:", 1, 1, "")]
+    """The name, label, display scale, number of decimals and suffix of each of the algorithm's relevancy
+    parameters."""
+
     def __init__(self, parent=None):
 
         super(PreferencesWidget, self).__init__(parent)
@@ -317,6 +342,8 @@ class PreferencesWidget(QDialog):
                 button.setChecked(True)
                 break
 
+        self._set_parameter_spin_box_values()
+
         self.user_path_selector.setEnabled(self._use_user_dir)
         self.user_path_selector.setText(self._user_output_dir)
         self.browse_button.setEnabled(self._use_user_dir)
@@ -345,6 +372,26 @@ class PreferencesWidget(QDialog):
         """
         return self._algorithms, self._algorithm_buttons
 
+    def get_parameter_spin_boxes(self) -> list[QDoubleSpinBox]:
+        """Get the spin boxes used to set the relevancy parameters of the algorithm.
+
+        Returns:
+            (list[QDoubleSpinBox]): List of spin boxes, in the order of :const:`ALGORITHM_PARAMETERS`.
+        """
+
+        return self._parameter_spin_boxes
+
+    def get_algorithm_parameters(self) -> dict:
+        """Get the relevancy parameters of the algorithm currently shown in the preferences dialog box.
+
+        Returns:
+            (dict): The names and values of the relevancy parameters.
+        """
+
+        return {name: spin_box.value() / scale
+                for (name, _, scale, _, _), spin_box in zip(PreferencesWidget.ALGORITHM_PARAMETERS,
+                                                            self._parameter_spin_boxes)}
+
     def _read_settings(self) -> None:
         """Look up the application's settings file and read-in the relevant settings for the preferences dialog box."""
 
@@ -366,6 +413,11 @@ class PreferencesWidget(QDialog):
         self._selected_algorithm = self._settings.value('selected algorithm')
         self._settings.endGroup()
 
+        self._algorithm_parameters = {}
+        for name, key in ColourPaletteExtractorModel.ALGORITHM_PARAMETER_SETTINGS.items():
+            default = ColourPaletteExtractorModel.DEFAULT_ALGORITHM_PARAMETERS[name]
+            self._algorithm_parameters[name] = float(self._settings.value(key, default))
+
     def _set_properties(self) -> None:
         """Set the properties of the preferences dialog box."""
 
@@ -456,6 +508,28 @@ class PreferencesWidget(QDialog):
             layout.addWidget(label, count, 1)
             count += 1
 
+        # Adding spin boxes for the relevancy parameters of the algorithm
+        line = self._create_horizontal_line()
+        layout.addWidget(line, count, 0, 1, 2)  # Horizontal line spacer
+        count += 1
+        layout.addWidget(QLabel("Set the relevancy parameters of the algorithm:"), count, 0, 1, 2)
+        count += 1
+
+        self._parameter_spin_boxes = []
+        for _, label, scale, decimals, suffix in PreferencesWidget.ALGORITHM_PARAMETERS:
+            spin_box = QDoubleSpinBox()
+            spin_box.setDecimals(decimals)
+            spin_box.setRange(0, 100)
+            spin_box.setSingleStep(10 ** -(decimals - 1) if scale != 1 else 1)
+            spin_box.setSuffix(suffix)
+            spin_box.setKeyboardTracking(False)  # Only update once the user has finished typing
+            self._parameter_spin_boxes.append(spin_box)
+
+            layout.addWidget(QLabel(label), count, 0)
+            layout.addWidget(spin_box, count, 1)
+            count += 1
+        self._set_parameter_spin_box_values()
+
         # Setting layout of buttons
         self.algorithm_tab.setLayout(layout)
 
@@ -463,6 +537,15 @@ class PreferencesWidget(QDialog):
         if not default_algorithm_found:
             ValueError("No default algorithm has been specified!")
 
+    def _set_parameter_spin_box_values(self) -> None:
+        """Show the relevancy parameters of the algorithm from the settings file in their spin boxes."""
+
+        for (name, _, scale, _, _), spin_box in zip(PreferencesWidget.ALGORITHM_PARAMETERS,
+                                                    self._parameter_spin_boxes):
+            spin_box.blockSignals(True)  # Not a change made by the user
+            spin_box.setValue(self._algorithm_parameters[name] * scale)
+            spin_box.blockSignals(False)
+
     def _output_properties_tab(self):
         """Set the properties and layout of the output directory preferences tab."""
 
@@ -691,6 +774,8 @@ class BatchGenerationProgressWidget(QDialog):
         self._batch_type = ""
         self._total_count = 0
         self._current_count = 0
+        self._running_count = 0
+        self._queued_count = 0
 
         self._set_properties()
 
@@ -708,6 +793,8 @@ class BatchGenerationProgressWidget(QDialog):
         self._total_count = total_count
         self._current_count = 0
         self._batch_type = batch_type
+        self._running_count = 0
+        self._queued_count = 0
         self.label.setText("")
         self._set_label_text()
         self._progress_bar.setValue(self._current_count)
@@ -724,6 +811,18 @@ class BatchGenerationProgressWidget(QDialog):
         self._progress_bar.setValue(self._current_count)
         self._set_label_text()
 
+    def set_queue_depth(self, running_count: int, queued_count: int) -> None:
+        """Update the number of threads that are running and the number waiting to be started.
+
+        Args:
+            running_count (int): The number of threads running.
+            queued_count (int): The number of threads waiting to be started (e.g., until there is enough memory).
+        """
+
+        self._running_count = running_count
+        self._queued_count = queued_count
+        self._set_label_text()
+
     def set_cancel_text(self) -> None:
         """Set the text shown to cancelling to let the user know that any incomplete threads are to be cancelled."""
 
@@ -733,9 +832,11 @@ class BatchGenerationProgressWidget(QDialog):
         """Update the text shown by the dialog box, depending on its current status."""
 
         if self.label.text() != self._cancel_text:
-            self.label.setText("Generated " + self._batch_type + " for "
-                               + str(self._current_count) + "/"
-                               + str(self._total_count) + " images")
+            text = "Generated " + self._batch_type + " for " + str(self._current_count) + "/" \
+                   + str(self._total_count) + " images"
+            if self._queued_count > 0:
+                text += "\n(" + str(self._running_count) + " running, " + str(self._queued_count) + " queued)"
+            self.label.setText(text)
 
     def _set_properties(self):
         """Set the properties of the BatchGenerationProgressWidget."""
@@ -54,13 +54,13 @@ class NewTab(QScrollArea):
 
         self._toggle_recoloured_image_available = False  # Initially no recoloured image associated with tab
         self._toggle_recoloured_image_pressed = False  # Initially button is not pressed
-        self._generate_palette_available = True
+        self._generate_palette_available = image_data.loaded  # Not available until the image has been decoded
         self._generate_report_available = False  # Initially cannot generate report
 
         # Setting properties to allow scrolling of image
         self.setWidgetResizable(False)
 
-        self._status_bar_state = 0  # Initially no colour palette present
+        self._status_bar_state = 0 if image_data.loaded else 5  # Initially loading the image or no colour palette
         self._progress_bar_value = 0  # Initially zero % complete
 
     @property
@@ -123,7 +123,7 @@ class NewTab(QScrollArea):
     @status_bar_state.setter
     def status_bar_state(self, value: int):
 
-        if isinstance(value, int) and 0 <= value <= 3:
+        if isinstance(value, int) and 0 <= value <= 5:
             self._status_bar_state = value
         else:
             raise ValueError(value, "is an invalid status bar state!")
@@ -262,6 +262,9 @@ class ImageDisplay(QLabel):
     _MINIMUM_SIZE = 100
     """The minimum size of the image display."""
 
+    _PLACEHOLDER_TEXT = "Loading image..."
+    """The text shown by the image display while the image is being decoded."""
+
     def __init__(self, image_data: imagedata.ImageData, parent=None):
 
         super(ImageDisplay, self).__init__(parent)
@@ -270,9 +273,13 @@ class ImageDisplay(QLabel):
         self._pixmap_width = 0
         self._pixmap_height = 0
 
-        self.pixmap = image_data.get_image_as_q_image(image_data.image)
-        self.pixmap = QPixmap(self.pixmap)
-        self._set_pixmap(self.pixmap)
+        if image_data.loaded:
+            self.pixmap = image_data.get_image_as_q_image(image_data.image)
+            self.pixmap = QPixmap(self.pixmap)
+            self._set_pixmap(self.pixmap)
+        else:  # Show a placeholder until the image has been decoded
+            self.pixmap = QPixmap()
+            self.setText(ImageDisplay._PLACEHOLDER_TEXT)
 
         # Set QLabel properties
         self._set_label_properties()
@@ -296,6 +303,29 @@ class ImageDisplay(QLabel):
         self.pixmap = QPixmap(self.pixmap)
         self._set_pixmap(self.pixmap)
 
+    def show_preview_image(self, image: np.array, scale: float) -> None:
+        """Replace the placeholder shown while the image is being decoded with a reduced resolution version of it.
+
+        Args:
+            image (np.array): Numpy array representing the reduced resolution image.
+            scale (float): The scale of the reduced resolution image relative to the image.
+
+        """
+
+        self.update_image(image)
+        self.resize(round(image.shape[1] / scale), round(image.shape[0] / scale))  # Shown at the size of the image
+
+    def show_loaded_image(self, image: np.array) -> None:
+        """Replace the placeholder shown while the image was being decoded with the image.
+
+        Args:
+            image (np.array): Numpy array representing the decoded image.
+
+        """
+
+        self.update_image(image)
+        self.adjustSize()  # Resize the display from the placeholder to the image
+
     def _set_pixmap(self, pixmap: QPixmap) -> None:
         """Set the new size of the QPixmap representation of the current image and update the GUI.
 